@@ -0,0 +1,421 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from urllib.parse import parse_qs, urlparse
+
+from downloader import DEFAULT_OUTPUT_DIR, PRESETS, ENGINES, ENGINE_SUBPROCESS
+from progress import ProgressRecord
+from jobs import JobQueue, FINAL_STATES
+from json_store import write_atomically
+
+API_HOST      = "127.0.0.1"
+API_PORT      = int(os.environ.get("YTDLP_GUI_API_PORT") or 0)  # 0 = any free port
+API_INFO_PATH = os.path.join(os.path.expanduser("~"), ".yt-dlp-gui", "api.json")
+
+MAX_BODY_BYTES          = 64 * 1024
+MAX_SUBSCRIBER_BACKLOG  = 10_000  # queued events per stream before the oldest are dropped
+SSE_FLUSH_INTERVAL      = 0.1     # progress arriving within this window is coalesced per job
+SSE_HEARTBEAT_SECONDS   = 15.0
+
+URL_PATTERN = re.compile(r"^https?://[^\s]+")
+
+
+class EventSubscriber:
+    """Backlog of events for one streaming client.
+
+    State and log events are queued in order; a progress event replaces the
+    job's progress still waiting in the backlog, so a slow reader gets the latest
+    numbers instead of a growing pile of stale ones.
+    """
+
+    def __init__(self, job_id: int | None = None, logs: bool = False):
+        self.job_id  = job_id
+        self.logs    = logs
+        self.closed  = False
+        self._events = deque(maxlen=MAX_SUBSCRIBER_BACKLOG)
+        self._queued = {}  # job id -> pending progress entry
+        self._cond   = threading.Condition()
+
+    def push(self, event: str, job_id: int | None, payload: dict):
+        if self.job_id is not None and job_id != self.job_id:
+            return
+        with self._cond:
+            if event == "progress":
+                entry = self._queued.get(job_id)
+                if entry is not None:
+                    entry[1] = payload
+                    return
+                entry = self._queued[job_id] = [event, payload]
+            else:
+                entry = [event, payload]
+            self._events.append(entry)
+            self._cond.notify()
+
+    def drain(self, timeout: float) -> list:
+        """Wait up to `timeout` for events and return them as (event, payload) pairs."""
+        with self._cond:
+            if not self._events and not self.closed:
+                self._cond.wait(timeout)
+            events = [tuple(entry) for entry in self._events]
+            self._events.clear()
+            self._queued.clear()
+            return events
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# helpers
+
+def _same(supplied: str, expected: str) -> bool:
+    import hmac
+
+    return hmac.compare_digest(supplied.encode(), expected.encode())
+
+
+def _progress_payload(job, record: ProgressRecord) -> dict:
+    return {
+        "job":        job.id,
+        "status":     record.status,
+        "downloaded": record.downloaded,
+        "total":      record.total,
+        "percent":    record.percent,
+        "speed":      record.speed,
+        "eta":        record.eta,
+        "title":      record.title,
+    }
+
+
+def _expansion_payload(expansion) -> dict:
+    return {
+        "url":     expansion.url,
+        "done":    expansion.done,
+        "found":   expansion.found,
+        "skipped": expansion.skipped,
+        "error":   expansion.error,
+    }
+
+
+class JobApi:
+    """Transport-independent operations of the local API on top of a JobQueue."""
+
+    def __init__(self, queue: JobQueue, defaults: dict | None = None):
+        self.queue        = queue
+        self.defaults     = {
+            "output_dir":  DEFAULT_OUTPUT_DIR,
+            "format":      "best",
+            "engine":      ENGINE_SUBPROCESS,
+            "use_archive": False,
+            **(defaults or {}),
+        }
+        self._subscribers = ()
+        self._lock        = threading.Lock()
+        self._listener    = queue.add_listener(self._on_progress, self._on_state, self._on_expansion)
+
+    def submit(self, payload) -> tuple[int, dict]:
+        """Queue a download (or a playlist expansion); returns (HTTP status, body)."""
+        if not isinstance(payload, dict):
+            raise ApiError(400, "body must be a JSON object")
+        url = payload.get("url")
+        if not isinstance(url, str) or not URL_PATTERN.match(url.strip()):
+            raise ApiError(400, "url must start with http:// or https://")
+
+        options = dict(self.defaults)
+        options.update({key: value for key, value in payload.items() if value is not None})
+        if options["format"] not in PRESETS:
+            raise ApiError(400, f"format must be one of {', '.join(PRESETS)}")
+        if options["engine"] not in ENGINES:
+            raise ApiError(400, f"engine must be one of {', '.join(ENGINES)}")
+        for key in ("output_dir", "cookies_file", "cookies_browser"):
+            if options.get(key) is not None and not isinstance(options[key], str):
+                raise ApiError(400, f"{key} must be a string")
+
+        kwargs = {
+            "output_dir":      options["output_dir"],
+            "cookies_file":    options.get("cookies_file"),
+            "cookies_browser": options.get("cookies_browser"),
+            "format_str":      PRESETS[options["format"]],
+            "engine":          options["engine"],
+            "use_archive":     bool(options["use_archive"]),
+        }
+        try:
+            if options.get("playlist"):
+                expansion = self.queue.submit_playlist(url.strip(), **kwargs)
+                return 202, {"playlist": _expansion_payload(expansion)}
+            job = self.queue.submit(url.strip(), **kwargs)
+        except RuntimeError as e:
+            raise ApiError(503, str(e)) from None
+        return 201, {"job": job.as_dict()}
+
+    def list(self, status: str | None = None) -> dict:
+        jobs = [job.as_dict() for job in self.queue.jobs() if status in (None, job.status)]
+        return {"jobs": jobs, "counts": self.queue.counts()}
+
+    def get(self, job_id: int) -> dict:
+        job = self.queue.get(job_id)
+        if job is None:
+            raise ApiError(404, f"no job {job_id}")
+        return {"job": job.as_dict()}
+
+    def cancel(self, job_id: int) -> dict:
+        job = self.queue.get(job_id)
+        if job is None:
+            raise ApiError(404, f"no job {job_id}")
+        if not self.queue.cancel(job_id):
+            raise ApiError(409, f"job {job_id} already {job.status}")
+        return {"job": job.as_dict()}
+
+    def subscribe(self, job_id: int | None = None, logs: bool = False) -> EventSubscriber:
+        """Open an event stream; a single-job stream starts with the job's current state."""
+        subscriber = EventSubscriber(job_id, logs)
+        with self._lock:
+            self._subscribers = self._subscribers + (subscriber,)
+        if job_id is not None:
+            job = self.queue.get(job_id)
+            if job is None:
+                self.unsubscribe(subscriber)
+                raise ApiError(404, f"no job {job_id}")
+            subscriber.push("state", job_id, job.as_dict())
+        return subscriber
+
+    def unsubscribe(self, subscriber: EventSubscriber):
+        subscriber.close()
+        with self._lock:
+            self._subscribers = tuple(item for item in self._subscribers if item is not subscriber)
+
+    def close(self):
+        self.queue.remove_listener(self._listener)
+        for subscriber in self._subscribers:
+            self.unsubscribe(subscriber)
+
+    # queue callbacks (worker threads)
+
+    def _on_progress(self, job, item):
+        subscribers = self._subscribers
+        if not subscribers:
+            return
+        if isinstance(item, ProgressRecord):
+            payload = _progress_payload(job, item)
+            for subscriber in subscribers:
+                subscriber.push("progress", job.id, payload)
+            return
+        for subscriber in subscribers:
+            if subscriber.logs:
+                subscriber.push("log", job.id, {"job": job.id, "line": item})
+
+    def _on_state(self, job):
+        subscribers = self._subscribers
+        if subscribers:
+            payload = job.as_dict()
+            for subscriber in subscribers:
+                subscriber.push("state", job.id, payload)
+
+    def _on_expansion(self, expansion):
+        payload = _expansion_payload(expansion)
+        for subscriber in self._subscribers:
+            if subscriber.job_id is None:
+                subscriber.push("playlist", None, payload)
+
+
+def make_handler(api: JobApi, token: str):
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "yt-dlp-gui-api"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        # helpers
+
+        def _dispatch(self, method: str):
+            try:
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                self._authorize(query)
+                parts = [part for part in url.path.split("/") if part]
+                self._route(method, parts, query)
+            except ApiError as e:
+                self._send_json(e.status, {"error": str(e)})
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            except Exception as e:
+                # a bug in a handler answers 500 instead of dropping the connection
+                try:
+                    self._send_json(500, {"error": f"internal error: {e}"})
+                except OSError:
+                    pass
+
+        def _route(self, method: str, parts: list, query: dict):
+            job_id = None
+            if len(parts) >= 2 and parts[0] == "jobs":
+                if not parts[1].isdigit():
+                    raise ApiError(404, "not found")
+                job_id = int(parts[1])
+
+            if parts == ["jobs"] and method == "GET":
+                self._send_json(200, api.list(query.get("status", [None])[0]))
+            elif parts == ["jobs"] and method == "POST":
+                status, body = api.submit(self._read_json())
+                self._send_json(status, body)
+            elif len(parts) == 2 and job_id is not None and method == "GET":
+                self._send_json(200, api.get(job_id))
+            elif parts[2:] == ["cancel"] and job_id is not None and method == "POST":
+                self._send_json(200, api.cancel(job_id))
+            elif (parts == ["events"] or parts[2:] == ["events"]) and method == "GET":
+                self._stream(api.subscribe(job_id, logs=query.get("log", ["0"])[0] == "1"))
+            elif parts in (["jobs"], ["events"]) or job_id is not None:
+                raise ApiError(405, "method not allowed")
+            else:
+                raise ApiError(404, "not found")
+
+        def _authorize(self, query: dict):
+            # reject DNS-rebinding requests that reach 127.0.0.1 under a foreign name
+            port = self.server.server_address[1]
+            if self.headers.get("Host") not in (f"127.0.0.1:{port}", f"localhost:{port}"):
+                raise ApiError(403, "bad host")
+            header = self.headers.get("Authorization", "")
+            supplied = header[len("Bearer "):] if header.startswith("Bearer ") else query.get("token", [""])[0]
+            if not _same(supplied, token):
+                raise ApiError(401, "missing or wrong token (see api.json)")
+
+        def _read_json(self):
+            # a JSON content type cannot be sent cross-origin without a preflight
+            if self.headers.get_content_type() != "application/json":
+                raise ApiError(415, "Content-Type must be application/json")
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                raise ApiError(400, "Content-Length is not a number") from None
+            if length < 0:
+                raise ApiError(400, "Content-Length is negative")
+            if length > MAX_BODY_BYTES:
+                raise ApiError(413, "request body too large")
+            try:
+                return json.loads(self.rfile.read(length) or b"null")
+            except ValueError:
+                raise ApiError(400, "body is not valid JSON") from None
+
+        def _send_json(self, status: int, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream(self, subscriber: EventSubscriber):
+            """Server-sent events until the client leaves (or the job ends, for one-job streams)."""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            last_write = time.monotonic()
+            try:
+                while not subscriber.closed:
+                    events = subscriber.drain(SSE_HEARTBEAT_SECONDS)
+                    chunks = [f"event: {name}\ndata: {json.dumps(payload)}\n\n" for name, payload in events]
+                    if not chunks and time.monotonic() - last_write >= SSE_HEARTBEAT_SECONDS:
+                        chunks.append(": keep-alive\n\n")
+                    if chunks:
+                        self.wfile.write("".join(chunks).encode())
+                        self.wfile.flush()
+                        last_write = time.monotonic()
+                    if subscriber.job_id is not None and any(
+                        name == "state" and payload["status"] in FINAL_STATES for name, payload in events
+                    ):
+                        break
+                    time.sleep(SSE_FLUSH_INTERVAL)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                api.unsubscribe(subscriber)
+
+    return Handler
+
+
+class ApiServer:
+    """Loopback HTTP server for a JobApi.
+
+    Every request needs the random token written, with the URL, to `info_path`
+    (readable by the current user only), so only local tools of the same user
+    can queue or cancel downloads.
+    """
+
+    def __init__(
+        self,
+        api: JobApi,
+        host: str = API_HOST,
+        port: int = API_PORT,
+        info_path: str | None = API_INFO_PATH,
+        token: str | None = None,
+    ):
+        import secrets
+
+        self.api       = api
+        self.host      = host
+        self.port      = port
+        self.info_path = info_path
+        self.token     = token or secrets.token_urlsafe(24)
+        self._server   = None
+        self._thread   = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        from http.server import ThreadingHTTPServer
+
+        self._server = ThreadingHTTPServer((self.host, self.port), make_handler(self.api, self.token))
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        self._write_info()
+
+    def stop(self):
+        if self._server is None:
+            return
+        self.api.close()  # ends open event streams
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._remove_info()
+
+    # helpers
+
+    def _write_info(self):
+        if not self.info_path:
+            return
+        info = {"url": self.url, "token": self.token, "pid": os.getpid()}
+        # the token grants access to the queue: readable by the current user only
+        write_atomically(self.info_path, lambda stream: json.dump(info, stream), mode=0o600)
+
+    def _remove_info(self):
+        """Delete the info file unless another instance has taken it over."""
+        if not self.info_path:
+            return
+        try:
+            with open(self.info_path, encoding="utf-8") as handle:
+                if json.load(handle).get("token") != self.token:
+                    return
+            os.remove(self.info_path)
+        except (OSError, ValueError, AttributeError):
+            pass
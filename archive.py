@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+
+from info_cache import normalize_url
+from shared import process_wide
+
+ARCHIVE_PATH = os.path.join(os.path.expanduser("~"), ".yt-dlp-gui", "archive.sqlite3")
+
+# yt-dlp output template for one archive line and the file it produced; the
+# extractor is lowercased on import
+ARCHIVE_PRINT_TEMPLATE = "after_move:%(extractor_key)s %(id)s\t%(filepath)s"
+
+
+def make_archive_id(extractor: str, video_id: str) -> str:
+    """Build an id in yt-dlp's --download-archive format: `<extractor> <id>`."""
+    return f"{extractor.lower()} {video_id}"
+
+
+def _folder(output_dir: str) -> str:
+    return os.path.normcase(os.path.abspath(os.path.expanduser(output_dir)))
+
+
+class DownloadArchive:
+    """Persistent index of downloaded videos, keyed like yt-dlp's --download-archive.
+
+    Backed by SQLite so membership checks stay O(1) for any archive size. Source
+    URLs are indexed too, which lets a plain video URL be checked before yt-dlp
+    is started at all. Each download also records its output folder, format
+    and file: a video only counts as downloaded for a folder and format it was
+    saved with, and only while that file still exists. Ids imported from a
+    yt-dlp archive carry no file and count everywhere, as they do in yt-dlp.
+    """
+
+    def __init__(self, path: str = ARCHIVE_PATH):
+        self.path  = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def find(self, url: str) -> str | None:
+        """Return the archive id a URL maps to, if it can be known without extraction."""
+        normalized = normalize_url(url)
+        if normalized.startswith("youtube:"):
+            return make_archive_id("youtube", normalized.split(":", 1)[1])
+        with self._lock:
+            row = self._db().execute(
+                "SELECT id FROM urls WHERE url = ?", (normalized,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def downloaded(self, archive_id: str, output_dir: str, format_str: str) -> bool:
+        """True when `archive_id` was saved to `output_dir` with `format_str` and the file is still there.
+
+        An id imported without a file counts for any folder and format.
+        """
+        with self._lock:
+            db = self._db()
+            if db.execute("SELECT 1 FROM archive WHERE id = ?", (archive_id,)).fetchone() is None:
+                return False
+            rows = db.execute(
+                "SELECT folder, format, path FROM files WHERE id = ?", (archive_id,)
+            ).fetchall()
+        if not rows:
+            return True
+        folder = _folder(output_dir)
+        return any(
+            row_folder == folder and row_format == format_str and os.path.isfile(path)
+            for row_folder, row_format, path in rows
+        )
+
+    def add(
+        self,
+        archive_id: str,
+        url: str | None = None,
+        output_dir: str | None = None,
+        format_str: str | None = None,
+        path: str | None = None,
+    ):
+        """Record a download; with `path`, also the file it saved to `output_dir` with `format_str`."""
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute(
+                    "INSERT OR IGNORE INTO archive (id, added) VALUES (?, ?)",
+                    (archive_id, time.time()),
+                )
+                if url:
+                    db.execute(
+                        "INSERT OR REPLACE INTO urls (url, id) VALUES (?, ?)",
+                        (normalize_url(url), archive_id),
+                    )
+                if path and output_dir is not None:
+                    db.execute(
+                        "INSERT OR REPLACE INTO files (id, folder, format, path) VALUES (?, ?, ?, ?)",
+                        (archive_id, _folder(output_dir), format_str or "", os.path.abspath(path)),
+                    )
+
+    def record_printed(
+        self,
+        printed_file: str,
+        url: str | None = None,
+        output_dir: str | None = None,
+        format_str: str | None = None,
+        path: str | None = None,
+    ) -> int:
+        """Add the `<Extractor> <id>\t<file>` lines yt-dlp printed to `printed_file`, then delete it.
+
+        The URL mapping is only stored when the URL produced exactly one video.
+        `path` replaces the printed file (post-processing wrote the final one).
+        """
+        try:
+            with open(printed_file, encoding="utf-8", errors="replace") as handle:
+                lines = [line.rstrip("\n").partition("\t") for line in handle if line.strip()]
+        except OSError:
+            return 0
+        finally:
+            try:
+                os.remove(printed_file)
+            except OSError:
+                pass
+
+        # a download of separate formats prints its id once per file; the last file wins
+        files = {}
+        for head, _, printed_path in lines:
+            parts = head.split()
+            if len(parts) >= 2:
+                files[make_archive_id(parts[0], parts[1])] = path or printed_path or None
+        for archive_id, file_path in files.items():
+            self.add(archive_id, url if len(files) == 1 else None, output_dir, format_str, file_path)
+        return len(files)
+
+    def import_file(self, path: str) -> int:
+        """Import a yt-dlp --download-archive text file. Returns the number of lines read."""
+        rows = []
+        with open(path, encoding="utf-8", errors="replace") as handle:
+            for line in handle:
+                parts = line.split()
+                if len(parts) >= 2:
+                    rows.append((make_archive_id(parts[0], parts[1]), time.time()))
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany("INSERT OR IGNORE INTO archive (id, added) VALUES (?, ?)", rows)
+        return len(rows)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM archive").fetchone()[0]
+
+    def _db(self) -> "sqlite3.Connection":
+        """Open the database on first use. Caller holds the lock."""
+        if self._conn is None:
+            import sqlite3
+
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS archive (id TEXT PRIMARY KEY, added REAL)"
+                )
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, id TEXT)"
+                )
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS files (id TEXT, folder TEXT, format TEXT, path TEXT, "
+                    "PRIMARY KEY (id, folder, format))"
+                )
+        return self._conn
+
+
+@process_wide
+def shared_archive() -> DownloadArchive:
+    """Process-wide DownloadArchive shared by every Downloader."""
+    return DownloadArchive()
@@ -0,0 +1,182 @@
+import threading
+import time
+
+from shared import process_wide
+
+# relative change below which a lower share is not pushed to a running job
+RATE_DECREASE_TOLERANCE = 0.05
+# relative change a higher share needs before it is pushed (restarts are not free)
+RATE_INCREASE_STEP      = 0.15
+# a job measured below this fraction of its share is treated as source-limited
+UNDERUSE_RATIO          = 0.8
+# a source-limited job is capped at its measured speed times this headroom;
+# must stay above 1 / UNDERUSE_RATIO or capped jobs would flip back every round
+DEMAND_HEADROOM         = 1.5
+SPEED_SMOOTHING         = 0.3
+# speeds measured right after a limit changes (or a process restarts) are not representative
+SPEED_WARMUP_SECONDS    = 4.0
+REBALANCE_INTERVAL_SECONDS = 3.0
+
+BANDWIDTH_CHOICES = {
+    "unlimited": 0,
+    "1 MiB/s":   1 * 1024 * 1024,
+    "2 MiB/s":   2 * 1024 * 1024,
+    "5 MiB/s":   5 * 1024 * 1024,
+    "10 MiB/s":  10 * 1024 * 1024,
+    "25 MiB/s":  25 * 1024 * 1024,
+    "50 MiB/s":  50 * 1024 * 1024,
+}
+
+
+class RateLease:
+    """One running job's share of a BandwidthBudget.
+
+    `rate` is the limit currently applied to the job in bytes/s (None when the
+    budget is unlimited); `on_change(rate)` is called when it is moved.
+    """
+
+    __slots__ = ("weight", "rate", "measured", "changed_at", "on_change")
+
+    def __init__(self, weight: float, on_change=None):
+        self.weight     = weight
+        self.rate       = None
+        self.measured   = None
+        self.changed_at = time.monotonic()
+        self.on_change  = on_change
+
+    def _set_rate(self, rate: int | None):
+        self.rate       = rate
+        self.measured   = None
+        self.changed_at = time.monotonic()
+
+
+class BandwidthBudget:
+    """Splits one total download rate across all running jobs by weighted max-min fairness.
+
+    Each job holds a RateLease and is limited by yt-dlp's own rate limiter, so the
+    budget only has to decide the numbers. Shares are recomputed when a job starts
+    or finishes, when the total changes, and every few seconds from the measured
+    speeds: a job that cannot use its share (slow server) is capped just above
+    what it achieves and the remainder goes to the others. Lower shares are always
+    pushed before the total could be exceeded by more than RATE_DECREASE_TOLERANCE;
+    a yt-dlp process may keep its old limit a while, since restarting it is not
+    free (see Downloader._apply_rate).
+    """
+
+    def __init__(self, total_rate: float = 0):
+        self._total         = total_rate
+        self._leases        = []
+        self._lock          = threading.Lock()
+        self._rebalanced_at = 0.0
+
+    @property
+    def total_rate(self) -> float:
+        return self._total
+
+    def set_total_rate(self, total_rate: float):
+        """Change the budget (0 = unlimited) and push the new shares to running jobs."""
+        with self._lock:
+            self._total = total_rate
+            changes = self._rebalance()
+        self._notify(changes)
+
+    def acquire(self, weight: float = 1.0, on_change=None) -> RateLease:
+        """Register a job that is starting; its initial limit is `lease.rate`."""
+        lease = RateLease(max(weight, 0.01), on_change)
+        with self._lock:
+            self._leases.append(lease)
+            changes = self._rebalance(initial=lease)
+        self._notify(changes)
+        return lease
+
+    def release(self, lease: RateLease):
+        with self._lock:
+            try:
+                self._leases.remove(lease)
+            except ValueError:
+                return
+            changes = self._rebalance()
+        self._notify(changes)
+
+    def report(self, lease: RateLease, speed: float | None):
+        """Feed a measured speed (bytes/s) from the job's progress output."""
+        if speed is None:
+            return
+        with self._lock:
+            if time.monotonic() - lease.changed_at < SPEED_WARMUP_SECONDS:
+                return
+            if lease.measured is None:
+                lease.measured = speed
+            else:
+                lease.measured += SPEED_SMOOTHING * (speed - lease.measured)
+            if time.monotonic() - self._rebalanced_at < REBALANCE_INTERVAL_SECONDS:
+                return
+            changes = self._rebalance()
+        self._notify(changes)
+
+    # helpers
+
+    def _demand(self, lease: RateLease) -> float | None:
+        """What a lease can use: None (unbounded) unless it is clearly source-limited."""
+        if lease.rate and lease.measured is not None and lease.measured < UNDERUSE_RATIO * lease.rate:
+            return lease.measured * DEMAND_HEADROOM
+        return None
+
+    def _shares(self) -> dict:
+        """Weighted water-filling of the total over the leases. Caller holds the lock."""
+        shares = {}
+        remaining = self._total
+        pending = list(self._leases)
+        demands = {id(lease): self._demand(lease) for lease in pending}
+        while pending:
+            unit = remaining / sum(lease.weight for lease in pending)
+            capped = [
+                lease for lease in pending
+                if demands[id(lease)] is not None and demands[id(lease)] <= unit * lease.weight
+            ]
+            if not capped:
+                for lease in pending:
+                    shares[id(lease)] = unit * lease.weight
+                break
+            for lease in capped:
+                shares[id(lease)] = demands[id(lease)]
+                remaining -= demands[id(lease)]
+                pending.remove(lease)
+        return shares
+
+    def _rebalance(self, initial: RateLease | None = None) -> list:
+        """Recompute shares; return (lease, rate) pairs to notify. Caller holds the lock."""
+        self._rebalanced_at = time.monotonic()
+        shares = self._shares() if self._total else {}
+        changes = []
+        for lease in self._leases:
+            rate = max(1, int(shares[id(lease)])) if self._total else None
+            if lease is initial:
+                lease._set_rate(rate)
+                continue
+            if not self._should_apply(lease.rate, rate):
+                continue
+            lease._set_rate(rate)
+            if lease.on_change:
+                changes.append((lease, rate))
+        return changes
+
+    @staticmethod
+    def _should_apply(old: float | None, new: float | None) -> bool:
+        if old is None or new is None:
+            return old != new
+        if new < old:
+            return old - new > RATE_DECREASE_TOLERANCE * old
+        return new - old > RATE_INCREASE_STEP * old
+
+    @staticmethod
+    def _notify(changes: list):
+        """Tell jobs about their new limits, outside the lock."""
+        for lease, rate in changes:
+            lease.on_change(rate)
+
+
+@process_wide
+def shared_bandwidth_budget() -> BandwidthBudget:
+    """Process-wide BandwidthBudget shared by every Downloader."""
+    return BandwidthBudget()
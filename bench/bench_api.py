@@ -0,0 +1,147 @@
+"""Local job API benchmark: a stand-alone client against an in-process ApiServer.
+
+Downloads run through bench/fake_ytdlp.py, so nothing leaves the machine. The
+client submits jobs over HTTP, follows them on the server-sent event stream,
+cancels one and lists the rest, then reports:
+
+    - submit / list / cancel request latency (p50 / p95)
+    - events received and how many progress ticks the stream coalesced
+    - lag between a job finishing and its final state arriving on the stream
+
+    python bench/bench_api.py [--jobs 8] [--workers 4] [--progress-rate 2000] [--duration 2]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from api_server import ApiServer, JobApi  # noqa: E402
+from bench_gui import make_factory, make_launcher, percentile  # noqa: E402
+from jobs import JobQueue, FINAL_STATES, JOB_CANCELLED  # noqa: E402
+
+
+class Client:
+    """Minimal API client: what another local tool would write."""
+
+    def __init__(self, url: str, token: str):
+        self.url   = url
+        self.token = token
+
+    def call(self, method: str, path: str, body: dict | None = None) -> tuple[int, dict, float]:
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(f"{self.url}{path}", data=data, method=method)
+        request.add_header("Authorization", f"Bearer {self.token}")
+        if data is not None:
+            request.add_header("Content-Type", "application/json")
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                status, payload = response.status, json.load(response)
+        except urllib.error.HTTPError as e:
+            status, payload = e.code, json.load(e)
+        return status, payload, time.perf_counter() - started
+
+    def events(self, path: str = "/events"):
+        """Yield (event, payload) pairs from a server-sent event stream."""
+        request = urllib.request.Request(f"{self.url}{path}")
+        request.add_header("Authorization", f"Bearer {self.token}")
+        with urllib.request.urlopen(request, timeout=60) as response:
+            name = None
+            for raw in response:
+                line = raw.decode().rstrip("\n")
+                if line.startswith("event: "):
+                    name = line[len("event: "):]
+                elif line.startswith("data: ") and name:
+                    yield name, json.loads(line[len("data: "):])
+                    name = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=8, help="jobs to submit")
+    parser.add_argument("--workers", type=int, default=4, help="parallel downloads")
+    parser.add_argument("--progress-rate", type=int, default=2000, help="progress lines/s per job")
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds each fake download runs")
+    args = parser.parse_args()
+
+    os.environ["FAKE_YTDLP_PROGRESS_RATE"] = str(args.progress_rate)
+    os.environ["FAKE_YTDLP_LOG_RATE"] = "20"
+    os.environ["FAKE_YTDLP_DURATION"] = str(args.duration)
+
+    with tempfile.TemporaryDirectory(prefix="yt-dlp-gui-api-") as workdir:
+        queue = JobQueue(workers=args.workers, downloader_factory=make_factory(make_launcher(workdir), workdir))
+        done_at = {}
+        queue.on_state = lambda job: done_at.setdefault(job.id, time.perf_counter()) if job.done else None
+        ticks = [0]
+        queue.on_progress = lambda job, line: ticks.__setitem__(0, ticks[0] + 1)
+
+        server = ApiServer(JobApi(queue, {"output_dir": workdir}), info_path=None)
+        server.start()
+        client = Client(server.url, server.token)
+
+        counts = {}
+        arrived_at = {}
+
+        def follow():
+            for name, payload in client.events():
+                counts[name] = counts.get(name, 0) + 1
+                if name == "state" and payload["status"] in FINAL_STATES:
+                    arrived_at[payload["id"]] = time.perf_counter()
+                    if len(arrived_at) == args.jobs:
+                        return
+
+        follower = threading.Thread(target=follow, daemon=True)
+        follower.start()
+        time.sleep(0.2)  # let the stream attach before the first job starts
+
+        assert client.call("GET", "/jobs", None)[0] == 200
+        assert client.call("POST", "/jobs", {"url": "ftp://nope"})[0] == 400
+        unauthorized = Client(server.url, "wrong").call("GET", "/jobs")[0]
+        assert unauthorized == 401, unauthorized
+
+        submit, ids = [], []
+        for i in range(args.jobs):
+            status, body, elapsed = client.call("POST", "/jobs", {"url": f"https://fake.invalid/v{i}"})
+            assert status == 201, body
+            submit.append(elapsed)
+            ids.append(body["job"]["id"])
+
+        status, body, cancel_latency = client.call("POST", f"/jobs/{ids[-1]}/cancel")
+        assert status == 200, body
+        lists = []
+        while queue.active():
+            lists.append(client.call("GET", "/jobs")[2])
+            time.sleep(0.05)
+        follower.join(timeout=10)
+
+        status, body, _ = client.call("GET", f"/jobs/{ids[-1]}")
+        assert body["job"]["status"] == JOB_CANCELLED, body
+        server.stop()
+
+    lag = [arrived_at[job_id] - done_at[job_id] for job_id in ids if job_id in arrived_at]
+    rows = {
+        "submit p50 ms": percentile(submit, 50) * 1000,
+        "submit p95 ms": percentile(submit, 95) * 1000,
+        "list p50 ms": percentile(lists, 50) * 1000,
+        "list p95 ms": percentile(lists, 95) * 1000,
+        "cancel ms": cancel_latency * 1000,
+        "progress ticks": ticks[0],
+        "progress events": counts.get("progress", 0),
+        "state events": counts.get("state", 0),
+        "final-state lag p95 ms": percentile(lag, 95) * 1000,
+    }
+    print(f"jobs={args.jobs} workers={args.workers} progress-rate={args.progress_rate}/s")
+    for name, value in rows.items():
+        print(f"  {name:<24}{value:>10.1f}" if isinstance(value, float) else f"  {name:<24}{value:>10}")
+
+
+if __name__ == "__main__":
+    main()
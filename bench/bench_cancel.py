@@ -0,0 +1,121 @@
+"""Cancellation benchmark: time from Downloader.cancel() until the job and its processes are gone.
+
+Runs bench/fake_ytdlp.py in scenarios that used to outlive a cancel, cancels
+each one mid-attempt and reports, per scenario:
+
+    - cancel -> run() returned (p50 / max ms): when the queue worker is free again
+    - cancel -> process tree gone (p50 / max ms): nothing left in the process group
+    - whether the partial files were removed (.part, or the raw streams and
+      half-written output of a merge)
+
+    python bench/bench_cancel.py [--runs 5] [--settle 0.3]
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_gui import make_factory, make_launcher, percentile  # noqa: E402
+from downloader import IS_WIN  # noqa: E402
+
+SCENARIOS = {
+    "downloading":            {"FAKE_YTDLP_DURATION": "30"},
+    "stalled, silent":        {"FAKE_YTDLP_STALL": "30"},
+    "ignores SIGTERM":        {"FAKE_YTDLP_STALL": "30", "FAKE_YTDLP_IGNORE_TERM": "1"},
+    "ignores SIGTERM + child": {"FAKE_YTDLP_STALL": "30", "FAKE_YTDLP_IGNORE_TERM": "1", "FAKE_YTDLP_CHILD": "1"},
+    "merging":                {"FAKE_YTDLP_STALL": "30", "FAKE_YTDLP_MERGING": "1"},
+}
+GIVE_UP_SECONDS = 10.0
+
+
+def tree_alive(pid: int) -> bool:
+    """True while a process of group `pid` is still running (zombies waiting for init do not count)."""
+    if IS_WIN:
+        return False  # taskkill /T already waited for the tree
+    if not os.path.isdir("/proc"):
+        try:
+            os.killpg(pid, 0)
+            return True
+        except ProcessLookupError:
+            return False
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as handle:
+                fields = handle.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if fields[2] == str(pid) and fields[0] != "Z":
+            return True
+    return False
+
+
+def cancel_once(factory, workdir: str, env: dict, settle: float) -> tuple[float, float, list[str]]:
+    """One cancelled download; returns (seconds until run() returned, until the tree was gone, files left)."""
+    destination = os.path.join(workdir, f"fake-{time.monotonic_ns()}.mp4")
+    os.environ.update(env, FAKE_YTDLP_DESTINATION=destination)
+    downloader = factory(workdir)
+    downloader.use_archive = False
+    announced = threading.Event()
+
+    def on_progress(item):
+        if isinstance(item, str) and item.startswith("[download] Destination: "):
+            announced.set()
+
+    runner = threading.Thread(target=downloader.run, args=("https://fake.invalid/v",), kwargs={"on_progress": on_progress})
+    runner.start()
+    if not announced.wait(GIVE_UP_SECONDS):
+        downloader.cancel()
+        runner.join(GIVE_UP_SECONDS)
+        raise RuntimeError("fake yt-dlp never started")
+    time.sleep(settle)
+
+    pid = downloader.process.pid
+    started = time.perf_counter()
+    downloader.cancel()
+    runner.join(GIVE_UP_SECONDS)
+    returned = time.perf_counter() - started
+    while tree_alive(pid) and time.perf_counter() - started < GIVE_UP_SECONDS:
+        time.sleep(0.005)
+    gone = time.perf_counter() - started
+    # a cancelled job leaves nothing named after its destination: no .part, raw stream or merge output
+    left = glob.glob(glob.escape(os.path.splitext(destination)[0]) + ".*")
+    return returned, gone, left
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="cancels per scenario")
+    parser.add_argument("--settle", type=float, default=0.3, help="seconds the attempt runs before the cancel")
+    args = parser.parse_args()
+
+    base_env = {name: os.environ.get(name) for scenario in SCENARIOS.values() for name in scenario}
+    print(f"runs={args.runs} settle={args.settle}s")
+    print(f"  {'scenario':<26}{'return p50':>11}{'max':>8}{'tree p50':>10}{'max':>8}  files removed")
+    with tempfile.TemporaryDirectory(prefix="yt-dlp-gui-cancel-") as workdir:
+        factory = make_factory(make_launcher(workdir), workdir)
+        for name, env in SCENARIOS.items():
+            for variable, value in base_env.items():
+                if value is None:
+                    os.environ.pop(variable, None)
+                else:
+                    os.environ[variable] = value
+            results = [cancel_once(factory, workdir, env, args.settle) for _ in range(args.runs)]
+            returned = [r[0] * 1000 for r in results]
+            gone = [r[1] * 1000 for r in results]
+            removed = sum(not r[2] for r in results)
+            print(
+                f"  {name:<26}{percentile(returned, 50):>9.0f}ms{max(returned):>6.0f}ms"
+                f"{percentile(gone, 50):>8.0f}ms{max(gone):>6.0f}ms  {removed}/{len(results)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
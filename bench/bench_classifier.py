@@ -0,0 +1,172 @@
+"""Microbenchmark: cost of reading and classifying yt-dlp output in the attempt reader.
+
+Compares the previous reader (text-mode pipe read line by line, then lower()
+plus one `in` scan per failure and throttle marker on every log line) with the
+current one (binary pipe split in chunks, OutputClassifier's word index over
+the raw bytes). Reports:
+
+    - classify only: ns per log line for both, on the same lines
+    - the same with 40 extra markers, to show what new patterns cost each way
+    - reader: lines/s through a real pipe, progress ticks included
+
+    python bench/bench_classifier.py [--lines 300000] [--error-share 0.01]
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from output_classifier import OutputClassifier, iter_lines, PIPE_ENCODING  # noqa: E402
+from progress import PROGRESS_PREFIX, decode_progress  # noqa: E402
+
+PROGRESS_PREFIX_BYTES = PROGRESS_PREFIX.encode()
+CAT_CODE = "import shutil, sys; shutil.copyfileobj(open(sys.argv[1], 'rb'), sys.stdout.buffer)"
+
+
+# the previous implementation, kept verbatim as the baseline
+
+LEGACY_FAILURE_MARKERS = (
+    ("signature",   ("signature solving failed", "n challenge solving failed")),
+    ("images-only", ("only images are available",)),
+    ("sign-in",     ("sign in to confirm", "confirm you're not a bot")),
+    ("unavailable", ("private video", "this video has been removed", "unsupported url")),
+)
+LEGACY_THROTTLE_MARKERS = ("http error 429", "too many requests", "retrying fragment", "http error 503")
+
+
+def legacy_classify_line(line: str, marker_table=LEGACY_FAILURE_MARKERS) -> str | None:
+    lowered = line.lower()
+    for kind, markers in marker_table:
+        for marker in markers:
+            if marker in lowered:
+                return kind
+    return None
+
+
+def legacy_throttled(line: str) -> bool:
+    lowered = line.lower()
+    return any(marker in lowered for marker in LEGACY_THROTTLE_MARKERS)
+
+
+def legacy_reader(path: str) -> int:
+    process = subprocess.Popen(
+        [sys.executable, "-c", CAT_CODE, path], stdout=subprocess.PIPE, text=True, bufsize=1
+    )
+    count = 0
+    for line in process.stdout:
+        count += 1
+        if line.startswith(PROGRESS_PREFIX):
+            decode_progress(line)
+            continue
+        line = line.rstrip()
+        legacy_classify_line(line)
+        legacy_throttled(line)
+    process.wait()
+    return count
+
+
+def current_reader(path: str, classifier: OutputClassifier) -> int:
+    process = subprocess.Popen([sys.executable, "-c", CAT_CODE, path], stdout=subprocess.PIPE)
+    classify = classifier.classify
+    count = 0
+    for raw in iter_lines(process.stdout):
+        count += 1
+        if raw.startswith(PROGRESS_PREFIX_BYTES):
+            decode_progress(raw.decode(PIPE_ENCODING, "replace"))
+            continue
+        classify(raw)
+        raw.decode(PIPE_ENCODING, "replace").rstrip()
+    process.wait()
+    return count
+
+
+def make_lines(count: int, error_share: float) -> list[str]:
+    rng = random.Random(7)
+    errors = [
+        "ERROR: [youtube] abc: Sign in to confirm you're not a bot",
+        "WARNING: [youtube] abc: n challenge solving failed: Some formats may be missing",
+        "[download] Got error: HTTP Error 503: Service Unavailable. Retrying fragment 12 (1/10)...",
+        "ERROR: [youtube] abc: Private video. Sign in if you've been granted access",
+    ]
+    logs = [
+        "[hlsnative] Downloading m3u8 manifest",
+        "[download] Destination: /home/user/Downloads/Some fairly long video title [abc].f137.mp4",
+        "[info] abc: Downloading 1 format(s): 137+140",
+        "[youtube] abc: Downloading tv client config",
+    ]
+    lines = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < error_share:
+            lines.append(rng.choice(errors))
+        elif roll < 0.1:
+            lines.append(rng.choice(logs))
+        else:
+            lines.append(f"{PROGRESS_PREFIX}downloading\t{i * 1024}\t734003200\t5242880.0\t120\tSome fairly long video title")
+    return lines
+
+
+def best_of(repeats: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=300_000, help="output lines per run")
+    parser.add_argument("--error-share", type=float, default=0.01, help="share of lines carrying a marker")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines, args.error_share)
+    log_lines = [line for line in lines if not line.startswith(PROGRESS_PREFIX)]
+    raw_log_lines = [line.encode() for line in log_lines]
+    classifier = OutputClassifier()
+    extra_markers = [(f"extra-{i}", (f"made-up extractor error number {i}",)) for i in range(40)]
+    extended = OutputClassifier()
+    for kind, markers in extra_markers:
+        extended.register(kind, *markers)
+    legacy_extended = LEGACY_FAILURE_MARKERS + tuple(extra_markers)
+
+    def legacy_classify(marker_table=LEGACY_FAILURE_MARKERS):
+        for line in log_lines:
+            legacy_classify_line(line, marker_table)
+            legacy_throttled(line)
+
+    def current_classify(target=classifier):
+        classify = target.classify
+        for raw in raw_log_lines:
+            classify(raw)
+
+    per_line = 1e9 / len(log_lines)
+    print(f"lines={args.lines} log lines={len(log_lines)} error share={args.error_share}")
+    print("  classify only (ns / log line)")
+    print(f"    {'legacy lower() + scans':<30}{best_of(args.repeats, legacy_classify) * per_line:>10.0f}")
+    print(f"    {'  + 40 markers':<30}{best_of(args.repeats, lambda: legacy_classify(legacy_extended)) * per_line:>10.0f}")
+    print(f"    {'word index':<30}{best_of(args.repeats, current_classify) * per_line:>10.0f}")
+    print(f"    {'  + 40 markers':<30}{best_of(args.repeats, lambda: current_classify(extended)) * per_line:>10.0f}")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".log", delete=False, encoding="utf-8") as handle:
+        handle.write("\n".join(lines) + "\n")
+        path = handle.name
+    try:
+        print("  reader through a pipe (lines/s)")
+        legacy = best_of(args.repeats, lambda: legacy_reader(path))
+        current = best_of(args.repeats, lambda: current_reader(path, classifier))
+        print(f"    {'text pipe, line by line':<30}{args.lines / legacy:>10.0f}")
+        print(f"    {'binary pipe, chunked':<30}{args.lines / current:>10.0f}")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
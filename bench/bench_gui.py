@@ -0,0 +1,247 @@
+"""GUI throughput benchmark: how the App event loop copes with a flood of yt-dlp output.
+
+Points every Downloader at bench/fake_ytdlp.py, queues a few jobs and measures,
+while they run:
+
+    - Tk callback latency: lateness of a 16 ms `after` probe (p50 / p95 / max)
+    - frame stalls: probe ticks that were late by more than --stall-ms
+    - CPU: process time / wall time of the GUI process (the stubs are excluded)
+    - memory: peak RSS (and traced Python heap with --trace-heap)
+
+`--ingest per-line` rewires the App to the old path (one `after(0, ...)` per
+output line) so it can be compared with the default coalesced inbox.
+`--headless` skips Tk and only measures raw engine throughput (lines/s).
+
+    python bench/bench_gui.py [--ingest coalesced|per-line] [--jobs 2] [--progress-rate 2000]
+                              [--log-rate 200] [--duration 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from archive import DownloadArchive  # noqa: E402
+from downloader import Downloader, IS_WIN  # noqa: E402
+from fragment_tuner import FragmentTuner  # noqa: E402
+from info_cache import InfoCache  # noqa: E402
+from jobs import JobQueue  # noqa: E402
+from metrics import Metrics  # noqa: E402
+from strategy_memory import StrategyMemory  # noqa: E402
+
+FAKE_YTDLP = os.path.join(ROOT, "bench", "fake_ytdlp.py")
+PROBE_INTERVAL_MS = 16
+
+
+def make_launcher(directory: str, script: str = FAKE_YTDLP, name: str = "yt-dlp") -> str:
+    """Write an executable wrapper `name` that runs `script` (fake_ytdlp.py) with this interpreter."""
+    if IS_WIN:
+        path = os.path.join(directory, f"{name}.cmd")
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(f'@"{sys.executable}" "{script}" %*\r\n')
+    else:
+        path = os.path.join(directory, name)
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+        os.chmod(path, 0o755)
+    return path
+
+
+def make_factory(launcher: str, workdir: str):
+    """Downloader factory with isolated caches so runs don't touch the user's state."""
+    archive = DownloadArchive(":memory:")
+    info_cache = InfoCache(os.path.join(workdir, "info"))
+    memory = StrategyMemory(None)
+    tuner = FragmentTuner(None)
+    metrics = Metrics(None, None)
+
+    def factory(output_dir):
+        downloader = Downloader(
+            output_dir or workdir,
+            strategy_memory=memory,
+            info_cache=info_cache,
+            archive=archive,
+            fragment_tuner=tuner,
+            metrics=metrics,
+        )
+        downloader.ytdlp_path = launcher
+        downloader.use_archive = False
+        return downloader
+
+    return factory
+
+
+def peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class LoopProbe:
+    """Measures how late a fixed-interval `after` callback fires on the Tk loop."""
+
+    def __init__(self, widget, interval_ms: int = PROBE_INTERVAL_MS):
+        self.widget   = widget
+        self.interval = interval_ms / 1000.0
+        self.lateness = []
+        self._expected = 0.0
+        self._running  = False
+
+    def start(self):
+        self._running = True
+        self._expected = time.perf_counter() + self.interval
+        self.widget.after(int(self.interval * 1000), self._tick)
+
+    def stop(self):
+        self._running = False
+
+    def _tick(self):
+        now = time.perf_counter()
+        self.lateness.append(max(0.0, now - self._expected))
+        if self._running:
+            self._expected = now + self.interval
+            self.widget.after(int(self.interval * 1000), self._tick)
+
+
+def run_headless(args, factory) -> dict:
+    lines = [0]
+    queue = JobQueue(
+        workers=args.jobs,
+        on_progress=lambda job, line: lines.__setitem__(0, lines[0] + 1),
+        downloader_factory=factory,
+    )
+    started_wall, started_cpu = time.perf_counter(), time.process_time()
+    for i in range(args.jobs):
+        queue.submit(f"https://fake.invalid/v{i}")
+    while queue.active():
+        time.sleep(0.05)
+    wall = time.perf_counter() - started_wall
+    return {
+        "lines": lines[0],
+        "lines/s": lines[0] / wall,
+        "wall s": wall,
+        "cpu %": 100 * (time.process_time() - started_cpu) / wall,
+    }
+
+
+def run_gui(args, factory) -> dict:
+    import tkinter
+    import main
+
+    try:
+        app = main.App()
+    except tkinter.TclError as e:
+        raise SystemExit(f"GUI benchmark needs a display ({e}); use --headless") from None
+    app.queue.downloader_factory = factory
+    app.queue.set_workers(args.jobs)
+
+    if args.ingest == "per-line":
+        app.queue.on_progress = lambda job, line: app.after(0, app._on_progress, job, line)
+        app.queue.on_state = lambda job: app.after(0, app._on_job_state, job)
+
+    delivered = [0]
+    on_progress = app.queue.on_progress
+
+    def counting(job, line):
+        delivered[0] += 1
+        on_progress(job, line)
+
+    app.queue.on_progress = counting
+
+    probe = LoopProbe(app)
+    result = {}
+
+    def start():
+        result["started_wall"] = time.perf_counter()
+        result["started_cpu"] = time.process_time()
+        probe.start()
+        for i in range(args.jobs):
+            app.queue.submit(f"https://fake.invalid/v{i}")
+        app.after(200, poll)
+
+    def poll():
+        if app.queue.active():
+            app.after(200, poll)
+            return
+        # let already-scheduled callbacks drain before stopping the clock
+        app.after(500, finish)
+
+    def finish():
+        probe.stop()
+        result["wall"] = time.perf_counter() - result["started_wall"]
+        result["cpu"] = time.process_time() - result["started_cpu"]
+        app.quit()
+
+    app.after(300, start)
+    app.mainloop()
+    app.destroy()
+
+    lateness_ms = [value * 1000 for value in probe.lateness]
+    return {
+        "lines": delivered[0],
+        "lines/s": delivered[0] / result["wall"],
+        "wall s": result["wall"],
+        "cpu %": 100 * result["cpu"] / result["wall"],
+        "latency p50 ms": statistics.median(lateness_ms) if lateness_ms else 0.0,
+        "latency p95 ms": percentile(lateness_ms, 95),
+        "latency max ms": max(lateness_ms, default=0.0),
+        "stalls": sum(1 for value in lateness_ms if value > args.stall_ms),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ingest", choices=("coalesced", "per-line"), default="coalesced",
+                        help="GUI ingestion path to measure")
+    parser.add_argument("--jobs", type=int, default=2, help="parallel fake downloads")
+    parser.add_argument("--progress-rate", type=int, default=2000, help="progress lines/s per job")
+    parser.add_argument("--log-rate", type=int, default=200, help="log lines/s per job")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds each job emits for")
+    parser.add_argument("--stall-ms", type=float, default=100.0, help="lateness counted as a stall")
+    parser.add_argument("--headless", action="store_true", help="skip Tk, measure engine throughput")
+    parser.add_argument("--trace-heap", action="store_true", help="also report tracemalloc peak (slower)")
+    args = parser.parse_args()
+
+    os.environ["FAKE_YTDLP_PROGRESS_RATE"] = str(args.progress_rate)
+    os.environ["FAKE_YTDLP_LOG_RATE"] = str(args.log_rate)
+    os.environ["FAKE_YTDLP_DURATION"] = str(args.duration)
+
+    with tempfile.TemporaryDirectory(prefix="yt-dlp-gui-bench-") as workdir:
+        factory = make_factory(make_launcher(workdir), workdir)
+        if args.trace_heap:
+            tracemalloc.start()
+        stats = run_headless(args, factory) if args.headless else run_gui(args, factory)
+        if args.trace_heap:
+            stats["heap peak MiB"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+
+    rss = peak_rss_mb()
+    if rss is not None:
+        stats["rss peak MiB"] = rss
+
+    mode = "headless" if args.headless else f"gui/{args.ingest}"
+    print(
+        f"mode={mode} jobs={args.jobs} progress_rate={args.progress_rate} "
+        f"log_rate={args.log_rate} duration={args.duration}s"
+    )
+    for key, value in stats.items():
+        print(f"  {key:<16}{value:>12.1f}" if isinstance(value, float) else f"  {key:<16}{value:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Pipeline benchmark: a batch with merges inside each download job vs on the post-processing pool.
+
+Runs the same batch of fake downloads (bench/fake_ytdlp.py) that each need a
+merge costing --merge-cpu seconds of CPU, two ways:
+
+    - in-job: yt-dlp merges before its job ends (Downloader.separate_postprocessing
+      off), so a download worker sits on CPU work while the network idles
+    - pipelined: the raw streams go to a PostProcessor (bench/fake_ffmpeg.py does
+      the same CPU work) and the worker starts the next download at once
+
+and reports batch wall time and per-job latency (submit -> finished, p50 / max).
+
+    python bench/bench_pipeline.py [--jobs 8] [--workers 2] [--download 1.0] [--merge-cpu 0.5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_gui import make_factory, make_launcher, percentile  # noqa: E402
+from jobs import JobQueue, JOB_FINISHED  # noqa: E402
+from metrics import Metrics  # noqa: E402
+from postprocess import PostProcessor, default_workers  # noqa: E402
+
+FAKE_FFMPEG = os.path.join(ROOT, "bench", "fake_ffmpeg.py")
+GIVE_UP_SECONDS = 300.0
+
+
+def run_batch(factory, postprocessor, jobs: int, workers: int, tag: str) -> tuple[float, list[float]]:
+    """Queue `jobs` downloads and wait for all of them; returns (wall seconds, per-job seconds)."""
+    submitted = {}
+    latencies = []
+    all_done = threading.Event()
+    lock = threading.Lock()
+
+    def on_state(job):
+        if not job.done:
+            return
+        if job.status != JOB_FINISHED:
+            raise SystemExit(f"job {job.id} ended {job.status}: {job.error}")
+        with lock:
+            latencies.append(time.perf_counter() - submitted[job.id])
+            if len(latencies) == jobs:
+                all_done.set()
+
+    queue = JobQueue(workers=workers, on_state=on_state, downloader_factory=factory, postprocessor=postprocessor)
+    started = time.perf_counter()
+    with lock:
+        for i in range(jobs):
+            job = queue.submit(f"https://fake.invalid/{tag}{i}")
+            submitted[job.id] = time.perf_counter()
+    if not all_done.wait(GIVE_UP_SECONDS):
+        raise SystemExit("batch did not finish")
+    wall = time.perf_counter() - started
+    queue.shutdown(cancel=False)
+    return wall, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=8, help="downloads in the batch")
+    parser.add_argument("--workers", type=int, default=2, help="download workers")
+    parser.add_argument("--post-workers", type=int, default=default_workers(), help="post-processing workers")
+    parser.add_argument("--download", type=float, default=1.0, help="seconds each download takes")
+    parser.add_argument("--merge-cpu", type=float, default=0.5, help="CPU seconds each merge takes")
+    args = parser.parse_args()
+
+    os.environ.update(
+        FAKE_YTDLP_DURATION=str(args.download),
+        FAKE_YTDLP_PROGRESS_RATE="20",
+        FAKE_YTDLP_LOG_RATE="5",
+        FAKE_FFMPEG_SECONDS=str(args.merge_cpu),
+    )
+    print(
+        f"jobs={args.jobs} workers={args.workers} post workers={args.post_workers} "
+        f"download={args.download}s merge={args.merge_cpu}s CPU"
+    )
+    print(f"  {'mode':<12}{'wall':>9}{'job p50':>10}{'max':>8}")
+    with tempfile.TemporaryDirectory(prefix="yt-dlp-gui-pipeline-") as workdir:
+        base_factory = make_factory(make_launcher(workdir), workdir)
+        ffmpeg = make_launcher(workdir, FAKE_FFMPEG, "ffmpeg")
+
+        for mode in ("in-job", "pipelined"):
+            pipelined = mode == "pipelined"
+            os.environ["FAKE_YTDLP_POSTPROCESS"] = "0" if pipelined else str(args.merge_cpu)
+
+            def factory(output_dir, pipelined=pipelined):
+                downloader = base_factory(output_dir)
+                downloader.ffmpeg_path = ffmpeg
+                downloader.separate_postprocessing = pipelined
+                return downloader
+
+            postprocessor = PostProcessor(args.post_workers, metrics=Metrics(None, None))
+            wall, latencies = run_batch(factory, postprocessor, args.jobs, args.workers, mode)
+            print(f"  {mode:<12}{wall:>8.2f}s{percentile(latencies, 50):>9.2f}s{max(latencies):>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
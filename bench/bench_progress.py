@@ -0,0 +1,135 @@
+"""Microbenchmark: per-line cost of the progress protocol.
+
+Compares the old `__SEP__` display-string template (parse_progress/parse_percent,
+run in the Tk thread after the reader's lower() + marker scans) with the numeric
+tab-separated template decoded into a ProgressRecord in the reader thread.
+
+    python bench/bench_progress.py [--lines 200000] [--repeats 15]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from progress import PROGRESS_PREFIX, decode_progress  # noqa: E402
+
+
+# the pre-protocol implementation, kept verbatim as the baseline
+
+def legacy_parse_progress(line: str) -> dict | None:
+    if "__SEP__" not in line:
+        return None
+    parts = [p.strip() for p in line.split("__SEP__")]
+    if len(parts) < 6:
+        return None
+
+    try:
+        percent_value = float(parts[2].replace("%", ""))
+    except ValueError:
+        percent_value = None
+
+    return {
+        "status":  parts[0],
+        "total":   parts[1],
+        "percent": parts[2],
+        "percent_value": percent_value,
+        "speed":   parts[3],
+        "eta":     parts[4],
+        "title":   parts[5],
+    }
+
+
+def legacy_parse_percent(line: str) -> float | None:
+    if "__SEP__" in line:
+        parts = line.split("__SEP__")
+        if len(parts) >= 3:
+            try:
+                return float(parts[2].strip().replace("%", ""))
+            except ValueError:
+                pass
+    m = re.search(r"(\d+\.?\d*)%", line)
+    return float(m.group(1)) if m else None
+
+
+def legacy_line(line: str):
+    """Reader-thread scans plus the Tk-thread parse, as one line cost."""
+    line = line.rstrip()
+    lowered = line.lower()
+    _ = "signature solving failed" in lowered or "n challenge solving failed" in lowered
+    _ = "only images are available" in lowered
+    _ = "sign in to confirm" in lowered or "confirm you're not a bot" in lowered
+    progress = legacy_parse_progress(line)
+    if progress:
+        return progress
+    legacy_parse_percent(line)
+    return None
+
+
+def protocol_line(line: str):
+    if line.startswith(PROGRESS_PREFIX):
+        return decode_progress(line)
+    return None
+
+
+def make_lines(count: int):
+    legacy, protocol = [], []
+    total = 734_003_200
+    for i in range(count):
+        done = total * i // count
+        pct = done * 100.0 / total
+        legacy.append(
+            f"downloading__SEP__ 700.00MiB__SEP__ {pct:5.1f}%__SEP__   12.34MiB/s__SEP__00:{i % 60:02d}"
+            f"__SEP__Some fairly long video title - part {i % 7}\n"
+        )
+        protocol.append(
+            f"{PROGRESS_PREFIX}downloading\t{done}\t{total}\t12939427.84\t{i % 60}"
+            f"\tSome fairly long video title - part {i % 7}\n"
+        )
+    return legacy, protocol
+
+
+def time_per_line(func, lines, repeats: int) -> float:
+    """Best-of-N wall time per line, in nanoseconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for line in lines:
+            func(line)
+        best = min(best, time.perf_counter() - started)
+    return best / len(lines) * 1e9
+
+
+def retained_bytes(func, lines) -> float:
+    tracemalloc.start()
+    kept = [func(line) for line in lines]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size / len(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--repeats", type=int, default=15)
+    args = parser.parse_args()
+
+    legacy, protocol = make_lines(args.lines)
+    legacy_ns = time_per_line(legacy_line, legacy, args.repeats)
+    protocol_ns = time_per_line(protocol_line, protocol, args.repeats)
+    legacy_mem = retained_bytes(legacy_parse_progress, legacy[:20_000])
+    protocol_mem = retained_bytes(decode_progress, protocol[:20_000])
+
+    print(f"lines: {args.lines}")
+    print(f"{'path':<28}{'ns/line':>10}{'bytes/sample':>15}")
+    print(f"{'__SEP__ + parse_progress':<28}{legacy_ns:>10.0f}{legacy_mem:>15.0f}")
+    print(f"{'ProgressRecord protocol':<28}{protocol_ns:>10.0f}{protocol_mem:>15.0f}")
+    print(f"speedup: {legacy_ns / protocol_ns:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
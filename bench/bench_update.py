@@ -0,0 +1,142 @@
+"""yt-dlp self-update benchmark against a local stand-in for the GitHub release server.
+
+Serves a random "binary" plus SHA2-256SUMS from 127.0.0.1 with ETag /
+Last-Modified, conditional GETs (304), Range and If-Range, then runs
+YtdlpUpdater through the scenarios that matter and reports bytes transferred
+and wall time for each:
+
+    - cold install
+    - unchanged release (conditional requests only)
+    - download cut off half way, then resumed with a Range request
+    - new release published
+
+    python bench/bench_update.py [--size-mb 20]
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from updater import YtdlpUpdater, UpdateCancelled, YTDLP_SUMS_NAME  # noqa: E402
+
+ASSET = "yt-dlp_linux"
+
+
+class Release:
+    """The files the stand-in server currently publishes."""
+
+    def __init__(self, size: int):
+        self.publish(size)
+
+    def publish(self, size: int):
+        self.binary   = os.urandom(size)
+        digest        = hashlib.sha256(self.binary).hexdigest()
+        self.sums     = f"{digest}  {ASSET}\n{'0' * 64}  yt-dlp.exe\n".encode()
+        self.etag     = f'"{digest[:16]}"'
+        self.modified = formatdate(time.time(), usegmt=True)
+
+
+def make_handler(release: Release):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            name = self.path.rsplit("/", 1)[-1]
+            body = {ASSET: release.binary, YTDLP_SUMS_NAME: release.sums}.get(name)
+            if body is None:
+                self.send_error(404)
+                return
+            etag = f'{release.etag[:-1]}-{name}"'
+
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            start = 0
+            requested = self.headers.get("Range", "")
+            if requested.startswith("bytes=") and self.headers.get("If-Range", etag) == etag:
+                start = int(requested[len("bytes="):].split("-", 1)[0])
+                if start >= len(body):
+                    self.send_error(416)
+                    return
+
+            self.send_response(206 if start else 200)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", release.modified)
+            self.send_header("Content-Length", str(len(body) - start))
+            if start:
+                self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+            self.end_headers()
+            try:
+                self.wfile.write(body[start:])
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the cut-off scenario hangs up half way
+
+    return Handler
+
+
+def run(label: str, updater: YtdlpUpdater, cancel_after: int | None = None):
+    started = time.perf_counter()
+
+    def cancelled():
+        return cancel_after is not None and updater.transferred >= cancel_after
+
+    try:
+        result = updater.update(cancelled=cancelled)
+    except UpdateCancelled:
+        result = "cancelled"
+    elapsed = time.perf_counter() - started
+    print(
+        f"  {label:<22}{result:<11}"
+        f"{updater.transferred / (1024 * 1024):>8.2f} MiB received {elapsed * 1000:>8.1f} ms"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=20.0, help="size of the fake binary")
+    args = parser.parse_args()
+
+    release = Release(int(args.size_mb * 1024 * 1024))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(release))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/download"
+
+    with tempfile.TemporaryDirectory(prefix="yt-dlp-gui-update-") as workdir:
+        target = os.path.join(workdir, "yt-dlp")
+
+        def updater():
+            return YtdlpUpdater(base_url, target, asset=ASSET)
+
+        print(f"binary={args.size_mb:.1f} MiB server={base_url}")
+        assert run("cold install", updater()) == "installed"
+        assert run("unchanged release", updater()) == "current"
+
+        release.publish(len(release.binary))
+        half = len(release.binary) // 2
+        assert run("new release, cut off", updater(), cancel_after=half) == "cancelled"
+        assert run("resumed", updater()) == "installed"
+        with open(target, "rb") as handle:
+            assert handle.read() == release.binary, "resumed binary differs from the release"
+
+        release.publish(len(release.binary))
+        assert run("new release", updater()) == "installed"
+        assert run("unchanged release", updater()) == "current"
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
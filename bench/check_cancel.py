@@ -0,0 +1,111 @@
+"""Cancellation check: a process tree that ignores SIGTERM is gone within CANCEL_DEADLINE.
+
+Unlike the benchmarks this one passes or fails; it exits non-zero when a
+check misses the deadline, leaves files behind or errors out, so it can run in CI:
+
+    - stop_tree() on a process that ignores SIGTERM and has a child doing the same
+    - Downloader.cancel() on bench/fake_ytdlp.py ignoring SIGTERM with such a child;
+      its .part file must be gone
+    - Downloader.cancel() during a merge; both raw streams and the half-written
+      output must be gone
+
+    python bench/check_cancel.py [--runs 3]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_cancel import cancel_once, tree_alive  # noqa: E402
+from bench_gui import make_factory, make_launcher  # noqa: E402
+from cancellation import CANCEL_DEADLINE, popen_kwargs, stop_tree  # noqa: E402
+
+# ignores SIGTERM, starts a child that does too, then says it is ready
+STUBBORN_CODE = (
+    "import signal, subprocess, sys, time\n"
+    "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+    "subprocess.Popen([sys.executable, '-c', "
+    "'import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); time.sleep(3600)'])\n"
+    "print('ready', flush=True)\n"
+    "time.sleep(3600)\n"
+)
+
+
+def check_stop_tree() -> tuple[float, float]:
+    """Seconds until stop_tree()'s thread finished and until the whole group was gone."""
+    process = subprocess.Popen(
+        [sys.executable, "-c", STUBBORN_CODE], stdout=subprocess.PIPE, text=True, **popen_kwargs()
+    )
+    process.stdout.readline()
+    time.sleep(0.1)  # let the child install its handler too
+
+    started = time.perf_counter()
+    stop_tree(process).join(CANCEL_DEADLINE * 2)
+    stopped = time.perf_counter() - started
+    while tree_alive(process.pid) and time.perf_counter() - started < CANCEL_DEADLINE * 2:
+        time.sleep(0.005)
+    gone = time.perf_counter() - started
+    process.stdout.close()
+    return stopped, gone
+
+
+def report(name: str, seconds: list[float]) -> bool:
+    worst = max(seconds)
+    ok = worst < CANCEL_DEADLINE
+    print(f"  {name:<34}{worst * 1000:>7.0f} ms  {'ok' if ok else 'FAIL'}")
+    return ok
+
+
+def check_downloader(name: str, env: dict, runs: int) -> bool:
+    """Cancel `runs` fake downloads configured by `env`; all must stop in time and clean up."""
+    saved = {variable: os.environ.get(variable) for variable in env}
+    try:
+        with tempfile.TemporaryDirectory(prefix="yt-dlp-gui-cancel-") as workdir:
+            factory = make_factory(make_launcher(workdir), workdir)
+            results = [cancel_once(factory, workdir, env, 0.3) for _ in range(runs)]
+    except Exception as e:
+        print(f"  {name:<34}{'':>10}  FAIL ({e})")
+        return False
+    finally:
+        for variable, value in saved.items():
+            if value is None:
+                os.environ.pop(variable, None)
+            else:
+                os.environ[variable] = value
+
+    ok = report(f"{name} returned", [r[0] for r in results])
+    ok &= report(f"{name} tree gone", [r[1] for r in results])
+    left = sorted({os.path.basename(path) for r in results for path in r[2]})
+    print(f"  {name + ' files removed':<34}{'':>10}  {'FAIL ' + ', '.join(left) if left else 'ok'}")
+    return ok and not left
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="cancels per check")
+    args = parser.parse_args()
+
+    print(f"deadline={CANCEL_DEADLINE * 1000:.0f} ms runs={args.runs} (worst run shown)")
+    ok = True
+
+    results = [check_stop_tree() for _ in range(args.runs)]
+    ok &= report("stop_tree() returned", [r[0] for r in results])
+    ok &= report("stop_tree() tree gone", [r[1] for r in results])
+
+    stubborn = {"FAKE_YTDLP_STALL": "30", "FAKE_YTDLP_IGNORE_TERM": "1", "FAKE_YTDLP_CHILD": "1"}
+    ok &= check_downloader("cancel()", stubborn, args.runs)
+    ok &= check_downloader("cancel() merging", dict(stubborn, FAKE_YTDLP_MERGING="1"), args.runs)
+
+    if not ok:
+        print("FAILED")
+        sys.exit(1)
+    print("passed")
+
+
+if __name__ == "__main__":
+    main()
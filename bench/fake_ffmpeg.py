@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Stand-in for the ffmpeg executable, used by the benchmarks.
+
+Burns CPU like a merge or transcode would, reports `-progress pipe:1` blocks
+while it runs, then writes the last argument (the output file) from its
+`-i` inputs. Configured through environment variables:
+
+    FAKE_FFMPEG_SECONDS     CPU seconds per run                    (default 1)
+    FAKE_FFMPEG_DURATION    media seconds the progress counts up to (default 600)
+    FAKE_FFMPEG_EXIT_CODE   exit status; non-zero skips the output  (default 0)
+"""
+import os
+import sys
+import time
+
+REPORT_SECONDS = 0.1
+
+
+def _env(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def main() -> int:
+    seconds  = _env("FAKE_FFMPEG_SECONDS", 1)
+    duration = _env("FAKE_FFMPEG_DURATION", 600)
+    inputs   = [sys.argv[i + 1] for i, arg in enumerate(sys.argv[:-1]) if arg == "-i"]
+    output   = sys.argv[-1]
+
+    started = time.process_time()
+    wall_started = time.monotonic()
+    next_report = 0.0
+    while True:
+        used = time.process_time() - started
+        if used >= seconds:
+            break
+        if used >= next_report:
+            elapsed = max(time.monotonic() - wall_started, 1e-6)
+            done = duration * used / seconds
+            sys.stdout.write(f"out_time_us={int(done * 1_000_000)}\nspeed={done / elapsed:.1f}x\nprogress=continue\n")
+            sys.stdout.flush()
+            next_report = used + REPORT_SECONDS
+        sum(range(1000))
+
+    exit_code = int(_env("FAKE_FFMPEG_EXIT_CODE", 0))
+    if exit_code:
+        sys.stderr.write(f"{output}: simulated failure\n")
+        return exit_code
+    with open(output, "wb") as target:
+        for path in inputs:
+            with open(path, "rb") as source:
+                target.write(source.read())
+    sys.stdout.write(f"out_time_us={int(duration * 1_000_000)}\nprogress=end\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Stand-in for the yt-dlp executable, used by the benchmarks.
+
+Accepts (and ignores) any yt-dlp arguments and floods stdout with progress ticks
+in the PROGRESS_TEMPLATE format plus plain log lines, at configurable rates.
+Configured through environment variables so Downloader can launch it unchanged:
+
+    FAKE_YTDLP_PROGRESS_RATE   progress lines per second        (default 2000)
+    FAKE_YTDLP_LOG_RATE        log lines per second             (default 200)
+    FAKE_YTDLP_DURATION        seconds to emit for              (default 5)
+    FAKE_YTDLP_TOTAL_BYTES     simulated file size              (default 700 MiB)
+    FAKE_YTDLP_EXIT_CODE       exit status when done            (default 0)
+    FAKE_YTDLP_PLAYLIST_SIZE   entries printed for --flat-playlist (default 100)
+    FAKE_YTDLP_STALL           seconds of silence after extraction (default 0)
+    FAKE_YTDLP_IGNORE_TERM     1 to ignore SIGTERM, like a wedged process (default 0)
+    FAKE_YTDLP_CHILD           1 to start a child that also ignores SIGTERM and keeps
+                               stdout open, like an ffmpeg merge (default 0)
+    FAKE_YTDLP_DESTINATION     file to announce and write a .part file for (default none)
+    FAKE_YTDLP_MERGING         1 to get the DESTINATION from a merge instead: both raw
+                               streams finished, the merge output half-written (default 0)
+    FAKE_YTDLP_POSTPROCESS     CPU seconds of a simulated merge after the download (default 0)
+    FAKE_YTDLP_DROP_STREAM     1 to leave out the last of several requested formats (default 0)
+
+`--print-to-file TEMPLATE FILE` gets one line per downloaded file: "NA\t<path>"
+for templates printing `filepath` (the raw files are created in the -P
+directory, one per id when -f lists several), "Fake <id>" for anything else.
+With `--skip-download` only `format_id` templates are answered: "137+140"
+when -f is a merge selector, "18" otherwise. `--write-info-json` writes a
+small info JSON to the `-o infojson:` path.
+"""
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from progress import PROGRESS_PREFIX  # noqa: E402
+
+TICK_SECONDS = 0.01
+CHILD_CODE   = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); time.sleep(3600)"
+
+
+def _env(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def emit_playlist(size: int):
+    for i in range(size):
+        sys.stdout.write(f"__E__\thttps://fake.invalid/v{i}\tFake\tv{i}\tfake video {i}\n")
+    sys.stdout.flush()
+
+
+def burn_cpu(seconds: float):
+    deadline = time.process_time() + seconds
+    while time.process_time() < deadline:
+        sum(range(1000))
+
+
+def _arg(name: str, default: str | None = None) -> str | None:
+    """Value of the last `name VALUE` pair on the command line (later options win, as in yt-dlp)."""
+    value = default
+    for i, arg in enumerate(sys.argv[:-1]):
+        if arg == name:
+            value = sys.argv[i + 1]
+    return value
+
+
+def _print_targets():
+    """(template, file) of every --print-to-file on the command line."""
+    return [
+        (sys.argv[i + 1], sys.argv[i + 2])
+        for i, arg in enumerate(sys.argv[:-2])
+        if arg == "--print-to-file"
+    ]
+
+
+def write_selection():
+    """Answer --print-to-file for --skip-download: the formats the selector chose."""
+    chosen = "137+140" if "+" in (_arg("-f") or "") else "18"
+    sys.stdout.write(f"[generic] fake: Extracting URL\n[info] fake: Downloading 1 format(s): {chosen}\n")
+    infojson = next((arg[len("infojson:"):] for arg in sys.argv if arg.startswith("infojson:")), None)
+    if "--write-info-json" in sys.argv and infojson:
+        os.makedirs(os.path.dirname(infojson) or ".", exist_ok=True)
+        with open(infojson + ".info.json", "w", encoding="utf-8") as handle:
+            json.dump({"id": "fake", "title": "fake video", "format_id": chosen}, handle)
+    for template, target in _print_targets():
+        if "%(format_id)s" in template:
+            with open(target, "a", encoding="utf-8") as handle:
+                handle.write(f"{chosen}\n")
+
+
+def write_printed_files():
+    """Answer --print-to-file the way yt-dlp does after moving the downloaded files."""
+    stem = os.path.basename(sys.argv[-1].rstrip("/")).replace(".info.json", "") or "fake"
+    directory = _arg("-P", ".")
+    spec = _arg("-f") or ""
+    ids = spec.split(",") if "," in spec else ["18"]
+    if len(ids) > 1 and os.environ.get("FAKE_YTDLP_DROP_STREAM") == "1":
+        ids.pop()
+    formats = [(format_id, "m4a" if i else "mp4") for i, format_id in enumerate(ids)]
+    paths = []
+    for format_id, ext in formats:
+        path = os.path.join(directory, f"{stem}.f{format_id}.{ext}")
+        with open(path, "wb") as handle:
+            handle.write(b"\0" * 65536)
+        paths.append(path)
+
+    for template, target in _print_targets():
+        with open(target, "a", encoding="utf-8") as handle:
+            if "%(filepath)s" in template:
+                handle.writelines(f"NA\t{path}\n" for path in paths)
+            else:
+                handle.write(f"Fake {stem}\n")
+
+
+def emit_download():
+    progress_rate = _env("FAKE_YTDLP_PROGRESS_RATE", 2000)
+    log_rate      = _env("FAKE_YTDLP_LOG_RATE", 200)
+    duration      = _env("FAKE_YTDLP_DURATION", 5)
+    total         = int(_env("FAKE_YTDLP_TOTAL_BYTES", 700 * 1024 * 1024))
+    title         = os.environ.get("FAKE_YTDLP_TITLE", "fake video")
+    destination   = os.environ.get("FAKE_YTDLP_DESTINATION")
+
+    merging       = os.environ.get("FAKE_YTDLP_MERGING") == "1"
+
+    formats = "137+140" if merging else "0"
+    sys.stdout.write(f"[generic] fake: Extracting URL\n[info] fake: Downloading 1 format(s): {formats}\n")
+    if destination and merging:
+        base, ext = os.path.splitext(destination)
+        for path in (f"{base}.f137{ext}", f"{base}.f140.m4a"):
+            sys.stdout.write(f"[download] Destination: {path}\n")
+            with open(path, "wb") as handle:
+                handle.write(b"\0" * 65536)
+        sys.stdout.write(f'[Merger] Merging formats into "{destination}"\n')
+        with open(f"{base}.temp{ext}", "wb") as handle:
+            handle.write(b"\0" * 65536)
+    elif destination:
+        sys.stdout.write(f"[download] Destination: {destination}\n")
+        with open(destination + ".part", "wb") as handle:
+            handle.write(b"\0" * 65536)
+    sys.stdout.flush()
+    if os.environ.get("FAKE_YTDLP_CHILD") == "1":
+        subprocess.Popen([sys.executable, "-c", CHILD_CODE])
+    time.sleep(_env("FAKE_YTDLP_STALL", 0))
+    started = time.monotonic()
+    progress_due = log_due = 0.0
+    sent_progress = sent_log = 0
+
+    while True:
+        elapsed = time.monotonic() - started
+        if elapsed >= duration:
+            break
+        progress_due = progress_rate * elapsed
+        log_due = log_rate * elapsed
+        speed = total / duration
+        chunk = []
+        while sent_progress < progress_due:
+            done = min(int(speed * elapsed), total)
+            eta = int(max(duration - elapsed, 0))
+            chunk.append(f"{PROGRESS_PREFIX}downloading\t{done}\t{total}\t{speed:.2f}\t{eta}\t{title}\n")
+            sent_progress += 1
+        while sent_log < log_due:
+            chunk.append(f"[hlsnative] fragment {sent_log} of many downloaded\n")
+            sent_log += 1
+        if chunk:
+            sys.stdout.write("".join(chunk))
+            sys.stdout.flush()
+        time.sleep(TICK_SECONDS)
+
+    sys.stdout.write(f"{PROGRESS_PREFIX}finished\t{total}\t{total}\tNA\tNA\t{title}\n")
+    sys.stdout.flush()
+    postprocess = _env("FAKE_YTDLP_POSTPROCESS", 0)
+    if postprocess:
+        sys.stdout.write(f'[Merger] Merging formats into "{title}.mp4"\n')
+        sys.stdout.flush()
+        burn_cpu(postprocess)
+    if "--print-to-file" in sys.argv:
+        write_printed_files()
+
+
+def main() -> int:
+    if os.environ.get("FAKE_YTDLP_IGNORE_TERM") == "1":
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    if "--flat-playlist" in sys.argv:
+        emit_playlist(int(_env("FAKE_YTDLP_PLAYLIST_SIZE", 100)))
+        return 0
+    if "--skip-download" in sys.argv:
+        write_selection()
+        return 0
+    emit_download()
+    return int(_env("FAKE_YTDLP_EXIT_CODE", 0))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+import glob
+import os
+import signal
+import subprocess
+import sys
+import threading
+import weakref
+
+IS_WIN = sys.platform == "win32"
+
+# time a process tree gets to exit on SIGTERM / CTRL_BREAK before it is killed
+TERM_GRACE_SECONDS = 0.4
+# time the kill itself gets to take effect before stop_tree() gives up waiting
+KILL_WAIT_SECONDS  = 2.0
+# longest a stop_tree() thread runs, even for a tree that ignores SIGTERM
+CANCEL_DEADLINE    = TERM_GRACE_SECONDS + KILL_WAIT_SECONDS
+
+# what yt-dlp leaves next to a destination while it is not finished
+PARTIAL_SUFFIXES = (".part", ".ytdl")
+PARTIAL_PATTERN  = ".part-Frag*"  # fragments of an HLS / DASH download
+
+_stoppers      = weakref.WeakKeyDictionary()  # Popen -> thread stopping it
+_stoppers_lock = threading.Lock()
+
+
+def popen_kwargs() -> dict:
+    """Platform-specific kwargs for subprocess.Popen.
+
+    No console window, and a process group of its own so stop_tree() can
+    signal everything the process starts.
+    """
+    kw = {}
+    if IS_WIN:
+        si = subprocess.STARTUPINFO()
+        si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        si.wShowWindow = 0
+        kw["startupinfo"] = si
+        kw["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kw["preexec_fn"] = os.setsid
+    return kw
+
+
+# helpers
+
+def _signal_group(process, sig) -> bool:
+    """Send `sig` to the process group of `process` (its own session, see popen_kwargs).
+
+    Returns False once no process of the group is left.
+    """
+    try:
+        os.killpg(process.pid, sig)
+        return True
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+
+
+def _force_kill(process):
+    if IS_WIN:
+        subprocess.run(
+            ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            creationflags=subprocess.CREATE_NO_WINDOW,
+        )
+    else:
+        _signal_group(process, signal.SIGKILL)
+
+
+def terminate_tree(process, grace: float = TERM_GRACE_SECONDS) -> bool:
+    """Stop a process and everything it started, within `grace` + KILL_WAIT_SECONDS.
+
+    Asks politely first (SIGTERM to the group; CTRL_BREAK on Windows) so yt-dlp
+    can close its files, kills the whole group if anything is still alive after
+    `grace`, and reaps the process. Children that outlive their parent (an
+    ffmpeg merge, a stuck extractor helper) are killed with the group either way.
+    Blocks the calling thread; returns True if the kill was needed.
+    """
+    try:
+        if IS_WIN:
+            process.send_signal(signal.CTRL_BREAK_EVENT)
+        elif not _signal_group(process, signal.SIGTERM):
+            process.wait()
+            return False
+    except OSError:
+        pass
+
+    forced = False
+    try:
+        process.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        forced = True
+        _force_kill(process)
+        try:
+            process.wait(timeout=KILL_WAIT_SECONDS)
+        except subprocess.TimeoutExpired:
+            return True
+
+    # the leader is gone; whatever is left of its group (it may hold the output pipe) goes too
+    if not IS_WIN and _signal_group(process, 0):
+        forced = True
+        _signal_group(process, signal.SIGKILL)
+    return forced
+
+
+def stop_tree(process) -> threading.Thread:
+    """Run terminate_tree() for `process` on a background thread and return that thread.
+
+    Safe to call any number of times for the same process: later calls get the
+    thread already stopping it, so a cancel that follows a restart does not
+    signal the group twice or race the first kill.
+    """
+    with _stoppers_lock:
+        thread = _stoppers.get(process)
+        if thread is None:
+            thread = threading.Thread(target=terminate_tree, args=(process,), name="stop-tree", daemon=True)
+            _stoppers[process] = thread
+            thread.start()
+        return thread
+
+
+def remove_partial_files(destinations, stream_ids=()) -> tuple[int, int]:
+    """Delete the unfinished pieces yt-dlp left for `destinations`; the finished files stay.
+
+    Streams downloaded apart, named "<name>.f<id>.<ext>" for an id in
+    `stream_ids`, count as unfinished: yt-dlp deletes them once their merge
+    is done, so any still there belong to a merge that never finished.
+    Returns (files removed, bytes freed).
+    """
+    removed = freed = 0
+    for destination in destinations:
+        base, ext = os.path.splitext(destination)
+        paths = [destination + suffix for suffix in PARTIAL_SUFFIXES]
+        paths.append(f"{base}.temp{ext}")  # ffmpeg output of a merge / fixup in progress
+        paths += glob.glob(glob.escape(destination) + PARTIAL_PATTERN)
+        for format_id in stream_ids:
+            suffix = f".f{format_id}"
+            if base.endswith(suffix):
+                paths.append(destination)
+            else:
+                paths += glob.glob(glob.escape(base + suffix) + ".*")
+        for path in paths:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            removed += 1
+            freed   += size
+    return removed, freed
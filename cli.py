@@ -0,0 +1,366 @@
+"""Headless batch downloads: the same queue and fallback strategies as the app, no display.
+
+    python cli.py URL [URL ...] [-a batch.txt] [-j 4] [--format mp4] [--playlist]
+    python cli.py --serve [-j 4]    # keep running and take jobs from the local API
+
+Every event is one JSON object per line on stdout; the exit code tells the
+overall outcome (see EXIT_*).
+"""
+import argparse
+import json
+import os
+import re
+import signal
+import sys
+import threading
+import time
+
+from downloader import (
+    DEFAULT_OUTPUT_DIR,
+    PRESETS,
+    ENGINES,
+    ENGINE_SUBPROCESS,
+    ENGINE_INPROCESS,
+    binary_available,
+    find_ffmpeg,
+    find_ytdlp,
+    inprocess_available,
+)
+from bandwidth import shared_bandwidth_budget
+from metrics import shared_metrics
+from staging import shared_staging
+from progress import ProgressRecord, STATUS_PROCESSING
+from jobs import (
+    JobQueue,
+    DEFAULT_WORKERS,
+    MAX_WORKERS,
+    JOB_RUNNING,
+    JOB_FAILED,
+    JOB_CANCELLED,
+)
+
+EXIT_OK          = 0    # every job finished or was already in the archive
+EXIT_FAILED      = 1    # at least one job (or playlist listing) failed or was cancelled through the API
+EXIT_USAGE       = 2    # bad arguments (argparse uses the same code)
+EXIT_NO_TOOLS    = 3    # neither the yt-dlp binary nor the yt_dlp package is available
+EXIT_INTERRUPTED = 130  # stopped by Ctrl+C / SIGTERM; running jobs were cancelled
+
+PROGRESS_INTERVAL_SECONDS = 1.0
+POLL_INTERVAL_SECONDS     = 0.1
+CANCEL_GRACE_SECONDS      = 10.0  # how long an interrupt waits for jobs to wind down
+
+URL_PATTERN = re.compile(r"^https?://[^\s]+")
+RATE_UNITS  = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+
+
+# helpers
+
+def parse_rate(value: str) -> int:
+    """`500K`, `2M`, `1.5m` or plain bytes/s -> bytes/s (0 = unlimited)."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([kmgKMG]?)(?:i?B)?(?:/s)?\s*", value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid rate: {value!r}")
+    return int(float(match.group(1)) * RATE_UNITS[match.group(2).lower()])
+
+
+def read_batch_file(path: str) -> list[str]:
+    """URLs from a batch file (`-` = stdin), skipping blank lines and `#` / `;` comments."""
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding="utf-8") as handle:
+            lines = handle.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith(("#", ";"))]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Download with yt-dlp_gui's strategies, without the GUI. "
+        "Writes JSON-lines events to stdout.",
+    )
+    parser.add_argument("urls", nargs="*", metavar="URL", help="video, playlist or channel URLs")
+    parser.add_argument("-a", "--batch-file", action="append", default=[], metavar="FILE",
+                        help="file with one URL per line ('-' for stdin); may be repeated")
+    parser.add_argument("-o", "--output-dir", default=DEFAULT_OUTPUT_DIR,
+                        help=f"download folder (default: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("-f", "--format", choices=list(PRESETS), default="best",
+                        help="format preset (default: best)")
+    parser.add_argument("-j", "--jobs", type=int, default=DEFAULT_WORKERS,
+                        help=f"parallel downloads, 1-{MAX_WORKERS} (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--engine", choices=ENGINES, default=None,
+                        help="download engine (default: subprocess, or in-process without a yt-dlp binary)")
+    parser.add_argument("--playlist", action="store_true",
+                        help="treat URLs as playlists / channels and queue every entry")
+    parser.add_argument("--cookies", metavar="FILE", help="cookies.txt to send")
+    parser.add_argument("--cookies-from-browser", metavar="BROWSER", help="read cookies from a browser")
+    parser.add_argument("--archive", action=argparse.BooleanOptionalAction, default=False,
+                        help="skip videos the download archive has in this folder and format, and record "
+                        "new ones (default: off)")
+    parser.add_argument("--temp-dir", metavar="DIR",
+                        help="keep unfinished downloads (parts, fragments, merges) in DIR, e.g. a fast local "
+                        "disk; finished files are moved to the output folder")
+    parser.add_argument("--limit-rate", type=parse_rate, default=0, metavar="RATE",
+                        help="total download rate shared by all jobs, e.g. 5M (default: unlimited)")
+    parser.add_argument("--progress-interval", type=float, default=PROGRESS_INTERVAL_SECONDS,
+                        metavar="SECONDS", help="minimum time between progress events per job (0 = all)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="also emit yt-dlp's output lines")
+    parser.add_argument("--journal", metavar="FILE",
+                        help="record the batch in FILE; after a crash, rerun with the same FILE to resume it")
+    parser.add_argument("--serve", action="store_true",
+                        help="keep running and accept jobs from the local API until interrupted")
+    return parser
+
+
+class JsonLinesReporter:
+    """Turns JobQueue callbacks into JSON-lines events; safe to call from worker threads.
+
+    Events (all carry `event` and `ts`):
+        state     — a job changed status (queued / running / ...)
+        progress  — throttled download progress of a running job
+        log       — one yt-dlp output line (only with --verbose)
+        result    — a job reached its final status
+        playlist  — a playlist listing started or ended
+        resumed   — with --journal: what was brought back from an interrupted run
+        summary   — last line: counts per status, wall time and the exit code
+    """
+
+    def __init__(self, stream=None, progress_interval: float = PROGRESS_INTERVAL_SECONDS, verbose: bool = False):
+        self.stream            = stream or sys.stdout
+        self.progress_interval = progress_interval
+        self.verbose           = verbose
+        self.results           = {}  # status -> count
+        self.playlist_errors   = 0
+        self.user_cancelled    = 0  # jobs cancelled through the API, not by shutting down
+        self.stopping          = False  # set before the queue shuts down and cancels what runs
+        self._lock             = threading.Lock()
+        self._started          = {}  # job id -> monotonic start
+        self._last_progress    = {}  # job id -> monotonic time of the last progress event
+
+    def emit(self, event: str, **fields):
+        line = json.dumps({"event": event, "ts": round(time.time(), 3), **fields}, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def on_state(self, job):
+        if job.status == JOB_RUNNING:
+            self._started[job.id] = time.monotonic()
+        self.emit("state", job=job.id, url=job.url, status=job.status)
+        if not job.done:
+            return
+
+        started = self._started.pop(job.id, None)
+        self._last_progress.pop(job.id, None)
+        with self._lock:
+            self.results[job.status] = self.results.get(job.status, 0) + 1
+            if job.status == JOB_CANCELLED and not self.stopping:
+                self.user_cancelled += 1
+        self.emit(
+            "result",
+            job=job.id,
+            url=job.url,
+            status=job.status,
+            title=job.title,
+            error=job.error,
+            seconds=round(time.monotonic() - started, 3) if started is not None else None,
+            time_saved=round(job.time_saved, 3),
+        )
+
+    def on_progress(self, job, item):
+        if not isinstance(item, ProgressRecord):
+            if self.verbose:
+                self.emit("log", job=job.id, line=item)
+            return
+
+        now = time.monotonic()
+        if item.status in ("downloading", STATUS_PROCESSING) and now - self._last_progress.get(job.id, 0.0) < self.progress_interval:
+            return
+        self._last_progress[job.id] = now
+        self.emit(
+            "progress",
+            job=job.id,
+            status=item.status,
+            downloaded=item.downloaded,
+            total=item.total,
+            percent=item.percent,
+            speed=item.speed,
+            eta=item.eta,
+            title=item.title,
+        )
+
+    def on_expansion(self, expansion):
+        if expansion.done and expansion.error:
+            with self._lock:
+                self.playlist_errors += 1
+        self.emit(
+            "playlist",
+            url=expansion.url,
+            done=expansion.done,
+            found=expansion.found,
+            skipped=expansion.skipped,
+            error=expansion.error,
+        )
+
+    def reject(self, url: str, error: str):
+        """Report an input that never became a job."""
+        with self._lock:
+            self.results[JOB_FAILED] = self.results.get(JOB_FAILED, 0) + 1
+        self.emit("result", job=None, url=url, status=JOB_FAILED, title=None, error=error, seconds=None, time_saved=None)
+
+    def counts(self) -> dict:
+        with self._lock:
+            return dict(self.results)
+
+    def exit_code(self, interrupted: bool) -> int:
+        if interrupted:
+            return EXIT_INTERRUPTED
+        if self.results.get(JOB_FAILED) or self.playlist_errors or self.user_cancelled:
+            return EXIT_FAILED
+        return EXIT_OK
+
+
+def _pick_engine(requested: str | None, reporter: JsonLinesReporter) -> str | None:
+    """The engine to use, mirroring the app's start-up check; None when nothing can download."""
+    has_binary = binary_available(find_ytdlp())
+    has_package = inprocess_available()
+    if not binary_available(find_ffmpeg()):
+        reporter.emit("warning", message="ffmpeg not found; formats that need merging or conversion will fail")
+
+    if requested == ENGINE_INPROCESS:
+        return ENGINE_INPROCESS if has_package else None
+    if requested == ENGINE_SUBPROCESS:
+        return ENGINE_SUBPROCESS if has_binary else None
+    if has_binary:
+        return ENGINE_SUBPROCESS
+    return ENGINE_INPROCESS if has_package else None
+
+
+def _wait(queue: JobQueue, deadline: float | None = None) -> bool:
+    """Block until the queue has nothing left to do. Returns False on timeout."""
+    while queue.active():
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        time.sleep(POLL_INTERVAL_SECONDS)
+    return True
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    urls = list(args.urls)
+    try:
+        for path in args.batch_file:
+            urls += read_batch_file(path)
+    except OSError as e:
+        parser.error(f"cannot read batch file: {e}")
+    if not urls and not args.serve and not (args.journal and os.path.isfile(args.journal)):
+        parser.error("no URLs given (pass them as arguments or with --batch-file)")
+    if not 1 <= args.jobs <= MAX_WORKERS:
+        parser.error(f"--jobs must be between 1 and {MAX_WORKERS}")
+    if args.cookies and not os.path.isfile(args.cookies):
+        parser.error(f"cookies file not found: {args.cookies}")
+
+    reporter = JsonLinesReporter(progress_interval=args.progress_interval, verbose=args.verbose)
+    engine = _pick_engine(args.engine, reporter)
+    if engine is None:
+        reporter.emit("error", message="yt-dlp not found. Please install it first.")
+        return EXIT_NO_TOOLS
+
+    if args.limit_rate:
+        shared_bandwidth_budget().set_total_rate(args.limit_rate)
+    if args.temp_dir:
+        try:
+            shared_staging().set_temp_dir(args.temp_dir)
+        except OSError as e:
+            parser.error(f"cannot use temp dir: {e}")
+
+    queue = JobQueue(
+        workers=args.jobs,
+        on_progress=reporter.on_progress,
+        on_state=reporter.on_state,
+        on_expansion=reporter.on_expansion,
+    )
+    options = {
+        "output_dir": args.output_dir,
+        "cookies_file": args.cookies,
+        "cookies_browser": None if args.cookies else args.cookies_from_browser,
+        "format_str": PRESETS[args.format],
+        "engine": engine,
+        "use_archive": args.archive,
+    }
+
+    # SIGTERM (e.g. from a job runner) gets the same orderly cancel as Ctrl+C
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    server = None
+    if args.serve:
+        from api_server import ApiServer, JobApi
+
+        defaults = {
+            "output_dir": args.output_dir,
+            "format": args.format,
+            "engine": engine,
+            "use_archive": args.archive,
+        }
+        server = ApiServer(JobApi(queue, defaults))
+        try:
+            server.start()
+        except OSError as e:
+            reporter.emit("error", message=f"local API not started: {e}")
+            return EXIT_FAILED
+        reporter.emit("api", url=server.url, info_path=server.info_path)
+
+    journal = None
+    resumed = set()
+    if args.journal:
+        from job_journal import JobJournal
+
+        journal = JobJournal(os.path.abspath(args.journal))
+        restored = journal.restore(queue)
+        resumed = restored.pop("urls")
+        reporter.emit("resumed", **restored)
+
+    started = time.monotonic()
+    interrupted = False
+    try:
+        for url in urls:
+            if url in resumed:
+                continue  # already back in the queue from the journal
+            if not URL_PATTERN.match(url):
+                reporter.reject(url, "The URL must start with http:// or https://.")
+            elif args.playlist:
+                queue.submit_playlist(url, **options)
+            else:
+                queue.submit(url, **options)
+        if server:
+            while True:  # until Ctrl+C / SIGTERM
+                time.sleep(3600)
+        _wait(queue)
+    except KeyboardInterrupt:
+        # stopping a server is its normal end, not an interruption
+        interrupted = server is None
+        reporter.stopping = True
+        if server:
+            server.stop()
+        queue.shutdown(cancel=True)
+        _wait(queue, deadline=time.monotonic() + CANCEL_GRACE_SECONDS)
+    if journal:
+        journal.close()
+    shared_metrics().flush()
+
+    code = reporter.exit_code(interrupted)
+    counts = reporter.counts()
+    reporter.emit(
+        "summary",
+        jobs=sum(counts.values()),
+        counts=counts,
+        seconds=round(time.monotonic() - started, 3),
+        exit_code=code,
+    )
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
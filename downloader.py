@@ -1,32 +1,67 @@
 import subprocess
 import threading
-import re
 import os
+import re
 import sys
+import time
 import shutil
-import signal
-import shlex
-import hashlib
-import urllib.request
+import importlib.util
 from urllib.parse import urlparse
 
+from strategy_memory import StrategyMemory, shared_strategy_memory
+from info_cache import InfoCache, shared_info_cache, cookie_identity
+from archive import DownloadArchive, shared_archive, make_archive_id, ARCHIVE_PRINT_TEMPLATE
+from progress import (
+    PROGRESS_TEMPLATE,
+    PROGRESS_PREFIX,
+    ProgressRecord,
+    decode_progress,
+    format_bytes,
+    progress_from_hook,
+)
+from cancellation import stop_tree, popen_kwargs, remove_partial_files, KILL_WAIT_SECONDS
+from output_classifier import (
+    OutputClassifier,
+    shared_classifier,
+    iter_lines,
+    is_error_line,
+    PIPE_ENCODING,
+    FAILURE_KINDS,
+    FAIL_SIGNATURE,
+    FAIL_IMAGES_ONLY,
+    FAIL_SIGNIN,
+    FAIL_UNAVAILABLE,
+    FAIL_GEO_BLOCKED,
+    FAIL_RATE_LIMITED,
+    FAIL_DISK_FULL,
+)
+from fragment_tuner import (
+    FragmentTuner,
+    FragmentSample,
+    shared_fragment_tuner,
+    THROTTLE_RESTART_HITS,
+)
+from tool_registry import shared_tool_registry
+
 IS_WIN = sys.platform == "win32"
 
 YOUTUBE_HOST_HINTS  = ("youtube.com", "youtu.be", "music.youtube.com")
-YTDLP_GUI_BIN_DIR   = os.path.join(os.path.expanduser("~"), ".yt-dlp-gui", "bin")
-YTDLP_OVERRIDE_PATH = os.path.join(YTDLP_GUI_BIN_DIR, "yt-dlp.exe")
-YTDLP_LATEST_URL    = "https://github.com/yt-dlp/yt-dlp/releases/latest/download/yt-dlp.exe"
-YTDLP_SHA256_URL    = "https://github.com/yt-dlp/yt-dlp/releases/latest/download/SHA2-256SUMS"
-DOWNLOAD_TIMEOUT_SECONDS = 120
-DOWNLOAD_CHUNK_SIZE = 64 * 1024
-
-PROGRESS_TEMPLATE = (
-    "%(progress.status)s__SEP__"
-    "%(progress._total_bytes_estimate_str)s__SEP__"
-    "%(progress._percent_str)s__SEP__"
-    "%(progress._speed_str)s__SEP__"
-    "%(progress._eta_str)s__SEP__"
-    "%(info.title)s"
+DEFAULT_OUTPUT_DIR  = os.path.join(os.path.expanduser("~"), "Downloads")
+
+# lines naming a file yt-dlp is about to write
+DESTINATION_PREFIXES = ("[download] Destination: ", "[Merger] Merging formats into ")
+# yt-dlp names the formats it picked after this, joined by "+" for a merge
+FORMATS_MARKER       = " format(s): "
+
+# one tab-separated line per entry, title last so tabs inside it survive the split; flat
+# entries carry ie_key, fully extracted ones (nested playlists, some extractors) extractor_key
+PLAYLIST_ENTRY_PREFIX   = "__E__\t"
+PLAYLIST_ENTRY_TEMPLATE = (
+    PLAYLIST_ENTRY_PREFIX
+    + "%(webpage_url,url)s\t"
+    "%(ie_key,extractor_key)s\t"
+    "%(id)s\t"
+    "%(title)s"
 )
 
 PRESETS = {
@@ -36,6 +71,32 @@ PRESETS = {
 }
 DEFAULT_FORMAT = PRESETS["best"]
 
+# presets whose merge / transcode can run on the post-processing pool, with the
+# format spec the job downloads with. A merge keeps the preset's selector: yt-dlp
+# picks the streams, then the job fetches them by format id as separate files
+# (see Downloader._select_streams); mp3 fetches the best audio and transcodes it
+PIPELINED_FORMATS = {
+    PRESETS["best"]: PRESETS["best"],
+    PRESETS["mp4"]:  PRESETS["mp4"],
+    PRESETS["mp3"]:  "-f ba/b",
+}
+
+ENGINE_SUBPROCESS = "subprocess"
+ENGINE_INPROCESS  = "in-process"
+ENGINES = (ENGINE_SUBPROCESS, ENGINE_INPROCESS)
+
+PROGRESS_PREFIX_BYTES       = PROGRESS_PREFIX.encode()
+PLAYLIST_ENTRY_PREFIX_BYTES = PLAYLIST_ENTRY_PREFIX.encode()
+
+# failures after which the current attempt cannot succeed; the process is killed at once
+FATAL_FAILURES = {FAIL_IMAGES_ONLY, FAIL_SIGNIN, FAIL_UNAVAILABLE, FAIL_GEO_BLOCKED, FAIL_DISK_FULL}
+
+# a yt-dlp process is restarted for a new bandwidth share only once it is downloading
+# media, when the share moved by more than RATE_RESTART_CHANGE, and not within
+# RATE_RESTART_INTERVAL_SECONDS of the job's previous restart for its share
+RATE_RESTART_CHANGE           = 0.25
+RATE_RESTART_INTERVAL_SECONDS = 10.0
+
 
 # helpers
 
@@ -46,10 +107,14 @@ def get_base_path() -> str:
     return os.path.abspath(os.path.dirname(__file__))
 
 
+def _bundled_path(name: str) -> str:
+    return os.path.join(get_base_path(), f"{name}.exe" if IS_WIN else name)
+
+
 def _find_binary(name: str, extra_paths: list[str] | None = None) -> str:
     """Locate a binary from the bundle, PATH, then optional OS-specific paths."""
     binary = f"{name}.exe" if IS_WIN else name
-    bundled = os.path.join(get_base_path(), binary)
+    bundled = _bundled_path(name)
     if os.path.isfile(bundled):
         return bundled
 
@@ -72,9 +137,10 @@ def binary_available(path: str | None) -> bool:
     return os.path.isfile(path) or shutil.which(path) is not None
 
 
-def find_ytdlp() -> str:
-    """Locate the yt-dlp binary. Priority: user override -> bundled -> PATH -> common paths."""
-    if IS_WIN and os.path.isfile(YTDLP_OVERRIDE_PATH):
+def _locate_ytdlp() -> str:
+    from updater import YTDLP_OVERRIDE_PATH
+
+    if os.path.isfile(YTDLP_OVERRIDE_PATH):
         return YTDLP_OVERRIDE_PATH
 
     return _find_binary(
@@ -87,29 +153,85 @@ def find_ytdlp() -> str:
     )
 
 
+def _ffmpeg_paths(name: str) -> list[str]:
+    return [
+        os.path.join(os.environ.get("LOCALAPPDATA", ""), "ffmpeg", "bin", f"{name}.exe"),
+        os.path.join(os.environ.get("PROGRAMFILES", ""), "ffmpeg", "bin", f"{name}.exe"),
+    ]
+
+
+def find_ytdlp() -> str:
+    """Locate the yt-dlp binary. Priority: user override -> bundled -> PATH -> common paths.
+
+    The result is cached in the tool registry and revalidated with a stat.
+    """
+    from updater import YTDLP_OVERRIDE_PATH
+
+    return shared_tool_registry().resolve(
+        "yt-dlp", _locate_ytdlp, preferred=(YTDLP_OVERRIDE_PATH, _bundled_path("yt-dlp"))
+    )
+
+
 def find_ffmpeg() -> str:
-    """Locate the ffmpeg binary."""
-    return _find_binary(
+    """Locate the ffmpeg binary (cached in the tool registry)."""
+    return shared_tool_registry().resolve(
         "ffmpeg",
-        extra_paths=[
-            os.path.join(os.environ.get("LOCALAPPDATA", ""), "ffmpeg", "bin", "ffmpeg.exe"),
-            os.path.join(os.environ.get("PROGRAMFILES", ""), "ffmpeg", "bin", "ffmpeg.exe"),
-        ],
+        lambda: _find_binary("ffmpeg", extra_paths=_ffmpeg_paths("ffmpeg")),
+        preferred=(_bundled_path("ffmpeg"),),
     )
 
 
-def _popen_kwargs() -> dict:
-    """Platform-specific kwargs for subprocess.Popen."""
-    kw = {}
-    if IS_WIN:
-        si = subprocess.STARTUPINFO()
-        si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        si.wShowWindow = 0
-        kw["startupinfo"] = si
-        kw["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
-    else:
-        kw["preexec_fn"] = os.setsid
-    return kw
+def find_ffprobe() -> str:
+    """Locate the ffprobe binary (cached in the tool registry)."""
+    return shared_tool_registry().resolve(
+        "ffprobe",
+        lambda: _find_binary("ffprobe", extra_paths=_ffmpeg_paths("ffprobe")),
+        preferred=(_bundled_path("ffprobe"),),
+    )
+
+
+def tool_versions() -> dict:
+    """Versions of yt-dlp, ffmpeg and ffprobe, probing each binary at most once per install."""
+    for find in (find_ytdlp, find_ffmpeg, find_ffprobe):
+        find()
+    registry = shared_tool_registry()
+    return {name: registry.version(name) for name in ("yt-dlp", "ffmpeg", "ffprobe")}
+
+
+def inprocess_available() -> bool:
+    """Return True when the yt_dlp Python package can be imported for the in-process engine."""
+    return importlib.util.find_spec("yt_dlp") is not None
+
+
+def _strategy_client(cmd: list[str]) -> str:
+    """Return the --extractor-args value of a strategy command ("default" if none)."""
+    if "--extractor-args" in cmd:
+        return cmd[cmd.index("--extractor-args") + 1]
+    return "default"
+
+
+def _uses_cookies(cmd: list[str]) -> bool:
+    return "--cookies" in cmd or "--cookies-from-browser" in cmd
+
+
+def _strategy_ruled_out(failures: set[str], cmd: list[str]) -> str | None:
+    """Return why a pending strategy cannot help after `failures`, or None if it still might."""
+    if FAIL_UNAVAILABLE in failures:
+        return "video is private, removed or unsupported"
+    if FAIL_GEO_BLOCKED in failures:
+        return "video is not available in this country"
+    if FAIL_DISK_FULL in failures:
+        return "the disk is full"
+    if FAIL_SIGNIN in failures and not _uses_cookies(cmd):
+        return "sign-in required and this strategy sends no cookies"
+    return None
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
 
 
 def _is_youtube_url(url: str) -> bool:
@@ -117,18 +239,71 @@ def _is_youtube_url(url: str) -> bool:
     return any(hint in host for hint in YOUTUBE_HOST_HINTS)
 
 
+def _host_key(url: str) -> str:
+    """Group URLs by the site that serves them (all YouTube hosts share one key)."""
+    if _is_youtube_url(url):
+        return "youtube"
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
 # downloader
 
 class Downloader:
-    """Manages the yt-dlp subprocess."""
+    """Manages the yt-dlp subprocess (or the in-process YoutubeDL engine)."""
 
-    def __init__(self, output_dir: str | None = None):
-        self.output_dir  = output_dir or os.path.join(os.path.expanduser("~"), "Downloads")
-        self.process     = None
-        self.cancelled   = False
-        self.ytdlp_path  = find_ytdlp()
-        self.ffmpeg_path = find_ffmpeg()
-        self._proc_lock  = threading.Lock()
+    def __init__(
+        self,
+        output_dir: str | None = None,
+        engine: str = ENGINE_SUBPROCESS,
+        strategy_memory: StrategyMemory | None = None,
+        info_cache: InfoCache | None = None,
+        archive: DownloadArchive | None = None,
+        bandwidth: "BandwidthBudget | None" = None,
+        fragment_tuner: FragmentTuner | None = None,
+        metrics: "Metrics | None" = None,
+        classifier: OutputClassifier | None = None,
+        staging: "Staging | None" = None,
+    ):
+        # deferred: nothing builds a Downloader before the window is up
+        from bandwidth import shared_bandwidth_budget
+        from metrics import shared_metrics
+        from staging import shared_staging
+
+        self.output_dir      = output_dir or DEFAULT_OUTPUT_DIR
+        self.engine          = engine
+        self.strategy_memory = strategy_memory if strategy_memory is not None else shared_strategy_memory()
+        self.info_cache      = info_cache if info_cache is not None else shared_info_cache()
+        self.archive         = archive if archive is not None else shared_archive()
+        self.bandwidth       = bandwidth if bandwidth is not None else shared_bandwidth_budget()
+        self.rate_weight     = 1.0  # share of the bandwidth budget relative to other jobs
+        self.fragment_tuner  = fragment_tuner if fragment_tuner is not None else shared_fragment_tuner()
+        self.metrics         = metrics if metrics is not None else shared_metrics()
+        self.classifier      = classifier if classifier is not None else shared_classifier()
+        self.staging         = staging if staging is not None else shared_staging()
+        self.use_archive     = False  # opt-in, like yt-dlp's --download-archive
+        self.separate_postprocessing = True  # see run(on_downloaded=...)
+        self.process         = None
+        self.cancelled       = False
+        self.keep_partial    = False  # a cancel that leaves .part files for a later resume
+        self.time_saved      = 0.0
+        self.skipped         = False
+        self.ytdlp_path      = find_ytdlp()
+        self.ffmpeg_path     = find_ffmpeg()
+        self._proc_lock      = threading.Lock()
+        self._ydl            = None   # live YoutubeDL of an in-process attempt
+        self._restart_note   = None   # set when the running attempt is stopped to be re-run
+        self._frag_sample    = None
+        self._timer          = None   # AttemptTimer of the running attempt
+        self._stopping       = None   # thread stopping the process tree of a cancelled attempt
+        self._destinations   = []     # files the current job writes, for cleanup on cancel
+        self._stream_ids     = set()  # format ids yt-dlp announced; their raw streams go on cancel too
+        self._space          = None   # SpaceLease of the running job
+        self._space_error    = None   # why the running attempt was stopped for lack of disk space
+        self._lease          = None   # RateLease of the running job
+        self._attempt_rate   = None   # --limit-rate the running yt-dlp process was started with
+        self._rate_restarted = None   # when the job was last restarted for its share
+        self._downloading    = False  # the running attempt has reached its media download
 
     @staticmethod
     def _insert_extra_args(cmd: list[str], extra_args: list[str] | None) -> list[str]:
@@ -139,6 +314,26 @@ class Downloader:
         sentinel_index = cmd.index("--")
         return cmd[:sentinel_index] + extra_args + cmd[sentinel_index:]
 
+    @staticmethod
+    def _with_info_cache(cmd: list[str], info_path: str, load: bool) -> list[str]:
+        """Make a strategy command read its metadata from, or write it to, `info_path`.
+
+        Loading replaces the `-- url` terminator with `--load-info-json`, so yt-dlp
+        skips extraction and only fetches media.
+        """
+        if load:
+            return cmd[:cmd.index("--")] + ["--load-info-json", info_path]
+
+        template = os.path.splitext(os.path.splitext(info_path)[0])[0].replace("%", "%%")
+        return Downloader._insert_extra_args(
+            cmd,
+            [
+                "--write-info-json",
+                "--no-write-playlist-metafiles",
+                "-o", f"infojson:{template}",
+            ],
+        )
+
     def _build_cmd(
         self,
         url: str,
@@ -161,6 +356,10 @@ class Downloader:
             "-o", "%(title)s.%(ext)s",
         ]
 
+        if self.staging.temp_dir:
+            # parts, fragments and merges stay on the fast disk; yt-dlp moves the finished file
+            cmd += ["-P", f"temp:{self.staging.temp_dir}"]
+
         if ff and ff != "ffmpeg":
             cmd += ["--ffmpeg-location", ff]
 
@@ -181,6 +380,7 @@ class Downloader:
         cookies_file: str | None,
         cookies_browser: str | None,
         is_youtube: bool,
+        preferred: str | None = None,
     ) -> list[tuple[str, list[str]]]:
         """Return ordered list of download strategies to try.
 
@@ -188,6 +388,9 @@ class Downloader:
         2. youtube android — no JS runtime / PO token needed
         3. youtube ios — alternative client
         4. youtube android, no cookies — last resort
+
+        `preferred` (or else the strategy that last succeeded for this host, see
+        StrategyMemory) is moved to the front; the rest keep their order.
         """
         base_cmd = self._build_cmd(url, format_args, cookies_file, cookies_browser)
         strategies: list[tuple[str, list[str]]] = [("default", base_cmd)]
@@ -218,141 +421,196 @@ class Downloader:
                 ),
             ))
 
+        preferred = preferred or self.strategy_memory.preferred(_host_key(url))
+        if preferred and preferred != strategies[0][0]:
+            for i, (label, _) in enumerate(strategies):
+                if label == preferred:
+                    strategies.insert(0, strategies.pop(i))
+                    break
+
         return strategies
 
-    def _run_attempt(
-        self, cmd: list[str], on_progress
-    ) -> tuple[bool, bool, bool, bool]:
+    def _run_attempt(self, cmd: list[str], on_progress) -> tuple[bool, set[str]]:
         """Run a single strategy attempt.
 
+        The process is killed as soon as yt-dlp reports an error with a fatal
+        failure marker, instead of waiting for it to give up on its own.
+        Markers on other lines (warnings) are only recorded, as hints for
+        choosing the next strategy.
+
         Returns:
-            (ok, had_signature_issue, only_images_available, needs_signin)
+            (ok, failure kinds seen in the output)
         """
         with self._proc_lock:
+            if self.cancelled:
+                # cancel() ran between attempts; it found no process to stop
+                return (False, set())
             self.process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                **_popen_kwargs(),
+                **popen_kwargs(),
             )
 
-        process = self.process
-
-        had_signature_issue   = False
-        only_images_available = False
-        needs_signin          = False
+        process  = self.process
+        failures = set()
+        fatal    = False
+        classify = self.classifier.classify
 
-        for line in process.stdout:
-            if self.cancelled:
-                process.kill()
-                return (False, had_signature_issue, only_images_available, needs_signin)
-
-            line = line.rstrip()
-            if on_progress:
-                on_progress(line)
+        try:
+            # raw lines: markers are matched before (and progress ticks without) decoding
+            for raw in iter_lines(process.stdout):
+                if self.cancelled:
+                    self._kill_process(process)
+                    return (False, failures)
+
+                if raw.startswith(PROGRESS_PREFIX_BYTES):
+                    # progress ticks never carry failure markers
+                    if on_progress:
+                        record = decode_progress(raw.decode(PIPE_ENCODING, "replace"))
+                        if record:
+                            on_progress(record)
+                    continue
+
+                kind = classify(raw)
+                if kind:
+                    self._note_kind(kind, failures)
+                if on_progress:
+                    on_progress(raw.decode(PIPE_ENCODING, "replace").rstrip())
 
-            lowered = line.lower()
-            if "signature solving failed" in lowered or "n challenge solving failed" in lowered:
-                had_signature_issue = True
-            if "only images are available" in lowered:
-                only_images_available = True
-            if "sign in to confirm" in lowered or "confirm you're not a bot" in lowered:
-                needs_signin = True
+                if kind in FATAL_FAILURES and is_error_line(raw):
+                    fatal = True
+                    if on_progress:
+                        on_progress(f"[info] {kind} failure detected, stopping this attempt")
+                    self._kill_process(process)
+                    break
 
-        try:
             process.wait()
-            return (
-                process.returncode == 0,
-                had_signature_issue,
-                only_images_available,
-                needs_signin,
-            )
+            return (process.returncode == 0 and not fatal, failures)
         finally:
             with self._proc_lock:
                 if self.process is process:
                     self.process = None
 
-    @staticmethod
-    def _calculate_sha256(file_path: str) -> str:
-        digest = hashlib.sha256()
-        with open(file_path, "rb") as handle:
-            for chunk in iter(lambda: handle.read(DOWNLOAD_CHUNK_SIZE), b""):
-                digest.update(chunk)
-        return digest.hexdigest()
-
-    def _fetch_expected_sha256(self) -> str | None:
-        """Fetch the expected SHA256 for yt-dlp.exe. Returns None on failure."""
-        try:
-            with urllib.request.urlopen(
-                YTDLP_SHA256_URL,
-                timeout=DOWNLOAD_TIMEOUT_SECONDS,
-            ) as response:
-                body = response.read().decode("utf-8", errors="replace")
-        except Exception:
-            return None
+    def _run_attempt_inprocess(self, cmd: list[str], on_progress) -> tuple[bool, set[str]]:
+        """Run a single strategy attempt through the yt_dlp Python API.
 
-        for line in body.splitlines():
-            parts = line.split()
-            if len(parts) >= 2 and parts[-1].endswith("yt-dlp.exe"):
-                return parts[0].lower()
-        return None
-
-    def _download_file(self, url: str, destination: str) -> None:
-        """Download a file with a timeout and cancellation checks."""
-        with urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT_SECONDS) as response:
-            with open(destination, "wb") as handle:
-                while True:
-                    if self.cancelled:
-                        raise RuntimeError("cancelled")
-                    chunk = response.read(DOWNLOAD_CHUNK_SIZE)
-                    if not chunk:
-                        break
-                    handle.write(chunk)
-
-    def _auto_update_ytdlp_windows(self, on_progress=None) -> bool:
-        """Download the latest yt-dlp.exe to the persistent override directory."""
-        if not IS_WIN:
-            return False
-        temp_path = YTDLP_OVERRIDE_PATH + ".tmp"
+        The strategy command line is parsed with `yt_dlp.parse_options`, so both
+        engines share the exact same strategies. Log lines are forwarded as strings,
+        progress as ProgressRecord objects built from progress_hooks.
+
+        Returns:
+            (ok, failure kinds seen in the output)
+        """
         try:
-            os.makedirs(YTDLP_GUI_BIN_DIR, exist_ok=True)
+            import yt_dlp
+            from yt_dlp.utils import DownloadCancelled, DownloadError
+        except ImportError:
+            raise RuntimeError(
+                "The in-process engine needs the yt-dlp Python package (pip install yt-dlp)."
+            ) from None
+
+        failures = set()
+        fatal    = []  # fatal kinds yt-dlp reported as errors
+        classify = self.classifier.classify
+
+        def check_cancelled():
+            if self.cancelled:
+                raise DownloadCancelled("cancelled")
+            if self._space_error:
+                raise DownloadCancelled("disk space")
+            if self._restart_note:
+                raise DownloadCancelled("restart")
+            if fatal:
+                raise DownloadCancelled("fatal failure")
+
+        def emit(message: str, error: bool = False):
+            check_cancelled()
+            for line in str(message).splitlines():
+                kind = classify(line)
+                if kind:
+                    self._note_kind(kind, failures)
+                    if kind in FATAL_FAILURES and (error or is_error_line(line)):
+                        fatal.append(kind)
+                if on_progress:
+                    on_progress(line)
+            check_cancelled()
+
+        class _Logger:
+            debug = info = warning = staticmethod(emit)
+
+            @staticmethod
+            def error(message: str):
+                emit(message, error=True)
+
+        def hook(status: dict):
+            check_cancelled()
             if on_progress:
-                on_progress("[info] auto-updating yt-dlp to fix YouTube challenge...")
+                on_progress(progress_from_hook(status))
 
-            expected_sha256 = self._fetch_expected_sha256()
-            self._download_file(YTDLP_LATEST_URL, temp_path)
+        parsed = yt_dlp.parse_options(cmd[1:])
+        ydl_opts = dict(parsed.ydl_opts)
+        ydl_opts.pop("progress_template", None)
+        ydl_opts.update({
+            "logger": _Logger(),
+            "noprogress": True,
+            "progress_hooks": [hook],
+        })
 
-            if not os.path.isfile(temp_path) or os.path.getsize(temp_path) < 1_000_000:
-                if on_progress:
-                    on_progress("[warn] yt-dlp update file looks invalid, skipping")
-                return False
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                self._ydl = ydl
+                if parsed.options.load_info_filename:
+                    ok = ydl.download_with_info_file(parsed.options.load_info_filename) == 0
+                else:
+                    ok = ydl.download(parsed.urls) == 0
+        except DownloadCancelled:
+            ok = False
+        except DownloadError:
+            ok = False
+        finally:
+            self._ydl = None
 
-            if expected_sha256:
-                actual_sha256 = self._calculate_sha256(temp_path)
-                if actual_sha256.lower() != expected_sha256:
-                    if on_progress:
-                        on_progress("[warn] yt-dlp checksum verification failed, skipping")
-                    return False
+        return (ok and not self.cancelled and not fatal, failures)
+
+    def _note_kind(self, kind: str, failures: set[str]):
+        """Record what a classified output line says: a failure, or the server pushing back."""
+        if kind in FAILURE_KINDS:
+            failures.add(kind)
+        sample = self._frag_sample
+        if sample is not None:
+            sample.note(kind)
+
+    def _auto_update_ytdlp(self, on_progress=None) -> bool:
+        """Bring the yt-dlp binary in the override directory up to the latest release."""
+        from updater import YtdlpUpdater, UpdateCancelled, UPDATE_INSTALLED, UPDATE_FAILED
 
-            if os.path.exists(YTDLP_OVERRIDE_PATH):
-                os.remove(YTDLP_OVERRIDE_PATH)
-            os.replace(temp_path, YTDLP_OVERRIDE_PATH)
-            self.ytdlp_path = YTDLP_OVERRIDE_PATH
+        updater = YtdlpUpdater()
+        if on_progress:
+            on_progress("[info] checking for a newer yt-dlp to fix the YouTube challenge...")
+        try:
+            result = updater.update(cancelled=lambda: self.cancelled, on_progress=on_progress)
+        except UpdateCancelled:
+            self.metrics.record_update("cancelled")
+            return False
+        except OSError as e:
+            self.metrics.record_update(UPDATE_FAILED)
             if on_progress:
-                on_progress(f"[info] yt-dlp updated: {self.ytdlp_path}")
-            return True
-        except Exception as e:
-            if on_progress and str(e) != "cancelled":
                 on_progress(f"[warn] yt-dlp auto-update failed: {e}")
             return False
-        finally:
-            if os.path.exists(temp_path):
-                try:
-                    os.remove(temp_path)
-                except OSError:
-                    pass
+
+        self.metrics.record_update(result)
+        if result == UPDATE_FAILED:
+            return False
+        shared_tool_registry().invalidate("yt-dlp")
+        previous, self.ytdlp_path = self.ytdlp_path, find_ytdlp()
+        if on_progress:
+            if result == UPDATE_INSTALLED:
+                on_progress(f"[info] yt-dlp updated: {self.ytdlp_path}")
+            else:
+                on_progress("[info] yt-dlp is already the latest release")
+        # retrying only helps if the binary we run has changed
+        return result == UPDATE_INSTALLED or previous != self.ytdlp_path
 
     def download(
         self,
@@ -366,153 +624,703 @@ class Downloader:
     ):
         """Start the download in a background thread."""
         self.cancelled = False
+        self.keep_partial = False
+        thread = threading.Thread(
+            target=self.run,
+            args=(url, on_progress, on_finished, on_error),
+            kwargs={
+                "cookies_file": cookies_file,
+                "cookies_browser": cookies_browser,
+                "format_str": format_str,
+            },
+            daemon=True,
+        )
+        thread.start()
+        return thread
 
-        def _run():
-            try:
-                had_signature_issue_any = False
-                only_images_any         = False
-                needs_signin_any        = False
-                auto_update_tried       = False
-                is_youtube              = _is_youtube_url(url)
-                format_args             = shlex.split(format_str)
-
-                while True:
-                    strategies = self._build_strategies(
-                        url, format_args, cookies_file, cookies_browser, is_youtube
-                    )
-
-                    had_sig_round      = False
-                    only_img_round     = False
-                    needs_signin_round = False
-
-                    for i, (label, cmd) in enumerate(strategies):
-                        if self.cancelled:
-                            return
+    def extract_info(
+        self,
+        url: str,
+        cookies_file: str | None = None,
+        cookies_browser: str | None = None,
+        format_str: str = DEFAULT_FORMAT,
+    ) -> str | None:
+        """Extract metadata for `url` into the info cache without downloading; return the info JSON path.
 
-                        if i > 0 and on_progress:
-                            on_progress(f"[retry {i}/{len(strategies)-1}] trying {label}...")
+        Runs the strategy a download would try first, so run() finds the entry
+        and skips extraction. A fresh entry is returned without starting
+        yt-dlp. None when extraction failed or cancel() stopped it.
+        """
+        import shlex
+
+        cmd = self._build_strategies(
+            url, shlex.split(format_str), cookies_file, cookies_browser, _is_youtube_url(url)
+        )[0][1]
+        key = self.info_cache.key(url, _strategy_client(cmd), cookie_identity(cookies_file, cookies_browser))
+        cached = self.info_cache.lookup(key)
+        if cached:
+            return cached
+
+        cmd = self._insert_extra_args(cmd, ["--skip-download"])
+        run_attempt = self._run_attempt_inprocess if self.engine == ENGINE_INPROCESS else self._run_attempt
+        ok, _ = run_attempt(self._with_info_cache(cmd, self.info_cache.path_for(key), False), None)
+        if not ok or self.cancelled:
+            return None
+        self.info_cache.commit(key)
+        return self.info_cache.lookup(key)
 
-                        ok, had_sig, only_img, needs_signin = self._run_attempt(
-                            cmd, on_progress
+    def run(
+        self,
+        url: str,
+        on_progress=None,
+        on_finished=None,
+        on_error=None,
+        cookies_file: str | None = None,
+        cookies_browser: str | None = None,
+        format_str: str = DEFAULT_FORMAT,
+        archive_id: str | None = None,
+        strategy: str | None = None,
+        on_attempt=None,
+        on_downloaded=None,
+    ):
+        """Run the full strategy/fallback loop in the calling thread.
+
+        Used by `download()` and by queue workers, which own one Downloader per job.
+        `archive_id` (`<extractor> <id>`, known for playlist entries) lets the archive
+        check skip the job without starting yt-dlp; otherwise it is derived from the URL.
+        `strategy` names the strategy to try first (e.g. the one an interrupted run was
+        using); `on_attempt(label)` is called whenever a strategy is started.
+
+        With `on_downloaded(task)`, a built-in preset leaves its merge / transcode
+        to the caller: the job ends once the raw streams are on disk and hands a
+        PostTask (see postprocess.py) over instead of calling `on_finished`. The
+        archive entry is only recorded when that task commits.
+        """
+        # deferred so importing this module (and starting the GUI) stays cheap
+        import shlex
+        import tempfile
+        import uuid
+
+        from metrics import AttemptTimer, OUTCOME_OK, OUTCOME_FAILED, OUTCOME_RESTARTED, OUTCOME_CANCELLED
+        from postprocess import (
+            read_printed_files,
+            RAW_OUTPUT_TEMPLATE,
+            POSTPROCESS_PRINT_TEMPLATE,
+            POST_FINALIZE,
+            POST_MERGE,
+        )
+        from staging import InsufficientSpace, estimate_size
+
+        self.skipped = False
+        if self.use_archive:
+            known_id = archive_id or self.archive.find(url)
+            if known_id and self.archive.downloaded(known_id, self.output_dir, format_str):
+                self.skipped = True
+                if on_progress:
+                    on_progress(f"[info] {known_id} is in the download archive, skipping")
+                if on_finished:
+                    on_finished()
+                self.metrics.record_job("skipped")
+                return
+
+        self._lease = lease = self.bandwidth.acquire(self.rate_weight, on_change=self._on_rate_change)
+        self._rate_restarted = None
+        self._space = space = self.staging.acquire(self.output_dir)
+        on_output = self._observe_output(lease, on_progress)
+        self._destinations = []
+        self._stream_ids   = set()
+        job_outcome = None
+        attempt_durations = []
+        try:
+            failures_any      = set()
+            auto_update_tried = False
+            is_youtube        = _is_youtube_url(url)
+            host_key          = _host_key(url)
+            cookies_id        = cookie_identity(cookies_file, cookies_browser)
+            pipeline          = self._pipeline_for(format_str) if on_downloaded else None
+            format_args       = shlex.split(pipeline[0] if pipeline else format_str)
+            space.merged      = pipeline is not None  # the pool writes its result next to the raw files
+            inprocess         = self.engine == ENGINE_INPROCESS
+            run_attempt       = self._run_attempt_inprocess if inprocess else self._run_attempt
+            self.time_saved   = 0.0
+
+            while True:
+                strategies = self._build_strategies(
+                    url, format_args, cookies_file, cookies_browser, is_youtube, strategy
+                )
+                failures_round = set()
+
+                i = 0
+                while i < len(strategies):
+                    label, cmd = strategies[i]
+                    if self.cancelled:
+                        return
+
+                    if i > 0 and on_progress:
+                        on_progress(f"[retry {i}/{len(strategies)-1}] trying {label}...")
+                    elif label != "default" and on_progress:
+                        on_progress(f"[info] starting with last working strategy: {label}")
+                    if on_attempt:
+                        on_attempt(label)
+
+                    info_key  = self.info_cache.key(url, _strategy_client(cmd), cookies_id)
+                    info_path = self.info_cache.lookup(info_key)
+                    if info_path and on_progress:
+                        on_progress("[info] reusing cached metadata, skipping extraction")
+                    printed_file = None
+                    if self.use_archive:
+                        printed_file = os.path.join(
+                            tempfile.gettempdir(), f"yt-dlp-gui-{uuid.uuid4().hex}.txt"
                         )
-                        had_sig_round      = had_sig_round      or had_sig
-                        only_img_round     = only_img_round     or only_img
-                        needs_signin_round = needs_signin_round or needs_signin
-
-                        if ok:
-                            if on_finished and not self.cancelled:
-                                on_finished()
-                            return
-
-                        if self.cancelled:
-                            return
-
-                    had_signature_issue_any = had_signature_issue_any or had_sig_round
-                    only_images_any         = only_images_any         or only_img_round
-                    needs_signin_any        = needs_signin_any        or needs_signin_round
-
-                    # auto-update yt-dlp once when a signature challenge is hit;
-                    # skip if sign-in is required since updating won't help
-                    if (
-                        is_youtube
-                        and (had_sig_round or only_img_round)
-                        and not needs_signin_round
-                        and not auto_update_tried
-                    ):
-                        auto_update_tried = True
-                        if self._auto_update_ytdlp_windows(on_progress=on_progress):
-                            if on_progress:
-                                on_progress("[info] retrying with updated yt-dlp...")
-                            continue
-
-                    break
-
-                if not self.cancelled and on_error:
-                    if needs_signin_any:
-                        on_error(
-                            "YouTube requires sign-in (bot check / age restriction).\n"
-                            "Fix: log in to YouTube in your browser, export cookies.txt "
-                            "with 'Get cookies.txt LOCALLY', then select it in manual mode."
+                        cmd = self._insert_extra_args(
+                            cmd, ["--print-to-file", ARCHIVE_PRINT_TEMPLATE, printed_file]
                         )
-                    elif had_signature_issue_any or only_images_any:
-                        on_error(
-                            "YouTube download failed.\n"
-                            "Try:\n"
-                            "1) Use cookies: log in to YouTube, export cookies.txt with "
-                            "'Get cookies.txt LOCALLY'.\n"
-                            "2) Install Node.js: nodejs.org"
+                    files_list = None
+                    raw_args = []
+                    if pipeline:
+                        files_list = os.path.join(
+                            tempfile.gettempdir(), f"yt-dlp-gui-{uuid.uuid4().hex}.files"
                         )
+                        raw_args = [
+                            # raw streams stay in the staging folder until post-processing moves the result
+                            "-P", self.staging.work_dir(self.output_dir),
+                            "-o", RAW_OUTPUT_TEMPLATE,
+                            "--print-to-file", POSTPROCESS_PRINT_TEMPLATE, files_list,
+                        ]
+                    self._attempt_rate = rate = lease.rate
+                    if rate:
+                        cmd = self._insert_extra_args(cmd, ["--limit-rate", str(rate)])
+                    fragments = self.fragment_tuner.level(host_key)
+                    if fragments > 1:
+                        cmd = self._insert_extra_args(cmd, ["--concurrent-fragments", str(fragments)])
+                    info_file = self.info_cache.path_for(info_key)
+                    if info_path:
+                        # size known from the cached extraction: check it before yt-dlp starts
+                        size, merged = estimate_size(info_path)
+                        if size:
+                            self.staging.reserve(space, size, merged or space.merged)
+
+                    started = time.monotonic()
+                    self._downloading = False
+                    space.begin_attempt()
+                    self._restart_note = None
+                    self._space_error = None
+                    self._frag_sample = sample = FragmentSample(fragments)
+                    self._timer = timer = AttemptTimer(label, self.engine)
+                    ok = False
+                    post_kind = pipeline[1] if pipeline else None
+                    expected = 1  # raw files the download should leave for the pool
+                    try:
+                        if post_kind == POST_MERGE:
+                            ok, failures, streams = self._select_streams(
+                                cmd, info_key, pipeline[0], info_path is not None, run_attempt, on_output
+                            )
+                            if ok and streams is None:
+                                # several videos or streams: yt-dlp downloads and merges them itself
+                                ok, more = run_attempt(self._with_info_cache(cmd, info_file, False), on_output)
+                                failures |= more
+                            elif ok:
+                                expected = len(streams)
+                                if expected == 1:
+                                    post_kind = POST_FINALIZE  # a muxed format, nothing to merge
+                                by_id = self._insert_extra_args(cmd, raw_args + ["-f", ",".join(streams)])
+                                ok, more = run_attempt(self._with_info_cache(by_id, info_file, True), on_output)
+                                failures |= more
+                        else:
+                            attempt_cmd = self._with_info_cache(
+                                self._insert_extra_args(cmd, raw_args), info_file, info_path is not None
+                            )
+                            ok, failures = run_attempt(attempt_cmd, on_output)
+                    finally:
+                        self._frag_sample = None
+                        self._timer = None
+                        files = read_printed_files(files_list) if files_list else []
+                        # a stream missing from the raw files must not pass for the whole video
+                        incomplete = bool(ok and files) and len(files) != expected
+                        deferred = bool(ok and files) and not incomplete and not self.cancelled
+                        if printed_file and not deferred:
+                            if incomplete:
+                                _remove_quietly(printed_file)
+                            else:
+                                self.archive.record_printed(printed_file, url, self.output_dir, format_str)
+
+                    restart_note, self._restart_note = self._restart_note, None
+                    if ok:
+                        attempt_outcome = OUTCOME_OK
+                    elif self.cancelled:
+                        attempt_outcome = OUTCOME_CANCELLED
+                    elif restart_note:
+                        attempt_outcome = OUTCOME_RESTARTED
                     else:
-                        on_error("All download strategies failed.")
+                        attempt_outcome = OUTCOME_FAILED
+                    self.metrics.record_attempt(timer, attempt_outcome, failures)
+                    if (ok or restart_note or sample.throttled) and not lease.rate:
+                        # a rate-limited job's speed says nothing about the host
+                        self.fragment_tuner.record(host_key, sample)
+                    if self._space_error and not self.cancelled:
+                        raise InsufficientSpace(self._space_error)
+
+                    if restart_note and not ok and not self.cancelled:
+                        # stopped only to change settings; yt-dlp resumes the .part file
+                        self._update_info_cache(info_key, info_path is not None, True, set())
+                        if on_progress:
+                            on_progress(f"[info] {restart_note}")
+                        continue
+
+                    if incomplete and not self.cancelled:
+                        for path, _ in files:
+                            _remove_quietly(path)
+                        if on_progress:
+                            on_progress(
+                                f"[warn] got {len(files)} of {expected} streams, "
+                                "downloading again with yt-dlp's own merge"
+                            )
+                        pipeline = None  # a merge preset downloads with its own format selector
+                        continue
+
+                    attempt_durations.append(time.monotonic() - started)
+                    failures_round |= failures
+
+                    if self._update_info_cache(info_key, info_path is not None, ok, failures):
+                        if on_progress:
+                            on_progress("[info] cached metadata did not work, re-extracting...")
+                        continue
+
+                    if ok:
+                        job_outcome = "finished"
+                        self.strategy_memory.record_success(host_key, label)
+                        if deferred:
+                            on_downloaded(self._post_task(post_kind, files, printed_file, url, format_str))
+                        elif on_finished and not self.cancelled:
+                            on_finished()
+                        return
 
-            except FileNotFoundError:
-                if on_error:
-                    on_error("yt-dlp not found. Please install it first.")
-            except Exception as e:
-                if on_error:
-                    on_error(str(e))
+                    if self.cancelled:
+                        return
+
+                    if not failures & FATAL_FAILURES:
+                        # a private, geo-blocked or sign-in-walled video says nothing about the strategy
+                        self.strategy_memory.record_failure(host_key, label)
+                    i += 1
+                    self._prune_strategies(
+                        strategies, i, failures_round, attempt_durations, on_progress
+                    )
 
-        thread = threading.Thread(target=_run, daemon=True)
-        thread.start()
-        return thread
+                failures_any |= failures_round
+
+                # auto-update yt-dlp once when a signature challenge is hit;
+                # skip if sign-in is required since updating won't help, and for
+                # the in-process engine, which does not use the yt-dlp binary
+                if (
+                    is_youtube
+                    and not inprocess
+                    and failures_round & {FAIL_SIGNATURE, FAIL_IMAGES_ONLY}
+                    and FAIL_SIGNIN not in failures_round
+                    and not auto_update_tried
+                ):
+                    auto_update_tried = True
+                    if self._auto_update_ytdlp(on_progress=on_progress):
+                        if on_progress:
+                            on_progress("[info] retrying with updated yt-dlp...")
+                        continue
+
+                break
+
+            if not self.cancelled and on_error:
+                if FAIL_UNAVAILABLE in failures_any:
+                    on_error("The video is private, removed or not supported by yt-dlp.")
+                elif FAIL_GEO_BLOCKED in failures_any:
+                    on_error("The video is not available in your country (geo-blocked).")
+                elif FAIL_DISK_FULL in failures_any:
+                    on_error("The disk is full. Free some space or choose another folder.")
+                elif FAIL_SIGNIN in failures_any:
+                    on_error(
+                        "YouTube requires sign-in (bot check / age restriction).\n"
+                        "Fix: log in to YouTube in your browser, export cookies.txt "
+                        "with 'Get cookies.txt LOCALLY', then select it in manual mode."
+                    )
+                elif failures_any & {FAIL_SIGNATURE, FAIL_IMAGES_ONLY}:
+                    on_error(
+                        "YouTube download failed.\n"
+                        "Try:\n"
+                        "1) Use cookies: log in to YouTube, export cookies.txt with "
+                        "'Get cookies.txt LOCALLY'.\n"
+                        "2) Install Node.js: nodejs.org"
+                    )
+                elif FAIL_RATE_LIMITED in failures_any:
+                    on_error("The site is rate limiting requests (HTTP 429). Try again later.")
+                else:
+                    on_error("All download strategies failed.")
 
-    def cancel(self):
-        """Cancel the current download."""
-        self.cancelled = True
+        except FileNotFoundError:
+            if on_error:
+                on_error("yt-dlp not found. Please install it first.")
+        except Exception as e:
+            if on_error:
+                on_error(str(e))
+        finally:
+            self._lease = None
+            self.bandwidth.release(lease)
+            self.staging.release(space)
+            self._space = None
+            if job_outcome is None:
+                job_outcome = "cancelled" if self.cancelled else "failed"
+            # time the job spent in strategies that failed before the one that worked
+            retry_seconds = sum(attempt_durations[:-1]) if job_outcome == "finished" else 0.0
+            self.metrics.record_job(job_outcome, retry_seconds)
+            if job_outcome == "cancelled" and not self.keep_partial:
+                self._discard_partial_files(on_progress)
+
+    def _select_streams(
+        self, cmd: list[str], info_key: str, format_spec: str, load: bool, run_attempt, on_output
+    ) -> tuple[bool, set[str], list[str] | None]:
+        """Let yt-dlp's format selector pick the streams of a merge, without downloading them.
+
+        A selection recorded with the cached info JSON is used as is. Otherwise
+        `cmd` runs with `--skip-download`, extracting into (or loading from) the
+        info JSON, and the selection is recorded next to it. Returns (ok,
+        failure kinds, format ids): "248+140" gives ["248", "140"], a muxed
+        format one id. The ids are None when the URL is not a single video of
+        at most two streams.
+        """
+        from postprocess import SELECTION_PRINT_TEMPLATE
+
+        info_file = self.info_cache.path_for(info_key)
+        selected = self.info_cache.selection(info_key, format_spec) if load else None
+        if selected:
+            ok, failures = True, set()
+        else:
+            selected_file = self.info_cache.selection_path(info_key, format_spec)
+            _remove_quietly(selected_file)  # yt-dlp appends to it
+            os.makedirs(os.path.dirname(selected_file), exist_ok=True)
+            select_cmd = self._insert_extra_args(cmd, [
+                "--skip-download",
+                "--print-to-file", SELECTION_PRINT_TEMPLATE, selected_file.replace("%", "%%"),
+            ])
+            ok, failures = run_attempt(self._with_info_cache(select_cmd, info_file, load), on_output)
+            try:
+                with open(selected_file, encoding="utf-8", errors="replace") as handle:
+                    selected = handle.read().strip()
+                os.utime(selected_file)  # yt-dlp prints before it writes the info JSON
+            except OSError:
+                selected = ""
+
+        lines = selected.split()
+        streams = lines[0].split("+") if len(lines) == 1 else []
+        if not 1 <= len(streams) <= 2 or not os.path.isfile(info_file):
+            return ok, failures, None
+        return ok, failures, streams
+
+    def _pipeline_for(self, format_str: str) -> tuple[str, str] | None:
+        """(format spec, post-processing kind) when `format_str` can be post-processed apart."""
+        if not self.separate_postprocessing or format_str not in PIPELINED_FORMATS:
+            return None
+        if not binary_available(self.ffmpeg_path):
+            return None  # the pool could not merge either; yt-dlp picks formats that need no ffmpeg
+        from postprocess import POST_AUDIO, POST_MERGE
+
+        return PIPELINED_FORMATS[format_str], POST_AUDIO if format_str == PRESETS["mp3"] else POST_MERGE
+
+    def _post_task(
+        self, kind: str, files: list, printed_file: str | None, url: str, format_str: str
+    ) -> "PostTask":
+        """PostTask for the raw files of a finished job; it records the archive entry on success."""
+        from postprocess import PostTask
+
+        task = PostTask.plan(kind, files, self.ffmpeg_path, output_dir=self.output_dir)
+        task.title = os.path.splitext(os.path.basename(task.output))[0]
+        if printed_file:
+            archive, output_dir = self.archive, self.output_dir
+
+            def commit(ok: bool):
+                if ok:
+                    archive.record_printed(printed_file, url, output_dir, format_str, task.output)
+                else:
+                    try:
+                        os.remove(printed_file)
+                    except OSError:
+                        pass
+
+            task.commit = commit
+        return task
+
+    def _observe_output(self, lease, on_progress):
+        """Wrap `on_progress` so the bandwidth budget, fragment tuner and attempt timer see every item."""
+        from staging import InsufficientSpace
+
+        def on_output(item):
+            if isinstance(item, ProgressRecord):
+                self.bandwidth.report(lease, item.speed)
+                if item.status == "downloading":
+                    self._downloading = True
+                    if lease.rate != self._attempt_rate:
+                        self._apply_rate()  # a share held back until the download started
+            timer = self._timer
+            if timer is not None:
+                timer.observe(item)
+            if isinstance(item, str) and item.startswith(DESTINATION_PREFIXES):
+                path = item.split(": ", 1)[1] if item.startswith("[download]") else item.split(" into ", 1)[1]
+                self._destinations.append(path.strip().strip('"'))
+            elif isinstance(item, str) and item.startswith("[info] ") and FORMATS_MARKER in item:
+                # "[info] <id>: Downloading 1 format(s): 137+140"
+                selected = item.split(FORMATS_MARKER, 1)[1]
+                self._stream_ids.update(filter(None, re.split(r"[+,\s]+", selected)))
+            space = self._space
+            if space is not None and not self._space_error:
+                try:
+                    space.observe(item)
+                except InsufficientSpace as e:
+                    self._stop_for_space(str(e))
+            sample = self._frag_sample
+            if sample is not None:
+                sample.observe(item)
+                if (
+                    sample.throttled >= THROTTLE_RESTART_HITS
+                    and sample.level > 1
+                    and not self._restart_note
+                ):
+                    self._restart_attempt(
+                        f"server is throttling {sample.level} parallel fragments, backing off"
+                    )
+            if on_progress:
+                on_progress(item)
+
+        return on_output
+
+    def _discard_partial_files(self, on_progress=None):
+        """Delete what a cancelled job left half-written, once its processes are gone."""
+        stopping = self._stopping
+        if stopping is not None:
+            stopping.join(KILL_WAIT_SECONDS)
+        removed, freed = remove_partial_files(self._destinations, self._stream_ids)
+        if removed and on_progress:
+            on_progress(f"[info] removed {removed} partial file(s), {format_bytes(freed)}")
+
+    def _stop_for_space(self, reason: str):
+        """Stop the running attempt: the sizes yt-dlp reported do not fit on the disk."""
+        self._space_error = reason
         with self._proc_lock:
             process = self.process
+        if process:
+            self._kill_process(process)
 
+    def _restart_attempt(self, note: str):
+        """Stop the running attempt so run() starts it again with updated settings."""
+        self._restart_note = note
+        with self._proc_lock:
+            process = self.process
         if process:
-            try:
-                if IS_WIN:
-                    subprocess.run(
-                        ["taskkill", "/F", "/T", "/PID", str(process.pid)],
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.DEVNULL,
-                        creationflags=subprocess.CREATE_NO_WINDOW,
-                    )
-                else:
-                    os.killpg(os.getpgid(process.pid), signal.SIGTERM)
-            except Exception:
-                pass
+            self._kill_process(process)
 
-    @staticmethod
-    def parse_progress(line: str) -> dict | None:
-        """Parse a __SEP__-delimited progress line.
+    def _on_rate_change(self, rate: int | None):
+        """Apply a new bandwidth share to the running attempt (called from any thread).
 
-        Returns:
-            dict with keys: status, total, percent, percent_value, speed, eta, title — or None.
+        The in-process engine reads `ratelimit` on every chunk, so it is updated in
+        place; a yt-dlp process is restarted with the new `--limit-rate` when
+        _apply_rate() finds that worth it.
         """
-        if "__SEP__" not in line:
-            return None
-        parts = [p.strip() for p in line.split("__SEP__")]
-        if len(parts) < 6:
-            return None
+        ydl = self._ydl
+        if ydl is not None:
+            ydl.params["ratelimit"] = rate
+            return
+        self._apply_rate()
+
+    def _apply_rate(self):
+        """Restart the yt-dlp process with the job's current share, unless the restart costs more than it brings.
+
+        Restarting repeats extraction, so a process still extracting or selecting
+        formats keeps its limit, as does one whose share moved by
+        RATE_RESTART_CHANGE or less or that was restarted for its share less
+        than RATE_RESTART_INTERVAL_SECONDS ago. A share held back this way is applied from
+        the download's progress once the process qualifies.
+        """
+        lease = self._lease
+        if lease is None or self.process is None or self._restart_note or not self._downloading:
+            return
+        old, new = self._attempt_rate, lease.rate
+        if old == new:
+            return
+        if old and new and abs(new - old) <= RATE_RESTART_CHANGE * old:
+            return
+        now = time.monotonic()
+        if self._rate_restarted is not None and now - self._rate_restarted < RATE_RESTART_INTERVAL_SECONDS:
+            return
+        self._rate_restarted = now
+        limit = f"{format_bytes(new)}/s" if new else "unlimited"
+        self._restart_attempt(f"bandwidth share is now {limit}")
+
+    def _update_info_cache(self, key: str, used_cache: bool, ok: bool, failures: set[str]) -> bool:
+        """Keep or drop the info JSON after an attempt.
+
+        Returns True when a cached entry failed and the strategy should be re-run
+        with a fresh extraction.
+        """
+        if failures & {FAIL_SIGNATURE, FAIL_IMAGES_ONLY}:
+            # metadata from a broken extraction; never reuse it
+            self.info_cache.invalidate(key)
+            return False
+        if used_cache and not ok and not self.cancelled:
+            self.info_cache.invalidate(key)
+            return not failures & FATAL_FAILURES
+        if not used_cache:
+            self.info_cache.commit(key)
+        return False
+
+    def iter_playlist(
+        self,
+        url: str,
+        cookies_file: str | None = None,
+        cookies_browser: str | None = None,
+        on_progress=None,
+    ):
+        """Yield (entry_url, title, archive_id) for each playlist/channel entry as yt-dlp lists it.
+
+        Enumeration is flat and lazy: yt-dlp only pages through the playlist as fast
+        as the caller consumes entries, so memory stays flat for any playlist size.
+        A single video yields itself.
+        """
+        cmd = [
+            self.ytdlp_path,
+            "--flat-playlist",
+            "--lazy-playlist",
+            "--newline",
+            "--print", PLAYLIST_ENTRY_TEMPLATE,
+        ]
+        if cookies_file:
+            cmd += ["--cookies", cookies_file]
+        elif cookies_browser:
+            cmd += ["--cookies-from-browser", cookies_browser]
+        cmd += ["--", url]
+
+        if self.engine == ENGINE_INPROCESS:
+            yield from self._iter_playlist_inprocess(cmd, url, on_progress)
+            return
+
+        with self._proc_lock:
+            if self.cancelled:
+                return
+            self.process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                **popen_kwargs(),
+            )
+        process = self.process
 
         try:
-            percent_value = float(parts[2].replace("%", ""))
-        except ValueError:
-            percent_value = None
-
-        return {
-            "status":  parts[0],
-            "total":   parts[1],
-            "percent": parts[2],
-            "percent_value": percent_value,
-            "speed":   parts[3],
-            "eta":     parts[4],
-            "title":   parts[5],
-        }
+            for raw in iter_lines(process.stdout):
+                if self.cancelled:
+                    self._kill_process(process)
+                    return
+                line = raw.decode(PIPE_ENCODING, "replace").rstrip("\r")
+                if raw.startswith(PLAYLIST_ENTRY_PREFIX_BYTES):
+                    parts = line.split("\t", 4)
+                    if len(parts) == 5 and parts[1] != "NA":
+                        _, entry_url, ie_key, video_id, title = parts
+                        # without an extractor the archive id is unknown; the job still checks its URL
+                        known = ie_key != "NA" and video_id != "NA"
+                        yield entry_url, title, make_archive_id(ie_key, video_id) if known else None
+                elif line.strip() and on_progress:
+                    on_progress(line.rstrip())
 
-    @staticmethod
-    def parse_percent(line: str) -> float | None:
-        """Extract the percentage value from a progress line."""
-        if "__SEP__" in line:
-            parts = line.split("__SEP__")
-            if len(parts) >= 3:
-                try:
-                    return float(parts[2].strip().replace("%", ""))
-                except ValueError:
-                    pass
-        m = re.search(r"(\d+\.?\d*)%", line)
-        return float(m.group(1)) if m else None
+            process.wait()
+            if process.returncode != 0 and not self.cancelled:
+                raise RuntimeError("Playlist expansion failed.")
+        finally:
+            if process.poll() is None:
+                self._kill_process(process)
+                process.wait()
+            with self._proc_lock:
+                if self.process is process:
+                    self.process = None
+
+    def _iter_playlist_inprocess(self, cmd: list[str], url: str, on_progress):
+        """In-process variant of iter_playlist: walks the raw, unprocessed entries generator."""
+        try:
+            import yt_dlp
+        except ImportError:
+            raise RuntimeError(
+                "The in-process engine needs the yt-dlp Python package (pip install yt-dlp)."
+            ) from None
+
+        def emit(message: str):
+            if on_progress:
+                for line in str(message).splitlines():
+                    on_progress(line)
+
+        class _Logger:
+            debug = info = warning = error = staticmethod(emit)
+
+        ydl_opts = dict(yt_dlp.parse_options(cmd[1:]).ydl_opts)
+        ydl_opts["logger"] = _Logger()
+
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            # process=False keeps "entries" as the extractor's lazy generator
+            result = ydl.extract_info(url, download=False, process=False)
+            if not result:
+                raise RuntimeError("Playlist expansion failed.")
+
+            entries = result.get("entries")
+            if entries is None:
+                entries = [result]
+
+            for entry in entries:
+                if self.cancelled:
+                    return
+                if not entry:
+                    continue
+                entry_url = entry.get("webpage_url") or entry.get("url") or url
+                extractor = entry.get("extractor_key") or entry.get("ie_key")
+                video_id = entry.get("id")
+                archive_id = make_archive_id(extractor, video_id) if extractor and video_id else None
+                yield entry_url, entry.get("title") or "NA", archive_id
+
+    def _prune_strategies(
+        self,
+        strategies: list[tuple[str, list[str]]],
+        start: int,
+        failures: set[str],
+        attempt_durations: list[float],
+        on_progress=None,
+    ):
+        """Drop pending strategies (from index `start` on) that `failures` rules out.
+
+        Each dropped strategy adds the mean attempt duration so far to `time_saved`.
+        """
+        if not failures:
+            return
+
+        mean_duration = sum(attempt_durations) / len(attempt_durations) if attempt_durations else 0.0
+        i = start
+        while i < len(strategies):
+            label, cmd = strategies[i]
+            reason = _strategy_ruled_out(failures, cmd)
+            if reason is None:
+                i += 1
+                continue
+            del strategies[i]
+            self.time_saved += mean_duration
+            if on_progress:
+                on_progress(f"[info] skipping {label}: {reason} (~{mean_duration:.1f}s saved)")
+
+    def _kill_process(self, process):
+        """Stop a yt-dlp process together with its children, without blocking the caller.
+
+        SIGTERM first, SIGKILL for the whole process group if it is still alive
+        TERM_GRACE_SECONDS later; once it is gone the attempt's reader sees EOF.
+        """
+        self._stopping = stop_tree(process)
+
+    def cancel(self, keep_partial: bool = False):
+        """Cancel the current download.
+
+        Its `.part` files are deleted once the processes are gone, unless
+        `keep_partial` (the app is shutting down and will resume the job).
+        """
+        self.keep_partial = keep_partial
+        self.cancelled = True
+        with self._proc_lock:
+            process = self.process
+
+        if process:
+            self._kill_process(process)
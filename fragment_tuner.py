@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+
+from json_store import JsonStore
+from output_classifier import FAIL_RATE_LIMITED, SIGNAL_FRAGMENT_RETRY, SIGNAL_SERVER_BUSY
+from progress import ProgressRecord
+from shared import process_wide
+
+FRAGMENT_TUNING_PATH  = os.path.join(os.path.expanduser("~"), ".yt-dlp-gui", "fragments.json")
+FRAGMENT_TTL_SECONDS  = 24 * 60 * 60
+FRAGMENT_START_LEVEL  = 2
+FRAGMENT_MAX_LEVEL    = 16
+FRAGMENT_MIN_GAIN     = 0.10  # speed-up a doubling must bring to keep ramping
+THROTTLE_RESTART_HITS = 3     # throttling lines in one attempt before it backs off mid-job
+MIN_SPEED_SAMPLES     = 3     # fewer reported speeds are too noisy to tune from
+MIN_SAMPLE_SECONDS    = 0.5
+
+# downloader tags yt-dlp prints for fragmented (HLS / DASH) downloads
+FRAGMENT_TAGS = ("[hlsnative]", "[dashsegments]")
+# output kinds (see output_classifier) that mean the server is pushing back on parallel fragment requests
+THROTTLE_KINDS = {FAIL_RATE_LIMITED, SIGNAL_FRAGMENT_RETRY, SIGNAL_SERVER_BUSY}
+
+
+class FragmentSample:
+    """Throughput and throttling seen while one attempt ran at one concurrency level."""
+
+    def __init__(self, level: int):
+        self.level      = level
+        self.fragmented = False
+        self.throttled  = 0
+        self._speeds    = []
+        self._first     = None  # (time, downloaded bytes) of the first downloading record
+        self._last      = None
+
+    def observe(self, item):
+        if isinstance(item, ProgressRecord):
+            if item.status == "downloading" and item.speed:
+                self._speeds.append(item.speed)
+            if item.status in ("downloading", "finished") and item.downloaded is not None:
+                sample = (time.monotonic(), item.downloaded)
+                if self._first is None or sample[1] < self._last[1]:
+                    self._first = sample  # next format (video -> audio) restarts the count
+                self._last = sample
+            return
+
+        if item.startswith(FRAGMENT_TAGS):
+            self.fragmented = True
+
+    def note(self, kind: str):
+        """Count an output line the reader classified as `kind`."""
+        if kind in THROTTLE_KINDS:
+            self.throttled += 1
+
+    @property
+    def speed(self) -> float | None:
+        """Average bytes/s over the observed download, or None if too short to tell.
+
+        yt-dlp's own speed readings are preferred: piped output can arrive in
+        bursts, which skews speeds derived from when the records were seen.
+        """
+        if len(self._speeds) >= MIN_SPEED_SAMPLES:
+            return sum(self._speeds) / len(self._speeds)
+        if not self._first or not self._last:
+            return None
+        elapsed = self._last[0] - self._first[0]
+        if elapsed < MIN_SAMPLE_SECONDS:
+            return None
+        return (self._last[1] - self._first[1]) / elapsed
+
+
+class FragmentTuner:
+    """Per-host `--concurrent-fragments` level, tuned from finished downloads.
+
+    fragments.json maps a host to `{"level", "best_level", "best_speed",
+    "ceiling", "at"}`: the level to use next, the fastest level so far and its
+    speed in bytes/s, the highest level allowed, and when it was last updated.
+
+    A host starts at FRAGMENT_START_LEVEL and the level doubles after every
+    fragmented download that beat the best speed seen so far by FRAGMENT_MIN_GAIN.
+    A doubling that brings nothing settles the host on the previous level;
+    throttling (429 / fragment retries) halves it and caps it there. Entries
+    expire after FRAGMENT_TTL_SECONDS, so a host is re-probed now and then.
+    """
+
+    def __init__(self, path: str | None = FRAGMENT_TUNING_PATH, ttl: float = FRAGMENT_TTL_SECONDS):
+        self.path   = path
+        self.ttl    = ttl
+        self._lock  = threading.Lock()
+        self._store = JsonStore(path)
+
+    def level(self, host: str) -> int:
+        with self._lock:
+            entry = self._entry(host)
+            return entry["level"] if entry else FRAGMENT_START_LEVEL
+
+    def record(self, host: str, sample: FragmentSample):
+        """Update the host's level from a finished (or backed-off) attempt."""
+        if not sample.fragmented:
+            return
+        speed = sample.speed
+        with self._lock:
+            entry = self._entry(host) or {
+                "level": sample.level,
+                "best_level": None,
+                "best_speed": 0.0,
+                "ceiling": FRAGMENT_MAX_LEVEL,
+            }
+            if sample.throttled:
+                entry["ceiling"] = max(1, sample.level // 2)
+                entry["level"] = entry["best_level"] = entry["ceiling"]
+                entry["best_speed"] = 0.0
+            elif speed is None:
+                return
+            elif speed > entry["best_speed"] * (1 + FRAGMENT_MIN_GAIN):
+                entry["best_level"] = sample.level
+                entry["best_speed"] = speed
+                entry["level"] = min(sample.level * 2, entry["ceiling"])
+            elif entry["best_level"] and sample.level > entry["best_level"]:
+                # more parallel requests did not help: settle one step down
+                entry["level"] = entry["ceiling"] = entry["best_level"]
+            elif sample.level == entry["best_level"]:
+                entry["best_speed"] = max(entry["best_speed"], speed)
+            entry["at"] = time.time()
+            self._store.data[host] = entry
+            self._store.save()
+
+    def _entry(self, host: str) -> dict | None:
+        """Fresh entry for `host`, dropping an expired one. Caller holds the lock."""
+        entry = self._store.data.get(host)
+        if entry and time.time() - entry.get("at", 0) > self.ttl:
+            del self._store.data[host]
+            self._store.save()
+            return None
+        return entry
+
+
+@process_wide
+def shared_fragment_tuner() -> FragmentTuner:
+    """Process-wide FragmentTuner shared by every Downloader."""
+    return FragmentTuner()
@@ -0,0 +1,159 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+from shared import process_wide
+
+INFO_CACHE_DIR         = os.path.join(os.path.expanduser("~"), ".yt-dlp-gui", "info-cache")
+INFO_CACHE_TTL_SECONDS = 60 * 60
+INFO_CACHE_MAX_ENTRIES = 200
+INFO_SUFFIX            = ".info.json"
+SELECTION_SUFFIX       = ".format"
+
+
+def normalize_url(url: str) -> str:
+    """Reduce equivalent URLs to one cache key (YouTube links collapse to the video id)."""
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or "").lower()
+    if host.startswith("www.") or host.startswith("m."):
+        host = host.split(".", 1)[1]
+
+    query = dict(parse_qsl(parsed.query))
+    if host in ("youtube.com", "music.youtube.com") and parsed.path == "/watch" and query.get("v"):
+        return f"youtube:{query['v']}"
+    if host == "youtu.be" and parsed.path.strip("/"):
+        return f"youtube:{parsed.path.strip('/')}"
+    if host == "youtube.com" and parsed.path.startswith("/shorts/"):
+        return f"youtube:{parsed.path.split('/')[2]}"
+
+    return f"{host}{parsed.path.rstrip('/')}?{urlencode(sorted(query.items()))}"
+
+
+def cookie_identity(cookies_file: str | None, cookies_browser: str | None) -> str:
+    """Identify the cookie source; a changed cookies.txt yields a new identity."""
+    if cookies_file:
+        try:
+            mtime = os.path.getmtime(cookies_file)
+        except OSError:
+            mtime = 0
+        return f"file:{os.path.abspath(cookies_file)}:{mtime}"
+    if cookies_browser:
+        return f"browser:{cookies_browser}"
+    return ""
+
+
+class InfoCache:
+    """On-disk cache of yt-dlp info JSON files with a TTL and an LRU entry limit.
+
+    yt-dlp writes the file itself (`--write-info-json`) during a normal attempt;
+    later attempts for the same key hand it back via `--load-info-json` and skip
+    extraction. The TTL stays well below the lifetime of signed media URLs.
+    """
+
+    def __init__(
+        self,
+        directory: str = INFO_CACHE_DIR,
+        ttl: float = INFO_CACHE_TTL_SECONDS,
+        max_entries: int = INFO_CACHE_MAX_ENTRIES,
+    ):
+        self.directory   = directory
+        self.ttl         = ttl
+        self.max_entries = max_entries
+        self._lock       = threading.Lock()
+        self._entries    = None  # key -> created_at, least recently used first
+
+    @staticmethod
+    def key(url: str, client: str, cookies: str) -> str:
+        import hashlib
+
+        raw = json.dumps([normalize_url(url), client, cookies])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key + INFO_SUFFIX)
+
+    def selection_path(self, key: str, format_spec: str) -> str:
+        """File holding the format ids `format_spec` picked from the info JSON of `key`."""
+        import hashlib
+
+        digest = hashlib.sha256(format_spec.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.directory, f"{key}.{digest}{SELECTION_SUFFIX}")
+
+    def selection(self, key: str, format_spec: str) -> str | None:
+        """Format ids `format_spec` picked from the cached info JSON, if they were recorded for it."""
+        path = self.selection_path(key, format_spec)
+        try:
+            if os.path.getmtime(path) < os.path.getmtime(self.path_for(key)):
+                return None  # the info JSON was extracted again since
+            with open(path, encoding="utf-8", errors="replace") as handle:
+                return handle.read().strip() or None
+        except OSError:
+            return None
+
+    def lookup(self, key: str) -> str | None:
+        """Return the info JSON path for `key` if it is present and fresh."""
+        with self._lock:
+            entries = self._load()
+            created_at = entries.get(key)
+            if created_at is None:
+                return None
+            path = self.path_for(key)
+            if time.time() - created_at > self.ttl or not os.path.isfile(path):
+                self._drop(key)
+                return None
+            entries.move_to_end(key)
+            return path
+
+    def commit(self, key: str):
+        """Register a file yt-dlp just wrote for `key` and evict past the size limit."""
+        path = self.path_for(key)
+        with self._lock:
+            entries = self._load()
+            if not os.path.isfile(path):
+                entries.pop(key, None)
+                return
+            entries[key] = os.path.getmtime(path)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                self._drop(next(iter(entries)))
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._load()
+            self._drop(key)
+
+    def _load(self) -> OrderedDict:
+        """Scan the cache directory once, oldest files first. Caller holds the lock."""
+        if self._entries is None:
+            found = []
+            if os.path.isdir(self.directory):
+                for name in os.listdir(self.directory):
+                    if name.endswith(INFO_SUFFIX):
+                        try:
+                            mtime = os.path.getmtime(os.path.join(self.directory, name))
+                        except OSError:
+                            continue
+                        found.append((mtime, name[: -len(INFO_SUFFIX)]))
+            self._entries = OrderedDict((key, mtime) for mtime, key in sorted(found))
+        return self._entries
+
+    def _drop(self, key: str):
+        """Forget `key` and delete its files. Caller holds the lock."""
+        import glob
+
+        self._entries.pop(key, None)
+        paths = glob.glob(os.path.join(glob.escape(self.directory), f"{key}.*{SELECTION_SUFFIX}"))
+        for path in [self.path_for(key)] + paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+@process_wide
+def shared_info_cache() -> InfoCache:
+    """Process-wide InfoCache shared by every Downloader."""
+    return InfoCache()
@@ -0,0 +1,279 @@
+import json
+import os
+import threading
+import uuid
+
+from downloader import DESTINATION_PREFIXES
+from jobs import JobQueue, JOB_CANCELLED, JOB_FINISHED, JOB_SKIPPED
+from json_store import write_atomically
+
+JOURNAL_PATH = os.path.join(os.path.expanduser("~"), ".yt-dlp-gui", "journal.jsonl")
+# compact once this many records belong to jobs that are over, and they are most of the file
+COMPACT_MIN_DEAD = 500
+
+# record kinds
+OP_QUEUED   = "queued"    # job with everything needed to queue it again
+OP_STRATEGY = "strategy"  # strategy the job's current attempt uses
+OP_FILE     = "file"      # a destination yt-dlp is writing (its .part file lives next to it)
+OP_DONE     = "done"      # job is over and must not come back (a playlist entry's also marks its URL completed)
+OP_PLAYLIST = "playlist"  # playlist / channel being listed
+OP_LISTED   = "listed"    # listing finished
+
+JOB_FIELDS = (
+    "url", "output_dir", "cookies_file", "cookies_browser", "format_str",
+    "engine", "use_archive", "archive_id", "title",
+)
+
+
+def _part_bytes(path: str) -> int:
+    try:
+        return os.path.getsize(path + ".part")
+    except OSError:
+        return 0
+
+
+class JobJournal:
+    """Append-only, fsynced record of the queue, so a crash or a closed app loses nothing.
+
+    Attached to a JobQueue it writes one JSON line per event: a job queued (with
+    its options), the strategy of each attempt, the files yt-dlp writes to, and
+    the job being over. Jobs still open when the process died are queued again
+    by restore(), starting with the strategy that was running; yt-dlp then
+    continues their `.part` files. Jobs cancelled by shutting the queue down are
+    not recorded as over, so closing the app mid-batch resumes it next time.
+    A torn last line from a crash is ignored on replay.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH):
+        self.path      = path
+        self._lock     = threading.Lock()
+        self._handle   = None
+        self._session  = uuid.uuid4().hex[:8]  # job ids restart every run; keys must not
+        self._queue    = None
+        self._listener = None
+        self._live     = {}  # key -> replayed state of jobs / playlists that are not over
+        self._dead     = 0   # records of finished work still in the file
+
+    def restore(self, queue: JobQueue) -> dict:
+        """Attach to `queue` and queue again whatever the last run left unfinished.
+
+        Returns the restored job URLs and counts of jobs, playlists and bytes already on disk.
+        """
+        pending = self._replay()
+        self.attach(queue)
+
+        restored = {"jobs": 0, "playlists": 0, "partial_bytes": 0, "urls": set()}
+        restored_urls = restored["urls"]
+        restored_urls.update(entry["job"]["url"] for entry in pending.values() if entry["op"] == OP_QUEUED)
+
+        # listings run again; entries restored below, finished before the crash or in the
+        # archive are not queued twice
+        expansions = {}
+        for key, entry in pending.items():
+            if entry["op"] == OP_PLAYLIST:
+                expansions[key] = queue.submit_playlist(
+                    entry["url"], skip_urls=restored_urls, completed=entry["completed"], **entry["options"]
+                )
+                restored["playlists"] += 1
+                self._append({"op": OP_LISTED, "key": key})
+
+        for key, entry in pending.items():
+            if entry["op"] == OP_QUEUED:
+                job = entry["job"]
+                queue.submit(
+                    job["url"],
+                    output_dir=job.get("output_dir"),
+                    cookies_file=job.get("cookies_file"),
+                    cookies_browser=job.get("cookies_browser"),
+                    format_str=job["format_str"],
+                    engine=job["engine"],
+                    use_archive=job.get("use_archive", False),
+                    title=job.get("title"),
+                    archive_id=job.get("archive_id"),
+                    strategy=entry.get("strategy"),
+                    playlist=expansions.get(entry.get("playlist")),
+                )
+                restored["jobs"] += 1
+                restored["partial_bytes"] += sum(_part_bytes(path) for path in entry.get("files", ()))
+                # the new job has its own record now; a crash before this line only repeats it
+                self._append({"op": OP_DONE, "key": key, "status": "restored"})
+
+        self.compact()
+        return restored
+
+    def attach(self, queue: JobQueue):
+        self._queue = queue
+        self._listener = queue.add_listener(self._on_progress, self._on_state, self._on_expansion)
+
+    def compact(self):
+        """Rewrite the journal with one record per unfinished job or playlist."""
+        with self._lock:
+            records = []
+            for key, entry in self._live.items():
+                if entry["op"] == OP_QUEUED:
+                    records.append({"op": OP_QUEUED, "key": key, "playlist": entry["playlist"], **entry["job"]})
+                    if entry.get("strategy"):
+                        records.append({"op": OP_STRATEGY, "key": key, "label": entry["strategy"]})
+                    records += [{"op": OP_FILE, "key": key, "path": path} for path in entry.get("files", ())]
+                else:
+                    records.append({
+                        "op": OP_PLAYLIST,
+                        "key": key,
+                        "url": entry["url"],
+                        "options": entry["options"],
+                        "completed": sorted(entry["completed"]),
+                    })
+
+            if self._handle:
+                self._handle.close()  # reopened on the next append, on the new file
+                self._handle = None
+            written = write_atomically(
+                self.path,
+                lambda stream: stream.writelines(json.dumps(record) + "\n" for record in records),
+                durable=True,
+            )
+            if written:
+                self._dead = 0
+
+    def close(self):
+        if self._queue and self._listener:
+            self._queue.remove_listener(self._listener)
+            self._listener = None
+        with self._lock:
+            if self._handle:
+                self._handle.close()
+                self._handle = None
+
+    # helpers
+
+    def _replay(self) -> dict:
+        """Read the journal into `_live`; returns the unfinished entries of earlier runs."""
+        with self._lock:
+            self._live = {}
+            self._dead = 0
+            try:
+                with open(self.path, encoding="utf-8") as handle:
+                    for line in handle:
+                        try:
+                            self._apply(json.loads(line))
+                        except (ValueError, KeyError, TypeError, AttributeError):
+                            continue  # torn write from a crash
+            except OSError:
+                pass
+            return dict(self._live)
+
+    def _apply(self, record: dict):
+        """Fold one record into `_live` / `_dead`. Caller holds the lock."""
+        op, key = record["op"], record["key"]
+        if op == OP_QUEUED:
+            self._live[key] = {
+                "op": op,
+                "job": {field: record.get(field) for field in JOB_FIELDS},
+                "playlist": record.get("playlist"),  # key of the listing that queued the job
+                "records": 1,
+            }
+            return
+        if op == OP_PLAYLIST:
+            self._live[key] = {
+                "op": op,
+                "url": record["url"],
+                "options": record.get("options") or {},
+                "completed": set(record.get("completed") or ()),
+                "records": 1,
+            }
+            return
+        playlist = self._live.get(record.get("playlist"))
+        if op == OP_DONE and playlist is not None and playlist["op"] == OP_PLAYLIST:
+            playlist["completed"].add(record["url"])
+        entry = self._live.get(key)
+        if entry is None:
+            self._dead += 1
+            return
+        entry["records"] += 1
+        if op == OP_STRATEGY:
+            entry["strategy"] = record["label"]
+        elif op == OP_FILE:
+            entry.setdefault("files", []).append(record["path"])
+        elif op in (OP_DONE, OP_LISTED):
+            del self._live[key]
+            self._dead += entry["records"]
+
+    def _append(self, record: dict):
+        with self._lock:
+            needs_compaction = self._write(record)
+        if needs_compaction:
+            self.compact()
+
+    def _write(self, record: dict) -> bool:
+        """Fold in and append one record; True when the journal is due for compaction. Caller holds the lock."""
+        self._apply(record)
+        try:
+            if self._handle is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._handle = open(self.path, "a", encoding="utf-8")
+            self._handle.write(json.dumps(record) + "\n")
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+        except OSError:
+            pass
+        return self._dead >= COMPACT_MIN_DEAD and self._dead > len(self._live)
+
+    def _job_key(self, job) -> str:
+        return f"{self._session}-{job.id}"
+
+    def _on_state(self, job):
+        key = self._job_key(job)
+        if job.done:
+            if job.status == JOB_CANCELLED and self._queue.closed:
+                return  # cancelled by shutting down, not by the user: resume next time
+            record = {"op": OP_DONE, "key": key, "status": job.status}
+            if job.playlist is not None and job.status in (JOB_FINISHED, JOB_SKIPPED):
+                record.update(playlist=self._playlist_key(job.playlist), url=job.url)
+            self._append(record)
+            return
+
+        # checked and written under one lock: workers report the same job concurrently
+        needs_compaction = False
+        with self._lock:
+            entry = self._live.get(key)
+            if entry is None:
+                playlist = self._playlist_key(job.playlist) if job.playlist is not None else None
+                needs_compaction = self._write({
+                    "op": OP_QUEUED,
+                    "key": key,
+                    "playlist": playlist,
+                    **{field: getattr(job, field) for field in JOB_FIELDS},
+                })
+            elif job.strategy and job.strategy != entry.get("strategy"):
+                needs_compaction = self._write({"op": OP_STRATEGY, "key": key, "label": job.strategy})
+        if needs_compaction:
+            self.compact()
+
+    def _on_progress(self, job, line):
+        if isinstance(line, str) and line.startswith(DESTINATION_PREFIXES):
+            path = line.split(": ", 1)[1] if line.startswith("[download]") else line.split(" into ", 1)[1]
+            path = path.strip().strip('"')
+            key = self._job_key(job)
+            with self._lock:
+                entry = self._live.get(key)
+                if entry is None or path in entry.get("files", ()):
+                    return
+                needs_compaction = self._write({"op": OP_FILE, "key": key, "path": path})
+            if needs_compaction:
+                self.compact()
+
+    def _playlist_key(self, expansion) -> str:
+        return f"{self._session}-playlist-{id(expansion)}"
+
+    def _on_expansion(self, expansion):
+        key = self._playlist_key(expansion)
+        if not expansion.done:
+            self._append({
+                "op": OP_PLAYLIST,
+                "key": key,
+                "url": expansion.url,
+                "options": expansion.options,
+                "completed": sorted(expansion.completed),
+            })
+        elif not (expansion.cancelled and self._queue.closed):
+            self._append({"op": OP_LISTED, "key": key})
@@ -0,0 +1,560 @@
+import threading
+import itertools
+from collections import deque
+
+from downloader import Downloader, DEFAULT_FORMAT, ENGINE_SUBPROCESS
+from progress import ProgressRecord, STATUS_PROCESSING
+
+DEFAULT_WORKERS    = 2
+MAX_WORKERS        = 8
+PLAYLIST_LOOKAHEAD = 10   # queued-but-not-started entries before expansion pauses
+MAX_FINISHED_JOBS  = 500  # finished jobs kept for listing; older ones are forgotten
+
+JOB_QUEUED     = "queued"
+JOB_RUNNING    = "running"
+JOB_PROCESSING = "processing"  # downloaded; merge / transcode left to the post-processing pool
+JOB_FINISHED   = "finished"
+JOB_FAILED     = "failed"
+JOB_CANCELLED  = "cancelled"
+JOB_SKIPPED    = "skipped"
+
+FINAL_STATES = (JOB_FINISHED, JOB_FAILED, JOB_CANCELLED, JOB_SKIPPED)
+
+
+class Job:
+    """A single queued download and its per-job progress / error state."""
+
+    def __init__(
+        self,
+        job_id: int,
+        url: str,
+        output_dir: str | None = None,
+        cookies_file: str | None = None,
+        cookies_browser: str | None = None,
+        format_str: str = DEFAULT_FORMAT,
+        engine: str = ENGINE_SUBPROCESS,
+        use_archive: bool = False,
+        archive_id: str | None = None,
+        strategy: str | None = None,
+    ):
+        self.id              = job_id
+        self.url             = url
+        self.output_dir      = output_dir
+        self.cookies_file    = cookies_file
+        self.cookies_browser = cookies_browser
+        self.format_str      = format_str
+        self.engine          = engine
+        self.use_archive     = use_archive
+        self.archive_id      = archive_id
+        self.strategy        = strategy  # strategy of the current (or last) attempt
+
+        self.status     = JOB_QUEUED
+        self.title      = None
+        self.percent    = None
+        self.progress   = None
+        self.error      = None
+        self.time_saved = 0.0
+        self.cancelled  = False
+        self.downloader = None
+        self.post_task  = None
+        self.playlist   = None  # PlaylistExpansion that queued the job
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINAL_STATES
+
+    def display_name(self) -> str:
+        return self.title or self.url
+
+    def as_dict(self) -> dict:
+        """JSON-ready snapshot of the job for external clients."""
+        progress = self.progress
+        return {
+            "id":         self.id,
+            "url":        self.url,
+            "status":     self.status,
+            "title":      self.title,
+            "percent":    self.percent,
+            "downloaded": progress.downloaded if progress else None,
+            "total":      progress.total if progress else None,
+            "speed":      progress.speed if progress else None,
+            "eta":        progress.eta if progress else None,
+            "error":      self.error,
+            "output_dir": self.output_dir,
+            "engine":     self.engine,
+            "strategy":   self.strategy,
+            "time_saved": round(self.time_saved, 3),
+        }
+
+    def _apply_progress(self, record: ProgressRecord):
+        """Keep the latest progress sample and the fields derived from it."""
+        if record.status == STATUS_PROCESSING:
+            # seconds of media, not bytes: the last download sample stays for the totals
+            if record.percent is not None:
+                self.percent = record.percent
+            return
+        self.progress = record
+        if record.title:
+            self.title = record.title
+        percent = record.percent
+        if percent is not None:
+            self.percent = percent
+
+
+class PlaylistExpansion:
+    """Streams the entries of one playlist/channel URL into a JobQueue."""
+
+    def __init__(self, url: str, options: dict | None = None):
+        self.url        = url
+        self.options    = options or {}
+        self.found      = 0
+        self.skipped    = 0
+        self.done       = False
+        self.error      = None
+        self.cancelled  = False
+        self.downloader = None
+        self.completed  = set()  # entry URLs finished by an earlier run; never queued again
+
+    def cancel(self):
+        self.cancelled = True
+        downloader = self.downloader
+        if downloader:
+            downloader.cancel()
+
+
+class JobQueue:
+    """Bounded worker pool; every worker runs its own Downloader strategy loop per job.
+
+    Callbacks are invoked from worker threads:
+        on_progress(job, line) — every output line (str) or ProgressRecord of a running job
+        on_state(job)          — whenever a job changes status
+        on_expansion(exp)      — when a playlist expansion starts or ends
+
+    A job whose merge / transcode can run apart (see Downloader.run) moves to
+    JOB_PROCESSING once downloaded and frees its worker for the next job; the
+    `postprocessor` pool finishes it, reporting records with status "processing".
+
+    Further observers (e.g. the local API) subscribe with add_listener().
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        on_progress=None,
+        on_state=None,
+        on_expansion=None,
+        downloader_factory=Downloader,
+        postprocessor: "PostProcessor | None" = None,
+    ):
+        self.on_progress        = on_progress
+        self.on_state           = on_state
+        self.on_expansion       = on_expansion
+        self.downloader_factory = downloader_factory
+        self._postprocessor     = postprocessor  # the shared pool unless given, looked up on first use
+
+        self._max_workers = max(1, min(int(workers), MAX_WORKERS))
+        self._pending     = deque()
+        self._jobs        = {}
+        self._expansions  = []
+        self._threads     = []
+        self._ids         = itertools.count(1)
+        self._listeners   = ()  # replaced, never mutated, so emitters iterate without the lock
+        self._cond        = threading.Condition()
+        self._closed      = False
+
+    # public api
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    @property
+    def closed(self) -> bool:
+        """True once shutdown() was called; jobs cancelled after that were not cancelled by the user."""
+        return self._closed
+
+    @property
+    def postprocessor(self) -> "PostProcessor":
+        """Pool that runs the merges / transcodes jobs hand over (see postprocess.py)."""
+        if self._postprocessor is None:
+            from postprocess import shared_postprocessor
+
+            self._postprocessor = shared_postprocessor()
+        return self._postprocessor
+
+    def set_workers(self, workers: int):
+        """Resize the pool. Extra workers exit after their current job."""
+        with self._cond:
+            self._max_workers = max(1, min(int(workers), MAX_WORKERS))
+            self._spawn_workers()
+            self._cond.notify_all()
+
+    def submit(
+        self,
+        url: str,
+        output_dir: str | None = None,
+        cookies_file: str | None = None,
+        cookies_browser: str | None = None,
+        format_str: str = DEFAULT_FORMAT,
+        engine: str = ENGINE_SUBPROCESS,
+        use_archive: bool = False,
+        title: str | None = None,
+        archive_id: str | None = None,
+        strategy: str | None = None,
+        playlist: PlaylistExpansion | None = None,
+    ) -> Job:
+        """Queue a download and return its Job. `strategy` is tried first (see Downloader.run)."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("job queue is shut down")
+            job = Job(
+                next(self._ids),
+                url,
+                output_dir=output_dir,
+                cookies_file=cookies_file,
+                cookies_browser=cookies_browser,
+                format_str=format_str,
+                engine=engine,
+                use_archive=use_archive,
+                archive_id=archive_id,
+                strategy=strategy,
+            )
+            job.title    = title
+            job.playlist = playlist
+            self._jobs[job.id] = job
+            self._pending.append(job)
+            self._spawn_workers()
+            self._cond.notify()
+
+        self._emit_state(job)
+        return job
+
+    def submit_playlist(
+        self,
+        url: str,
+        output_dir: str | None = None,
+        cookies_file: str | None = None,
+        cookies_browser: str | None = None,
+        format_str: str = DEFAULT_FORMAT,
+        engine: str = ENGINE_SUBPROCESS,
+        use_archive: bool = False,
+        skip_urls: set | None = None,
+        completed: set | None = None,
+    ) -> PlaylistExpansion:
+        """Expand a playlist/channel lazily, queueing each entry as soon as it is listed.
+
+        Expansion pauses while PLAYLIST_LOOKAHEAD entries are waiting, so downloads of
+        the first items overlap enumeration and a huge channel never sits in memory.
+        Entries already in the download archive, in `skip_urls` (already queued
+        elsewhere) or in `completed` (finished by an earlier run of this listing)
+        are counted and never queued.
+        """
+        options = {
+            "output_dir": output_dir,
+            "cookies_file": cookies_file,
+            "cookies_browser": cookies_browser,
+            "format_str": format_str,
+            "engine": engine,
+            "use_archive": use_archive,
+        }
+        expansion = PlaylistExpansion(url, options)
+        expansion.completed = set(completed or ())
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("job queue is shut down")
+            self._expansions.append(expansion)
+
+        thread = threading.Thread(
+            target=self._expand, args=(expansion, options, skip_urls or set()), daemon=True
+        )
+        thread.start()
+        return expansion
+
+    def add_listener(self, on_progress=None, on_state=None, on_expansion=None) -> tuple:
+        """Register extra callbacks (same signatures as the constructor's); returns a handle."""
+        listener = (on_progress, on_state, on_expansion)
+        with self._cond:
+            self._listeners = self._listeners + (listener,)
+        return listener
+
+    def remove_listener(self, listener: tuple):
+        with self._cond:
+            self._listeners = tuple(item for item in self._listeners if item is not listener)
+
+    def jobs(self) -> list[Job]:
+        with self._cond:
+            return list(self._jobs.values())
+
+    def get(self, job_id: int) -> Job | None:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def counts(self) -> dict:
+        """Return the number of jobs per status."""
+        result = {}
+        for job in self.jobs():
+            result[job.status] = result.get(job.status, 0) + 1
+        return result
+
+    def active(self) -> bool:
+        with self._cond:
+            if any(not exp.done for exp in self._expansions):
+                return True
+        return any(not job.done for job in self.jobs())
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a queued or running job. Returns False if it already finished."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.done:
+                return False
+            job.cancelled = True
+            downloader = job.downloader
+            post_task  = job.post_task
+            was_queued = job.status == JOB_QUEUED
+            if was_queued:
+                try:
+                    self._pending.remove(job)
+                except ValueError:
+                    pass
+                job.status = JOB_CANCELLED
+
+        if downloader:
+            # shutting down keeps .part files so the journal can resume the job
+            downloader.cancel(keep_partial=self._closed)
+        if post_task:
+            self.postprocessor.cancel(post_task, keep_inputs=self._closed)
+        if was_queued:
+            self._emit_state(job)
+        return True
+
+    def cancel_all(self):
+        with self._cond:
+            expansions = [exp for exp in self._expansions if not exp.done]
+        for expansion in expansions:
+            expansion.cancel()
+        for job in self.jobs():
+            self.cancel(job.id)
+
+    def clear_finished(self):
+        """Forget jobs that reached a final state."""
+        with self._cond:
+            for job_id in [j.id for j in self._jobs.values() if j.done]:
+                del self._jobs[job_id]
+
+    def shutdown(self, cancel: bool = True):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if cancel:
+            self.cancel_all()
+
+    # workers
+
+    def _spawn_workers(self):
+        """Start threads up to the current limit. Caller holds the lock."""
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < min(self._max_workers, len(self._pending) + self._running()):
+            thread = threading.Thread(target=self._worker, daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _running(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == JOB_RUNNING)
+
+    def _next_job(self) -> Job | None:
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+                if self._running() >= self._max_workers:
+                    # pool shrank: let this worker go once others are busy
+                    self._threads = [t for t in self._threads if t is not threading.current_thread()]
+                    return None
+                if self._pending:
+                    job = self._pending.popleft()
+                    self._cond.notify_all()  # wake playlist expansions waiting for room
+                    job.status = JOB_RUNNING
+                    return job
+                if not self._cond.wait(timeout=5.0):
+                    self._threads = [t for t in self._threads if t is not threading.current_thread()]
+                    return None
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            self._emit_state(job)
+            self._run_job(job)
+            with self._cond:
+                job.downloader = None
+                self._forget_old_jobs()
+                self._cond.notify_all()
+            self._emit_state(job)
+            task = job.post_task
+            if task is not None:
+                if job.cancelled:
+                    # cancelled while handing over: submit() finishes it as cancelled
+                    self.postprocessor.cancel(task, keep_inputs=self._closed)
+                self.postprocessor.submit(task)
+
+    def _finish_processing(self, job: Job, task: "PostTask"):
+        """on_done of a job's PostTask; runs on a post-processing thread."""
+        from postprocess import TASK_FINISHED, TASK_CANCELLED
+
+        if task.status == TASK_FINISHED:
+            job.status  = JOB_FINISHED
+            job.percent = 100.0
+        elif task.status == TASK_CANCELLED:
+            job.status = JOB_CANCELLED
+        else:
+            job.status = JOB_FAILED
+            job.error  = f"Post-processing failed: {task.error or 'unknown error'}"
+        with self._cond:
+            job.post_task = None
+            self._forget_old_jobs()
+        self._emit_state(job)
+
+    def _forget_old_jobs(self):
+        """Keep at most MAX_FINISHED_JOBS finished jobs. Caller holds the lock."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def _expand(self, expansion: PlaylistExpansion, options: dict, skip_urls: set):
+        downloader = self.downloader_factory(options["output_dir"])
+        downloader.engine = options["engine"]
+        downloader.use_archive = options["use_archive"]
+        expansion.downloader = downloader
+        self._emit_expansion(expansion)
+
+        try:
+            entries = downloader.iter_playlist(
+                expansion.url,
+                cookies_file=options["cookies_file"],
+                cookies_browser=options["cookies_browser"],
+            )
+            for entry_url, title, archive_id in entries:
+                if entry_url in skip_urls or entry_url in expansion.completed or (
+                    options["use_archive"]
+                    and archive_id
+                    and downloader.archive.downloaded(archive_id, downloader.output_dir, options["format_str"])
+                ):
+                    expansion.skipped += 1
+                    continue
+                if not self._wait_for_room(expansion):
+                    break
+                self.submit(
+                    entry_url,
+                    title=title if title != "NA" else None,
+                    archive_id=archive_id,
+                    playlist=expansion,
+                    **options,
+                )
+                expansion.found += 1
+        except Exception as e:
+            expansion.error = str(e)
+        finally:
+            expansion.done = True
+            expansion.downloader = None
+            self._emit_expansion(expansion)
+
+    def _wait_for_room(self, expansion: PlaylistExpansion) -> bool:
+        """Block until the pending queue has room. Returns False if expansion should stop."""
+        with self._cond:
+            lookahead = max(PLAYLIST_LOOKAHEAD, self._max_workers * 2)
+            while len(self._pending) >= lookahead:
+                if self._closed or expansion.cancelled:
+                    return False
+                self._cond.wait(timeout=0.5)
+            return not (self._closed or expansion.cancelled)
+
+    def _run_job(self, job: Job):
+        def on_progress(line):
+            self._emit_progress(job, line)
+
+        def on_downloaded(task: "PostTask"):
+            task.title       = job.title or task.title
+            task.on_progress = on_progress
+            task.on_done     = lambda task: self._finish_processing(job, task)
+            job.post_task    = task
+            job.status       = JOB_PROCESSING
+            job.percent      = 0.0
+
+        def on_finished():
+            job.status  = JOB_FINISHED
+            job.percent = 100.0
+
+        def on_error(err):
+            job.status = JOB_FAILED
+            job.error  = err
+
+        def on_attempt(label):
+            if label != job.strategy:
+                job.strategy = label
+                self._emit_state(job)
+
+        # built outside the queue lock; a factory that fails (bad output folder, ...) fails the job
+        try:
+            downloader = self.downloader_factory(job.output_dir)
+            downloader.engine = job.engine
+            downloader.use_archive = job.use_archive
+        except Exception as e:
+            job.status = JOB_FAILED
+            job.error  = str(e) or "Could not start the download."
+            return
+        with self._cond:
+            job.downloader = downloader
+            if job.cancelled:
+                # cancelled before it had a downloader to stop
+                job.status = JOB_CANCELLED
+                return
+
+        downloader.run(
+            job.url,
+            on_progress=on_progress,
+            on_finished=on_finished,
+            on_error=on_error,
+            cookies_file=job.cookies_file,
+            cookies_browser=job.cookies_browser,
+            format_str=job.format_str,
+            archive_id=job.archive_id,
+            strategy=job.strategy,
+            on_attempt=on_attempt,
+            on_downloaded=on_downloaded,
+        )
+        job.time_saved = downloader.time_saved
+
+        if downloader.skipped:
+            job.status = JOB_SKIPPED
+        elif job.post_task is not None:
+            pass  # the post-processing pool decides how the job ends
+        elif job.cancelled:
+            job.status = JOB_CANCELLED
+        elif job.status == JOB_RUNNING:
+            job.status = JOB_FAILED
+            job.error  = job.error or "Download stopped unexpectedly."
+
+    def _emit_progress(self, job: Job, line):
+        if isinstance(line, ProgressRecord):
+            job._apply_progress(line)
+        if self.on_progress:
+            self.on_progress(job, line)
+        for listener in self._listeners:
+            if listener[0]:
+                listener[0](job, line)
+
+    def _emit_expansion(self, expansion: PlaylistExpansion):
+        if self.on_expansion:
+            self.on_expansion(expansion)
+        for listener in self._listeners:
+            if listener[2]:
+                listener[2](expansion)
+
+    def _emit_state(self, job: Job):
+        if self.on_state:
+            self.on_state(job)
+        for listener in self._listeners:
+            if listener[1]:
+                listener[1](job)
@@ -0,0 +1,63 @@
+import json
+import os
+import threading
+
+
+def write_atomically(path: str, write, durable: bool = False, mode: int = 0o666) -> bool:
+    """Write `path` through `write(stream)` into a temporary file next to it, then move that into place.
+
+    Readers see the old file or the new one, never half of one. `durable`
+    fsyncs the data before the move; `mode` is the new file's permissions
+    (less the umask). Returns False, leaving the old file as it was, on OSError.
+    """
+    temp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        descriptor = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+        with os.fdopen(descriptor, "w", encoding="utf-8") as stream:
+            write(stream)
+            if durable:
+                stream.flush()
+                os.fsync(stream.fileno())
+        os.replace(temp_path, path)
+        return True
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return False
+
+
+class JsonStore:
+    """A JSON object on disk: read on first use, replaced atomically on every save.
+
+    Holds no lock of its own; the owner calls it under its lock, which also
+    guards whatever it decides from `data`. A path of None keeps the data in
+    memory only.
+    """
+
+    def __init__(self, path: str | None):
+        self.path  = path
+        self._data = None
+
+    @property
+    def data(self) -> dict:
+        if self._data is None:
+            self._data = self._load()
+        return self._data
+
+    def save(self):
+        """Write `data` to `path` atomically (see write_atomically)."""
+        if self.path:
+            write_atomically(self.path, lambda stream: json.dump(self.data, stream))
+
+    def _load(self) -> dict:
+        if not self.path or not os.path.isfile(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as handle:
+                loaded = json.load(handle)
+        except (OSError, ValueError):
+            return {}
+        return loaded if isinstance(loaded, dict) else {}
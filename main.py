@@ -1,10 +1,42 @@
+import time
+
+STARTED_AT = time.perf_counter()  # reference point for --startup-time
+
 import customtkinter as ctk
 from tkinter import filedialog
 import os
 import re
-import time
-
-from downloader import Downloader, IS_WIN, DEFAULT_FORMAT, PRESETS, binary_available
+import sys
+import threading
+from collections import deque
+
+from downloader import (
+    Downloader,
+    IS_WIN,
+    DEFAULT_FORMAT,
+    DEFAULT_OUTPUT_DIR,
+    PRESETS,
+    ENGINES,
+    ENGINE_SUBPROCESS,
+    ENGINE_INPROCESS,
+    binary_available,
+    inprocess_available,
+    tool_versions,
+)
+from archive import shared_archive
+from progress import ProgressRecord, format_bytes
+from jobs import (
+    JobQueue,
+    DEFAULT_WORKERS,
+    MAX_WORKERS,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_PROCESSING,
+    JOB_FINISHED,
+    JOB_FAILED,
+    JOB_CANCELLED,
+    JOB_SKIPPED,
+)
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
@@ -13,9 +45,14 @@ BROWSER_OPTIONS = ["manual", "firefox", "chrome", "edge", "opera", "opera-gx", "
 DEFAULT_BROWSER = "manual"
 
 LOG_FLUSH_INTERVAL_MS = 150
-MAX_LOG_LINES = 2000
+INGEST_INTERVAL_MS = 50
+MAX_EVENTS_PER_TICK = 5000
+MAX_JOB_ROWS = 200
+LOG_SCROLL_UNIT_LINES = 3
 PROGRESS_UPDATE_INTERVAL_SECONDS = 0.15
 PROGRESS_MIN_DELTA = 0.5
+METRICS_REFRESH_MS = 2000
+PREFETCH_DEBOUNCE_MS = 600  # quiet time after the last edit of the URL before it is looked up
 
 APP_BG = "#050505"
 PANEL_BG = "#101010"
@@ -35,33 +72,165 @@ STATUS_COLORS = {
     "success": ("#0E2614", "#8CE6A5"),
 }
 
+JOB_STATUS_TEXT = {
+    JOB_QUEUED: ("Queued", MUTED),
+    JOB_RUNNING: ("Downloading", "#FF7B85"),
+    JOB_PROCESSING: ("Processing", "#B7A6FF"),
+    JOB_FINISHED: ("Finished", "#8CE6A5"),
+    JOB_FAILED: ("Failed", "#FF9AA2"),
+    JOB_CANCELLED: ("Cancelled", "#FFD27A"),
+    JOB_SKIPPED: ("Already downloaded", MUTED),
+}
+
+
+class JobRow(ctk.CTkFrame):
+    """One entry in the job list: name, progress bar, percentage and a cancel button."""
+
+    def __init__(self, master, job, label_font, value_font, on_cancel):
+        super().__init__(
+            master,
+            fg_color=FIELD_BG,
+            border_width=1,
+            border_color=BORDER,
+            corner_radius=10,
+        )
+        self.grid_columnconfigure(0, weight=1)
+        self._last_progress_value = None
+        self._last_progress_update_at = 0.0
+
+        self.name_label = ctk.CTkLabel(
+            self,
+            text=f"#{job.id}  {job.display_name()}",
+            font=label_font,
+            text_color=TEXT,
+            anchor="w",
+        )
+        self.name_label.grid(row=0, column=0, padx=(12, 8), pady=(8, 0), sticky="ew")
+
+        self.pct_label = ctk.CTkLabel(self, text="0%", font=value_font, text_color=TEXT)
+        self.pct_label.grid(row=0, column=1, padx=(0, 8), pady=(8, 0), sticky="e")
+
+        self.cancel_btn = ctk.CTkButton(
+            self,
+            text="Cancel",
+            width=72,
+            height=28,
+            fg_color=PANEL_BG,
+            hover_color=RED_DARK,
+            border_width=1,
+            border_color=BORDER,
+            command=lambda: on_cancel(job.id),
+        )
+        self.cancel_btn.grid(row=0, column=2, rowspan=2, padx=(0, 12), pady=8, sticky="e")
+
+        self.progress_bar = ctk.CTkProgressBar(
+            self,
+            height=10,
+            fg_color=PANEL_BG,
+            progress_color=RED,
+        )
+        self.progress_bar.grid(row=1, column=0, columnspan=2, padx=(12, 8), pady=(4, 0), sticky="ew")
+        self.progress_bar.set(0)
+
+        self.status_label = ctk.CTkLabel(
+            self,
+            text="Queued",
+            font=label_font,
+            text_color=MUTED,
+            anchor="w",
+        )
+        self.status_label.grid(row=2, column=0, columnspan=3, padx=12, pady=(0, 6), sticky="ew")
+
+    def update_progress(self, job):
+        percent = job.percent
+        self.name_label.configure(text=f"#{job.id}  {job.display_name()}")
+        if percent is None or not self._should_update_progress(percent):
+            return
+
+        self.progress_bar.set(percent / 100.0)
+        self.pct_label.configure(text=f"{percent:.1f}%")
+        if job.status == JOB_PROCESSING:
+            text, color = JOB_STATUS_TEXT[JOB_PROCESSING]
+            self.status_label.configure(text=text, text_color=color)
+        else:
+            record = job.progress
+            detail = f"{record.speed_str}  ETA {record.eta_str}  {record.total_str}" if record else ""
+            self.status_label.configure(text=f"Downloading  {detail}".rstrip(), text_color="#FF7B85")
+        self._last_progress_value = percent
+        self._last_progress_update_at = time.monotonic()
+
+    def update_state(self, job):
+        text, color = JOB_STATUS_TEXT.get(job.status, ("", MUTED))
+        if job.status == JOB_FAILED and job.error:
+            text = f"Failed: {job.error.splitlines()[0]}"
+        if job.status == JOB_FINISHED:
+            self.progress_bar.set(1.0)
+            self.pct_label.configure(text="100%")
+        self.name_label.configure(text=f"#{job.id}  {job.display_name()}")
+        self.status_label.configure(text=text, text_color=color)
+        self.cancel_btn.configure(state="disabled" if job.done else "normal")
+
+    def _should_update_progress(self, pct: float) -> bool:
+        if self._last_progress_value is None:
+            return True
+
+        now = time.monotonic()
+        if pct >= 100:
+            return True
+        if abs(pct - self._last_progress_value) >= PROGRESS_MIN_DELTA:
+            return True
+        return (now - self._last_progress_update_at) >= PROGRESS_UPDATE_INTERVAL_SECONDS
+
 
 class App(ctk.CTk):
     """Main application window."""
 
-    def __init__(self):
+    def __init__(self, measure_startup: bool = False):
+        self._startup_marks = {"imports": time.perf_counter()} if measure_startup else None
         super().__init__()
+        from session_log import LogRing, SessionLog
 
         self.title("YT-DLP GUI")
         self.geometry("900x720")
         self.minsize(760, 560)
         self.configure(fg_color=APP_BG)
 
-        self.downloader = Downloader()
-        self.downloading = False
+        # worker threads only append here; the Tk thread drains it on a fixed tick
+        self._inbox = deque()
+        self.queue = JobQueue(
+            workers=DEFAULT_WORKERS,
+            on_progress=lambda job, line: self._inbox.append(("progress", job, line)),
+            on_state=lambda job: self._inbox.append(("state", job, None)),
+            on_expansion=lambda exp: self._inbox.append(("expansion", exp, None)),
+        )
+        self.prefetcher = None  # created on the first lookup
+        self._prefetch_after = None  # pending debounced lookup of the URL field
+        self._prefetched = None  # URL the info line describes (or is looking up)
+        self.job_rows = {}
         self.deps_ok = False
+        self.api_server = None
+        self.journal = None
         self.cookies_file_path = None
         self._log_buffer = []
         self._log_flush_scheduled = False
-        self._last_progress_value = None
-        self._last_progress_update_at = 0.0
+        self.log_ring = LogRing()
+        self.session_log = SessionLog()
+        self._log_top = 0  # first visible line in log_ring
+        self._log_follow = True  # stick to the newest line while at the bottom
+        self._metrics_after = None  # pending refresh of the timings panel
 
         self._init_fonts()
         self._build_ui()
-        self._check_deps()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.after(INGEST_INTERVAL_MS, self._drain_inbox)
 
-        if self.deps_ok:
-            self._set_status("Paste a link and press Start Download.", tone="ready")
+        # paint first: tool discovery runs on a thread and reports back via the inbox
+        self.dl_button.configure(state="disabled")
+        self._set_dependency_state("Checking tools...", ok=True)
+        self._set_status("Looking for yt-dlp and ffmpeg...", tone="active")
+        threading.Thread(target=self._discover_tools, name="tool-discovery", daemon=True).start()
+        if measure_startup:
+            self.after_idle(self._mark_startup, "first paint")
 
     def _init_fonts(self):
         self.title_font = ctk.CTkFont(family="Segoe UI Semibold", size=24, weight="bold")
@@ -70,6 +239,8 @@ class App(ctk.CTk):
         self.log_font = ctk.CTkFont(family="Cascadia Code", size=12)
 
     def _build_ui(self):
+        from bandwidth import BANDWIDTH_CHOICES
+
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=1)
 
@@ -112,7 +283,20 @@ class App(ctk.CTk):
             padx=12,
             pady=6,
         )
-        self.deps_label.grid(row=0, column=1, rowspan=2, sticky="e")
+        self.deps_label.grid(row=0, column=2, rowspan=2, sticky="e")
+
+        self.metrics_btn = ctk.CTkButton(
+            header,
+            text="Timings",
+            width=90,
+            height=32,
+            fg_color=FIELD_BG,
+            hover_color=RED_DARK,
+            border_width=1,
+            border_color=BORDER,
+            command=self._toggle_metrics,
+        )
+        self.metrics_btn.grid(row=0, column=1, rowspan=2, padx=(0, 10), sticky="e")
 
         form = ctk.CTkFrame(shell, fg_color="transparent")
         form.grid(row=1, column=0, padx=18, pady=(0, 10), sticky="ew")
@@ -133,6 +317,43 @@ class App(ctk.CTk):
         )
         self.url_entry.grid(row=1, column=0, sticky="ew", pady=(6, 0))
         self.url_entry.bind("<Return>", lambda _: self._start_download())
+        self.url_entry.bind("<KeyRelease>", self._schedule_prefetch, add="+")
+        self.url_entry.bind("<<Paste>>", self._schedule_prefetch, add="+")
+
+        self.playlist_var = ctk.BooleanVar(value=False)
+        self.playlist_check = ctk.CTkCheckBox(
+            form,
+            text="Playlist / channel",
+            variable=self.playlist_var,
+            font=self.label_font,
+            text_color=MUTED,
+            fg_color=RED,
+            hover_color=RED_HOVER,
+            border_color=BORDER,
+        )
+        self.playlist_check.grid(row=1, column=1, padx=(12, 0), pady=(6, 0), sticky="e")
+
+        self.archive_var = ctk.BooleanVar(value=False)
+        self.archive_check = ctk.CTkCheckBox(
+            form,
+            text="Skip downloaded",
+            variable=self.archive_var,
+            font=self.label_font,
+            text_color=MUTED,
+            fg_color=RED,
+            hover_color=RED_HOVER,
+            border_color=BORDER,
+        )
+        self.archive_check.grid(row=1, column=2, padx=(12, 0), pady=(6, 0), sticky="e")
+
+        self.url_info_label = ctk.CTkLabel(
+            form,
+            text="",
+            font=self.label_font,
+            text_color=MUTED,
+            anchor="w",
+        )
+        self.url_info_label.grid(row=2, column=0, columnspan=3, sticky="ew", pady=(4, 0))
 
         options = ctk.CTkFrame(shell, fg_color="transparent")
         options.grid(row=2, column=0, padx=18, pady=(0, 10), sticky="ew")
@@ -188,7 +409,7 @@ class App(ctk.CTk):
         )
         self.format_menu.grid(row=1, column=2, sticky="w", padx=(18, 0), pady=(6, 0))
 
-        self.dir_var = ctk.StringVar(value=self.downloader.output_dir)
+        self.dir_var = ctk.StringVar(value=DEFAULT_OUTPUT_DIR)
         self.dir_entry = ctk.CTkEntry(
             options,
             textvariable=self.dir_var,
@@ -213,6 +434,19 @@ class App(ctk.CTk):
         )
         self.dir_btn.grid(row=1, column=4, sticky="e", pady=(6, 0))
 
+        self.temp_btn = ctk.CTkButton(
+            options,
+            text="Temp folder",
+            width=110,
+            height=38,
+            fg_color=FIELD_BG,
+            hover_color=RED_DARK,
+            border_width=1,
+            border_color=BORDER,
+            command=self._pick_temp_dir,
+        )
+        self.temp_btn.grid(row=1, column=5, sticky="e", padx=(8, 0), pady=(6, 0))
+
         self.cookies_file_label = ctk.CTkLabel(
             shell,
             text="Manual cookies not selected",
@@ -239,7 +473,7 @@ class App(ctk.CTk):
 
         self.cancel_button = ctk.CTkButton(
             actions,
-            text="Cancel",
+            text="Cancel All",
             height=40,
             fg_color=FIELD_BG,
             hover_color=RED_DARK,
@@ -251,22 +485,85 @@ class App(ctk.CTk):
         )
         self.cancel_button.grid(row=0, column=1, padx=(10, 0), sticky="w")
 
-        self.pct_label = ctk.CTkLabel(
+        self.import_archive_btn = ctk.CTkButton(
             actions,
-            text="0%",
-            font=ctk.CTkFont(family="Segoe UI Semibold", size=22, weight="bold"),
-            text_color=TEXT,
+            text="Import archive",
+            width=120,
+            height=40,
+            fg_color=FIELD_BG,
+            hover_color=RED_DARK,
+            border_width=1,
+            border_color=BORDER,
+            command=self._import_archive,
         )
-        self.pct_label.grid(row=0, column=3, sticky="e")
+        self.import_archive_btn.grid(row=0, column=2, padx=(10, 0), sticky="w")
 
-        self.progress_bar = ctk.CTkProgressBar(
+        ctk.CTkLabel(actions, text="Engine", font=self.label_font, text_color=MUTED).grid(
+            row=0, column=3, sticky="e", padx=(0, 8)
+        )
+        self.engine_var = ctk.StringVar(value=ENGINE_SUBPROCESS)
+        self.engine_menu = ctk.CTkOptionMenu(
+            actions,
+            variable=self.engine_var,
+            values=list(ENGINES),
+            width=120,
+            height=38,
+            fg_color=RED,
+            button_color=RED,
+            button_hover_color=RED_HOVER,
+            dropdown_fg_color=FIELD_BG,
+            dropdown_hover_color=RED_DARK,
+        )
+        self.engine_menu.grid(row=0, column=4, sticky="e", padx=(0, 18))
+
+        ctk.CTkLabel(actions, text="Parallel", font=self.label_font, text_color=MUTED).grid(
+            row=0, column=5, sticky="e", padx=(0, 8)
+        )
+        self.workers_var = ctk.StringVar(value=str(DEFAULT_WORKERS))
+        self.workers_menu = ctk.CTkOptionMenu(
+            actions,
+            variable=self.workers_var,
+            values=[str(n) for n in range(1, MAX_WORKERS + 1)],
+            width=70,
+            height=38,
+            fg_color=RED,
+            button_color=RED,
+            button_hover_color=RED_HOVER,
+            dropdown_fg_color=FIELD_BG,
+            dropdown_hover_color=RED_DARK,
+            command=lambda value: self.queue.set_workers(int(value)),
+        )
+        self.workers_menu.grid(row=0, column=6, sticky="e", padx=(0, 18))
+
+        ctk.CTkLabel(actions, text="Limit", font=self.label_font, text_color=MUTED).grid(
+            row=0, column=7, sticky="e", padx=(0, 8)
+        )
+        self.limit_var = ctk.StringVar(value="unlimited")
+        self.limit_menu = ctk.CTkOptionMenu(
+            actions,
+            variable=self.limit_var,
+            values=list(BANDWIDTH_CHOICES),
+            width=110,
+            height=38,
+            fg_color=RED,
+            button_color=RED,
+            button_hover_color=RED_HOVER,
+            dropdown_fg_color=FIELD_BG,
+            dropdown_hover_color=RED_DARK,
+            command=self._on_limit_changed,
+        )
+        self.limit_menu.grid(row=0, column=8, sticky="e")
+
+        self.jobs_frame = ctk.CTkScrollableFrame(
             shell,
-            height=14,
-            fg_color=FIELD_BG,
-            progress_color=RED,
+            height=170,
+            fg_color="#0C0C0C",
+            border_width=1,
+            border_color=BORDER,
+            corner_radius=12,
         )
-        self.progress_bar.grid(row=5, column=0, padx=18, pady=(0, 10), sticky="ew")
-        self.progress_bar.set(0)
+        self.jobs_frame.grid(row=5, column=0, padx=18, pady=(0, 10), sticky="nsew")
+        self.jobs_frame.grid_columnconfigure(0, weight=1)
 
         self.status_label = ctk.CTkLabel(
             shell,
@@ -281,22 +578,91 @@ class App(ctk.CTk):
         )
         self.status_label.grid(row=6, column=0, padx=18, pady=(0, 10), sticky="ew")
 
-        self.log_box = ctk.CTkTextbox(
+        # the textbox only ever holds the visible window of log_ring
+        log_frame = ctk.CTkFrame(
             shell,
-            font=self.log_font,
-            state="disabled",
             fg_color="#0C0C0C",
             border_width=1,
             border_color=BORDER,
+            corner_radius=12,
+        )
+        log_frame.grid(row=7, column=0, padx=18, pady=(0, 18), sticky="nsew")
+        log_frame.grid_columnconfigure(0, weight=1)
+        log_frame.grid_rowconfigure(0, weight=1)
+        shell.grid_rowconfigure(7, weight=1)
+
+        self.log_box = ctk.CTkTextbox(
+            log_frame,
+            font=self.log_font,
+            state="disabled",
+            fg_color="#0C0C0C",
             text_color=TEXT,
             corner_radius=12,
             wrap="word",
+            activate_scrollbars=False,
         )
-        self.log_box.grid(row=7, column=0, padx=18, pady=(0, 18), sticky="nsew")
-        shell.grid_rowconfigure(7, weight=1)
+        self.log_box.grid(row=0, column=0, padx=(6, 0), pady=6, sticky="nsew")
+        self.log_scrollbar = ctk.CTkScrollbar(log_frame, command=self._on_log_scroll)
+        self.log_scrollbar.grid(row=0, column=1, padx=(0, 6), pady=6, sticky="ns")
+
+        self.log_box.bind("<MouseWheel>", self._on_log_wheel)
+        self.log_box.bind("<Button-4>", self._on_log_wheel)
+        self.log_box.bind("<Button-5>", self._on_log_wheel)
+        self.log_box.bind("<Configure>", lambda _event: self._render_log())
+
+        # p50 / p95 per download phase; hidden until the header button opens it
+        self.metrics_frame = ctk.CTkFrame(
+            shell,
+            fg_color="#0C0C0C",
+            border_width=1,
+            border_color=BORDER,
+            corner_radius=12,
+        )
+        self.metrics_frame.grid(row=8, column=0, padx=18, pady=(0, 18), sticky="ew")
+        self.metrics_label = ctk.CTkLabel(
+            self.metrics_frame,
+            text="",
+            font=self.log_font,
+            text_color=TEXT,
+            justify="left",
+            anchor="w",
+        )
+        self.metrics_label.grid(row=0, column=0, padx=12, pady=8, sticky="w")
+        self.metrics_frame.grid_remove()
 
         self._on_browser_changed(DEFAULT_BROWSER)
 
+    def _toggle_metrics(self):
+        if self._metrics_after:
+            self.after_cancel(self._metrics_after)
+            self._metrics_after = None
+        if self.metrics_frame.winfo_ismapped():
+            self.metrics_frame.grid_remove()
+        else:
+            self.metrics_frame.grid()
+            self._refresh_metrics()
+
+    def _refresh_metrics(self):
+        from metrics import PHASE_LABELS, shared_metrics
+
+        metrics = shared_metrics()
+        lines = [f"{'phase':<20}{'n':>6}{'p50':>10}{'p95':>10}"]
+        for phase, (samples, p50, p95) in metrics.summary().items():
+            if samples:
+                lines.append(f"{PHASE_LABELS[phase]:<20}{samples:>6}{p50:>9.2f}s{p95:>9.2f}s")
+        if len(lines) == 1:
+            lines.append("no downloads timed yet")
+        lines.append("")
+        lines.append(
+            f"attempts  {metrics.total('attempts_total', outcome='ok'):g} ok"
+            f" / {metrics.total('attempts_total', outcome='failed'):g} failed"
+            f" / {metrics.total('attempts_total', outcome='restarted'):g} restarted"
+            f"    {format_bytes(metrics.total('downloaded_bytes_total'))}"
+            f"    updates {metrics.total('auto_updates_total'):g}"
+        )
+        self.metrics_label.configure(text="\n".join(lines))
+        self._metrics_after = self.after(METRICS_REFRESH_MS, self._refresh_metrics)
+
     def _set_status(self, text: str, tone: str = "ready"):
         fg_color, text_color = STATUS_COLORS.get(tone, STATUS_COLORS["ready"])
         self.status_label.configure(text=text, fg_color=fg_color, text_color=text_color)
@@ -308,6 +674,11 @@ class App(ctk.CTk):
             text_color="#8CE6A5" if ok else "#FF9AA2",
         )
 
+    def _on_limit_changed(self, value: str):
+        from bandwidth import BANDWIDTH_CHOICES, shared_bandwidth_budget
+
+        shared_bandwidth_budget().set_total_rate(BANDWIDTH_CHOICES[value])
+
     def _on_browser_changed(self, choice: str):
         if choice == "manual":
             self.cookies_btn.configure(state="normal")
@@ -334,14 +705,69 @@ class App(ctk.CTk):
             self._on_browser_changed(self.browser_var.get())
             self._log(f"[info] cookies.txt selected: {path}")
 
+    def _import_archive(self):
+        path = filedialog.askopenfilename(
+            title="Select a yt-dlp download archive",
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        try:
+            count = shared_archive().import_file(path)
+        except OSError as e:
+            self._log(f"[warn] archive import failed: {e}")
+            return
+        self._log(f"[info] imported {count} entries from {path}")
+
     def _pick_dir(self):
         selected_dir = filedialog.askdirectory(initialdir=self.dir_var.get())
         if selected_dir:
             self.dir_var.set(selected_dir)
 
-    def _check_deps(self):
-        yt_ok = binary_available(self.downloader.ytdlp_path)
-        ff_ok = binary_available(self.downloader.ffmpeg_path)
+    def _pick_temp_dir(self):
+        """Choose a fast folder for unfinished downloads; cancelling the dialog writes straight to the output folder again."""
+        from staging import shared_staging
+
+        staging = shared_staging()
+        selected_dir = filedialog.askdirectory(
+            initialdir=staging.temp_dir or self.dir_var.get(),
+            title="Folder for unfinished downloads",
+        )
+        try:
+            staging.set_temp_dir(selected_dir or None)
+        except OSError as e:
+            self._log(f"[warn] temp folder not usable: {e}")
+            return
+        if staging.temp_dir:
+            self.temp_btn.configure(text=f"Temp: {os.path.basename(staging.temp_dir) or staging.temp_dir}")
+            self._log(f"[info] unfinished downloads are kept in {staging.temp_dir}")
+        else:
+            self.temp_btn.configure(text="Temp folder")
+            self._log("[info] downloads are written straight to the output folder")
+
+    def _discover_tools(self):
+        """Background thread: locate the tools, then report versions once known."""
+        downloader = Downloader()
+        self._inbox.append(("deps", None, {
+            "yt-dlp":     binary_available(downloader.ytdlp_path),
+            "ffmpeg":     binary_available(downloader.ffmpeg_path),
+            "in-process": inprocess_available(),
+        }))
+
+        # versions are cached by the tool registry; only a new or replaced binary is spawned
+        versions = tool_versions()
+        found = ", ".join(f"{name} {version}" for name, version in versions.items() if version)
+        if found:
+            self._inbox.append(("log", None, f"[info] {found}"))
+
+    def _apply_deps(self, found: dict):
+        yt_ok = found["yt-dlp"]
+        ff_ok = found["ffmpeg"]
+
+        if not yt_ok and found["in-process"]:
+            # no yt-dlp binary, but the Python package can drive downloads in-process
+            self.engine_var.set(ENGINE_INPROCESS)
+            yt_ok = True
 
         missing = []
         if not yt_ok:
@@ -363,14 +789,64 @@ class App(ctk.CTk):
             self.dl_button.configure(state="normal")
             self._set_dependency_state("Tools ready", ok=True)
             self._set_status("Paste a link and press Start Download.", tone="ready")
+            self.after_idle(self._restore_journal)
+            self.after_idle(self._start_api)
+
+        if self._startup_marks is not None:
+            self._mark_startup("interactive")
+
+    def _restore_journal(self):
+        """Journal the queue from now on and bring back what the last session left unfinished."""
+        if self.journal is not None:
+            return
+        from job_journal import JobJournal
+
+        self.journal = JobJournal()
+        restored = self.journal.restore(self.queue)
+        if restored["jobs"] or restored["playlists"]:
+            self._log(
+                f"[info] resuming {restored['jobs']} unfinished download(s) and "
+                f"{restored['playlists']} playlist(s) from the last session "
+                f"({format_bytes(restored['partial_bytes'])} already on disk)"
+            )
+
+    def _start_api(self):
+        """Let other local tools queue downloads here (see api_server.py)."""
+        if self.api_server is not None or os.environ.get("YTDLP_GUI_API") == "0":
+            return
+        from api_server import ApiServer, JobApi
+
+        api = JobApi(self.queue, {"output_dir": self.dir_var.get(), "engine": self.engine_var.get()})
+        server = ApiServer(api)
+        try:
+            server.start()
+        except OSError as e:
+            api.close()
+            self._log(f"[warn] local API not started: {e}")
+            return
+        self.api_server = server
+        self._log(f"[info] local API listening on {server.url}")
+
+    def _mark_startup(self, name: str):
+        """--startup-time: record a milestone; print the report once the app is interactive."""
+        if name == "first paint":
+            self.update_idletasks()
+        self._startup_marks[name] = time.perf_counter()
+        if "first paint" not in self._startup_marks or "interactive" not in self._startup_marks:
+            return
+
+        for mark in ("imports", "first paint", "interactive"):
+            print(f"{mark:<12}{(self._startup_marks[mark] - STARTED_AT) * 1000:>8.0f} ms")
+        self.after(0, self._on_close)
 
-    def _resolve_cookie_args(self):
+    def _resolve_cookie_args(self, quiet: bool = False):
         selection = self.browser_var.get()
 
         if selection == "manual":
             if self.cookies_file_path and os.path.isfile(self.cookies_file_path):
                 return (self.cookies_file_path, None)
-            self._log("[warn] no cookies.txt selected or file not found, continuing without cookies")
+            if not quiet:
+                self._log("[warn] no cookies.txt selected or file not found, continuing without cookies")
             return (None, None)
 
         if selection == "opera-gx":
@@ -378,7 +854,8 @@ class App(ctk.CTk):
             profile_path = os.path.join(roaming, "Opera Software", "Opera GX Stable")
             if os.path.isdir(profile_path):
                 return (None, f'opera:"{profile_path}"')
-            self._log("[info] selected browser profile was not found, continuing without cookies")
+            if not quiet:
+                self._log("[info] selected browser profile was not found, continuing without cookies")
             return (None, None)
 
         if selection == "none":
@@ -399,100 +876,209 @@ class App(ctk.CTk):
             self._set_status("The URL must start with http:// or https://.", tone="warning")
             return
 
-        if self.downloading:
+        cookies_file, cookies_browser = self._resolve_cookie_args()
+        format_str = PRESETS.get(self.format_var.get(), DEFAULT_FORMAT)
+
+        options = {
+            "output_dir": self.dir_var.get(),
+            "cookies_file": cookies_file,
+            "cookies_browser": cookies_browser,
+            "format_str": format_str,
+            "engine": self.engine_var.get(),
+            "use_archive": self.archive_var.get(),
+        }
+        self._cancel_prefetch()
+        self.url_entry.delete(0, "end")
+
+        if self.playlist_var.get():
+            self.queue.submit_playlist(url, **options)
             return
 
-        self.downloading = True
-        self.dl_button.configure(state="disabled")
-        self.cancel_button.configure(state="normal")
-        self._toggle_inputs("disabled")
+        job = self.queue.submit(url, **options)
+        self._log(f"[#{job.id}] queued {url}")
 
-        self.progress_bar.set(0)
-        self.pct_label.configure(text="0%")
-        self._last_progress_value = None
-        self._last_progress_update_at = 0.0
-        self._log_buffer.clear()
-        self._log_flush_scheduled = False
+    def _schedule_prefetch(self, _event=None):
+        """Look the URL up once it has not changed for PREFETCH_DEBOUNCE_MS."""
+        if self._prefetch_after is not None:
+            self.after_cancel(self._prefetch_after)
+        self._prefetch_after = self.after(PREFETCH_DEBOUNCE_MS, self._prefetch_url)
 
-        self.log_box.configure(state="normal")
-        self.log_box.delete("1.0", "end")
-        self.log_box.configure(state="disabled")
-
-        self.downloader.output_dir = self.dir_var.get()
-        cookies_file, cookies_browser = self._resolve_cookie_args()
-        format_str = PRESETS.get(self.format_var.get(), DEFAULT_FORMAT)
+    def _prefetch_url(self):
+        """Extract metadata for the entered URL in the background, so Start skips that step."""
+        self._prefetch_after = None
+        url = self.url_entry.get().strip()
+        if url == self._prefetched:
+            return
+        if not self.deps_ok or self.playlist_var.get() or not re.match(r"^https?://[^\s]+", url):
+            self._cancel_prefetch()
+            return
 
-        self._set_status("Download started.", tone="active")
+        cookies_file, cookies_browser = self._resolve_cookie_args(quiet=True)
+        self.url_info_label.configure(text="Looking up...", text_color=MUTED)
+        self._prefetched = url
+        if self.prefetcher is None:
+            from prefetch import Prefetcher
 
-        self.downloader.download(
+            self.prefetcher = Prefetcher(on_result=lambda result: self._inbox.append(("prefetch", None, result)))
+        self.prefetcher.prefetch(
             url,
-            on_progress=lambda line: self.after(0, self._on_progress, line),
-            on_finished=lambda: self.after(0, self._on_finished),
-            on_error=lambda err: self.after(0, self._on_error, err),
+            output_dir=self.dir_var.get(),
             cookies_file=cookies_file,
             cookies_browser=cookies_browser,
-            format_str=format_str,
+            format_str=PRESETS.get(self.format_var.get(), DEFAULT_FORMAT),
+            engine=self.engine_var.get(),
         )
 
-    def _on_progress(self, line: str):
-        progress = Downloader.parse_progress(line)
-        percent = None
+    def _cancel_prefetch(self):
+        if self._prefetch_after is not None:
+            self.after_cancel(self._prefetch_after)
+            self._prefetch_after = None
+        if self.prefetcher:
+            self.prefetcher.cancel()
+        self._prefetched = None
+        self.url_info_label.configure(text="")
+
+    def _on_prefetch(self, result):
+        if result.url != self._prefetched or result.url != self.url_entry.get().strip():
+            return  # the field changed since this lookup started
+        color = STATUS_COLORS["warning"][1] if result.error else TEXT
+        self.url_info_label.configure(text=result.summary(), text_color=color)
+
+    def _on_expansion(self, expansion):
+        if not expansion.done:
+            self._log(f"[playlist] listing {expansion.url}")
+            self._set_status("Listing playlist entries...", tone="active")
+            return
+
+        if expansion.error:
+            self._log(f"[playlist] [error] {expansion.error}")
+        self._log(
+            f"[playlist] {expansion.found} entries queued, {expansion.skipped} already "
+            f"downloaded, from {expansion.url}"
+        )
+        self._refresh_summary()
+
+    def _drain_inbox(self):
+        """Apply queued worker events, at most MAX_EVENTS_PER_TICK per tick.
+
+        Progress samples collapse to the latest one per job and log lines are
+        batched, so the UI cost per tick stays bounded however fast yt-dlp prints.
+        """
+        inbox = self._inbox
+        latest = {}
+        handled = 0
+        while inbox and handled < MAX_EVENTS_PER_TICK:
+            kind, subject, item = inbox.popleft()
+            handled += 1
+            if kind == "progress":
+                if isinstance(item, ProgressRecord):
+                    latest[subject.id] = (subject, item)
+                else:
+                    self._on_progress(subject, item)
+            elif kind == "state":
+                self._on_job_state(subject)
+            elif kind == "log":
+                self._log(item)
+            elif kind == "deps":
+                self._apply_deps(item)
+            elif kind == "prefetch":
+                self._on_prefetch(item)
+            else:
+                self._on_expansion(subject)
+
+        for job, record in latest.values():
+            self._on_progress(job, record)
+
+        self.after(INGEST_INTERVAL_MS, self._drain_inbox)
+
+    def _on_progress(self, job, line):
+        """Handle one output item of a job: a log line or a ProgressRecord."""
+        if not isinstance(line, ProgressRecord):
+            self._log(f"[#{job.id}] {line}")
+            return
 
-        if progress:
-            display = (
-                f"[{progress['status']}] {progress['title']}  "
-                f"{progress['percent']}  {progress['speed']}  ETA {progress['eta']}  ({progress['total']})"
+        self._log(f"[#{job.id}] {line.display()}")
+        row = self.job_rows.get(job.id)
+        if row and not job.done:
+            row.update_progress(job)
+
+    def _on_job_state(self, job):
+        row = self.job_rows.get(job.id)
+        if row is None:
+            row = JobRow(
+                self.jobs_frame,
+                job,
+                label_font=self.label_font,
+                value_font=self.value_font,
+                on_cancel=self._cancel_job,
             )
-            self._log(display)
-            percent = progress["percent_value"]
+            row.grid(row=job.id, column=0, padx=4, pady=(0, 6), sticky="ew")
+            self.job_rows[job.id] = row
+        row.update_state(job)
+        if job.done:
+            self._trim_job_rows()
+
+        if job.done and job.time_saved:
+            self._log(f"[#{job.id}] [info] early aborts skipped ~{job.time_saved:.1f}s of doomed attempts")
+        if job.status == JOB_FINISHED:
+            self._log(f"[#{job.id}] -- finished --")
+        elif job.status == JOB_FAILED:
+            self._log(f"[#{job.id}] [error] {job.error}")
+        elif job.status == JOB_CANCELLED:
+            self._log(f"[#{job.id}] -- cancelled --")
+
+        self._refresh_summary(job)
+
+    def _trim_job_rows(self):
+        """Drop the oldest finished rows so long playlists don't pile up widgets."""
+        if len(self.job_rows) <= MAX_JOB_ROWS:
+            return
+        for job_id in sorted(self.job_rows):
+            if len(self.job_rows) <= MAX_JOB_ROWS:
+                break
+            job = self.queue.get(job_id)
+            if job is None or job.done:
+                self.job_rows.pop(job_id).destroy()
+
+    def _refresh_summary(self, last_job=None):
+        counts = self.queue.counts()
+        running = counts.get(JOB_RUNNING, 0)
+        processing = counts.get(JOB_PROCESSING, 0)
+        queued = counts.get(JOB_QUEUED, 0)
+        self.cancel_button.configure(state="normal" if running or processing or queued else "disabled")
+
+        if running or processing or queued:
+            post = f"{processing} processing, " if processing else ""
+            self._set_status(f"{running} downloading, {post}{queued} queued.", tone="active")
+        elif last_job is not None and last_job.status == JOB_FAILED:
+            self._set_status(last_job.error, tone="error")
+        elif last_job is not None and last_job.status == JOB_CANCELLED:
+            self._set_status("Download cancelled.", tone="warning")
+        elif counts.get(JOB_FAILED):
+            self._set_status(f"Queue done, {counts[JOB_FAILED]} failed.", tone="warning")
         else:
-            self._log(line)
-            percent = Downloader.parse_percent(line)
-
-        if percent is not None and self._should_update_progress(percent):
-            self.progress_bar.set(percent / 100.0)
-            self.pct_label.configure(text=f"{percent:.1f}%")
-            self._set_status(f"Downloading... {percent:.1f}%", tone="active")
-            self._last_progress_value = percent
-            self._last_progress_update_at = time.monotonic()
-
-    def _on_finished(self):
-        self.downloading = False
-        self.dl_button.configure(state="normal")
-        self.cancel_button.configure(state="disabled")
-        self._toggle_inputs("normal")
-        self.progress_bar.set(1.0)
-        self.pct_label.configure(text="100%")
-        self._set_status("Download finished successfully.", tone="success")
-        self._log("-- finished --")
-
-    def _on_error(self, err: str):
-        self.downloading = False
-        self.dl_button.configure(state="normal")
-        self.cancel_button.configure(state="disabled")
-        self._toggle_inputs("normal")
-        self._set_status(err, tone="error")
-        self._log(f"[error] {err}")
+            self._set_status("All downloads finished successfully.", tone="success")
 
-    def _cancel_download(self):
-        self.downloader.cancel()
-        self.downloading = False
-        self.dl_button.configure(state="normal")
-        self.cancel_button.configure(state="disabled")
-        self._toggle_inputs("normal")
-        self._set_status("Download cancelled.", tone="warning")
-        self._log("-- cancelled --")
+    def _cancel_job(self, job_id: int):
+        self.queue.cancel(job_id)
 
-    def _should_update_progress(self, pct: float) -> bool:
-        if self._last_progress_value is None:
-            return True
-
-        now = time.monotonic()
-        if pct >= 100:
-            return True
-        if abs(pct - self._last_progress_value) >= PROGRESS_MIN_DELTA:
-            return True
-        return (now - self._last_progress_update_at) >= PROGRESS_UPDATE_INTERVAL_SECONDS
+    def _cancel_download(self):
+        self.queue.cancel_all()
+
+    def _on_close(self):
+        from metrics import shared_metrics
+
+        if self.prefetcher:
+            self.prefetcher.cancel()
+        if self.api_server:
+            self.api_server.stop()
+        self.queue.shutdown(cancel=True)
+        if self.journal:
+            self.journal.close()
+        self._flush_log()
+        self.session_log.close()
+        shared_metrics().flush()
+        self.destroy()
 
     def _log(self, text: str):
         self._log_buffer.append(text)
@@ -505,30 +1091,64 @@ class App(ctk.CTk):
         if not self._log_buffer:
             return
 
-        self.log_box.configure(state="normal")
-        self.log_box.insert("end", "\n".join(self._log_buffer) + "\n")
+        ring = self.log_ring
+        oldest = ring.total - len(ring)
+        ring.extend(self._log_buffer)
+        self.session_log.write_lines(self._log_buffer)
         self._log_buffer.clear()
 
-        line_count = int(self.log_box.index("end-1c").split(".")[0])
-        if line_count > MAX_LOG_LINES:
-            trim_until = line_count - MAX_LOG_LINES
-            self.log_box.delete("1.0", f"{trim_until + 1}.0")
+        if not self._log_follow:
+            # keep a scrolled-back view on the same lines while the ring wraps
+            self._log_top = max(0, self._log_top - (ring.total - len(ring) - oldest))
+        self._render_log()
+
+    def _log_visible_lines(self) -> int:
+        line_height = self.log_font.metrics("linespace") or 16
+        return max(1, self.log_box.winfo_height() // line_height)
+
+    def _render_log(self):
+        """Redraw the textbox with the visible window of log_ring only."""
+        total = len(self.log_ring)
+        visible = self._log_visible_lines()
+        if self._log_follow:
+            self._log_top = max(0, total - visible)
+        self._log_top = max(0, min(self._log_top, total - visible))
 
-        self.log_box.see("end")
+        self.log_box.configure(state="normal")
+        self.log_box.delete("1.0", "end")
+        self.log_box.insert("end", "\n".join(self.log_ring.window(self._log_top, visible)))
+        if self._log_follow:
+            self.log_box.see("end")
         self.log_box.configure(state="disabled")
 
-    def _toggle_inputs(self, state: str):
-        self.url_entry.configure(state=state)
-        self.browser_menu.configure(state=state)
-        self.format_menu.configure(state=state)
-        self.dir_entry.configure(state=state)
-        self.dir_btn.configure(state=state)
-        if state == "normal" and self.browser_var.get() == "manual":
-            self.cookies_btn.configure(state="normal")
+        if total:
+            self.log_scrollbar.set(self._log_top / total, min(1.0, (self._log_top + visible) / total))
         else:
-            self.cookies_btn.configure(state="disabled")
+            self.log_scrollbar.set(0.0, 1.0)
+
+    def _scroll_log_to(self, top: int):
+        visible = self._log_visible_lines()
+        bottom = max(0, len(self.log_ring) - visible)
+        self._log_top = max(0, min(top, bottom))
+        self._log_follow = self._log_top >= bottom
+        self._render_log()
+
+    def _on_log_scroll(self, action, value, unit=None):
+        """Scrollbar command: `moveto <fraction>` or `scroll <n> units|pages`."""
+        if action == "moveto":
+            self._scroll_log_to(int(float(value) * len(self.log_ring)))
+        else:
+            step = self._log_visible_lines() if unit == "pages" else LOG_SCROLL_UNIT_LINES
+            self._scroll_log_to(self._log_top + int(value) * step)
+
+    def _on_log_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self._on_log_scroll("scroll", -1, "units")
+        else:
+            self._on_log_scroll("scroll", 1, "units")
+        return "break"
 
 
 if __name__ == "__main__":
-    app = App()
+    app = App(measure_startup="--startup-time" in sys.argv)
     app.mainloop()
\ No newline at end of file
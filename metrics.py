@@ -0,0 +1,286 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from json_store import write_atomically
+from progress import ProgressRecord
+from shared import process_wide
+
+METRICS_PROM_PATH  = os.path.join(os.path.expanduser("~"), ".yt-dlp-gui", "metrics.prom")
+METRICS_LOG_PATH   = os.path.join(os.path.expanduser("~"), ".yt-dlp-gui", "metrics.jsonl")
+MAX_PHASE_SAMPLES  = 500               # recent samples per phase kept for quantiles
+MAX_LOG_BYTES      = 8 * 1024 * 1024   # metrics.jsonl is rotated to metrics.jsonl.1 beyond this
+PROM_WRITE_INTERVAL_SECONDS = 5.0
+
+# phases of one attempt, in order, plus the time a job lost to failed strategies
+PHASES = ("spawn", "extract", "first_byte", "download", "merge", "attempt", "retry")
+PHASE_LABELS = {
+    "spawn":      "process spawn",
+    "extract":    "extraction",
+    "first_byte": "first media byte",
+    "download":   "download",
+    "merge":      "merge / ffmpeg",
+    "attempt":    "whole attempt",
+    "retry":      "failed strategies",
+}
+
+# output that means extraction is over and media is about to be fetched
+EXTRACTED_PREFIXES = ("[download] Destination: ", "[hlsnative]", "[dashsegments]", "[info] Downloading")
+EXTRACTED_MARKERS  = ("has already been downloaded", "format(s):")
+# ffmpeg post-processing steps yt-dlp announces
+MERGE_PREFIXES = (
+    "[Merger]", "[ExtractAudio]", "[VideoConvertor]", "[VideoRemuxer]",
+    "[Fixup", "[EmbedThumbnail]", "[EmbedSubtitle]", "[Metadata]",
+)
+
+# attempt outcomes
+OUTCOME_OK        = "ok"
+OUTCOME_FAILED    = "failed"
+OUTCOME_RESTARTED = "restarted"
+OUTCOME_CANCELLED = "cancelled"
+
+
+# helpers
+
+def percentile(samples, pct: float) -> float | None:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class AttemptTimer:
+    """Infers phase boundaries of one strategy attempt from the output it produces.
+
+    Fed every output item of the attempt (log line or ProgressRecord), in the
+    order the engine emits them; works the same for both engines since the
+    in-process one forwards yt-dlp's messages and hooks as the same items.
+    """
+
+    def __init__(self, strategy: str, engine: str):
+        self.strategy = strategy
+        self.engine   = engine
+        self.started  = time.monotonic()
+        self.ended    = None
+        self.marks    = {}  # milestone -> monotonic time
+        self._bytes   = 0   # bytes of files already completed in this attempt
+        self._current = 0   # bytes of the file being downloaded
+
+    @property
+    def downloaded_bytes(self) -> int:
+        return int(self._bytes + self._current)
+
+    def observe(self, item):
+        now = time.monotonic()
+        marks = self.marks
+        if "output" not in marks:
+            marks["output"] = now
+
+        if isinstance(item, ProgressRecord):
+            marks.setdefault("extracted", now)
+            if item.downloaded is not None:
+                # parallel fragments can report slightly out of order; keep the high-water mark
+                self._current = max(self._current, item.downloaded)
+                if item.downloaded > 0:
+                    marks.setdefault("first_byte", now)
+            if item.status == "finished":
+                marks["downloaded"] = now
+                self._bytes += self._current  # the next format (video -> audio) starts from 0
+                self._current = 0
+            return
+
+        if item.startswith(MERGE_PREFIXES):
+            marks.setdefault("merge", now)
+        elif "extracted" not in marks and (
+            item.startswith(EXTRACTED_PREFIXES) or any(marker in item for marker in EXTRACTED_MARKERS)
+        ):
+            marks["extracted"] = now
+
+    def finish(self):
+        self.ended = time.monotonic()
+
+    def phases(self) -> dict:
+        """Seconds per phase that this attempt got through."""
+        ended = self.ended or time.monotonic()
+        marks = self.marks
+        result = {"attempt": ended - self.started}
+        if "output" in marks:
+            result["spawn"] = marks["output"] - self.started
+        if "extracted" in marks:
+            result["extract"] = marks["extracted"] - marks["output"]
+        if "first_byte" in marks and "extracted" in marks:
+            result["first_byte"] = max(0.0, marks["first_byte"] - marks["extracted"])
+            download_end = marks.get("downloaded") or marks.get("merge") or ended
+            result["download"] = max(0.0, download_end - marks["first_byte"])
+        if "merge" in marks:
+            result["merge"] = ended - marks["merge"]
+        return result
+
+
+class Metrics:
+    """Per-phase timings and counters for every download, exported for outside tools.
+
+    Each attempt is appended to `log_path` as one JSON line; the aggregate
+    (counters plus p50 / p95 summaries per phase) is written to `prom_path` in
+    the Prometheus text format, atomically and at most every few seconds, so a
+    node-exporter textfile collector or a plain `cat` can read it.
+    """
+
+    def __init__(self, prom_path: str | None = METRICS_PROM_PATH, log_path: str | None = METRICS_LOG_PATH):
+        self.prom_path   = prom_path
+        self.log_path    = log_path
+        self._lock       = threading.Lock()
+        self._write_lock = threading.Lock()  # one writer of prom_path at a time
+        self._phases     = {phase: deque(maxlen=MAX_PHASE_SAMPLES) for phase in PHASES}
+        self._sums       = dict.fromkeys(PHASES, 0.0)  # lifetime totals for the _sum / _count series
+        self._counts     = dict.fromkeys(PHASES, 0)
+        self._counters   = {}  # (name, labels tuple) -> value
+        self._written_at = 0.0
+
+    def record_attempt(self, timer: AttemptTimer, outcome: str, failures=()):
+        timer.finish()
+        phases = timer.phases()
+        with self._lock:
+            for phase, seconds in phases.items():
+                self._observe(phase, seconds)
+            self._count("attempts_total", (("engine", timer.engine), ("strategy", timer.strategy), ("outcome", outcome)))
+            self._count("downloaded_bytes_total", (), timer.downloaded_bytes)
+            for kind in failures:
+                self._count("failures_total", (("kind", kind),))
+        self._log({
+            "ts": round(time.time(), 3),
+            "event": "attempt",
+            "engine": timer.engine,
+            "strategy": timer.strategy,
+            "outcome": outcome,
+            "bytes": timer.downloaded_bytes,
+            "failures": sorted(failures),
+            "phases": {phase: round(seconds, 4) for phase, seconds in phases.items()},
+        })
+        self._maybe_write()
+
+    def record_job(self, outcome: str, retry_seconds: float = 0.0):
+        """A job ended; `retry_seconds` is what its failed strategies cost before the one that worked."""
+        with self._lock:
+            self._count("jobs_total", (("outcome", outcome),))
+            if retry_seconds > 0:
+                self._observe("retry", retry_seconds)
+        self._maybe_write()
+
+    def record_postprocess(self, kind: str, outcome: str, seconds: float):
+        """A merge / transcode ran outside yt-dlp (see postprocess.py); timed as the merge phase."""
+        with self._lock:
+            self._count("postprocess_total", (("kind", kind), ("outcome", outcome)))
+            if outcome == OUTCOME_OK:
+                self._observe("merge", seconds)
+        self._log({
+            "ts": round(time.time(), 3),
+            "event": "postprocess",
+            "kind": kind,
+            "outcome": outcome,
+            "phases": {"merge": round(seconds, 4)},
+        })
+        self._maybe_write()
+
+    def record_update(self, result: str):
+        with self._lock:
+            self._count("auto_updates_total", (("result", result),))
+        self._maybe_write()
+
+    def summary(self) -> dict:
+        """{phase: (samples, p50, p95)} over the recent samples, for display."""
+        with self._lock:
+            return {
+                phase: (len(samples), percentile(samples, 50), percentile(samples, 95))
+                for phase, samples in self._phases.items()
+            }
+
+    def counters(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
+
+    def total(self, name: str, **labels) -> float:
+        """Sum of a counter over every label set matching `labels`."""
+        wanted = set(labels.items())
+        with self._lock:
+            return sum(
+                value for (counter, label_set), value in self._counters.items()
+                if counter == name and wanted <= set(label_set)
+            )
+
+    def prometheus_text(self) -> str:
+        lines = []
+        with self._lock:
+            lines.append("# TYPE ytdlp_gui_phase_seconds summary")
+            for phase in PHASES:
+                samples = self._phases[phase]
+                for quantile in (0.5, 0.95):
+                    value = percentile(samples, quantile * 100)
+                    if value is not None:
+                        lines.append(f'ytdlp_gui_phase_seconds{{phase="{phase}",quantile="{quantile}"}} {value:.6f}')
+                lines.append(f'ytdlp_gui_phase_seconds_sum{{phase="{phase}"}} {self._sums[phase]:.6f}')
+                lines.append(f'ytdlp_gui_phase_seconds_count{{phase="{phase}"}} {self._counts[phase]}')
+
+            typed = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE ytdlp_gui_{name} counter")
+                label_text = ",".join(f'{key}="{_escape(value_)}"' for key, value_ in labels)
+                label_text = f"{{{label_text}}}" if label_text else ""
+                lines.append(f"ytdlp_gui_{name}{label_text} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        """Write the Prometheus file now."""
+        if not self.prom_path:
+            return
+        # workers, the post-processing pool and the CLI's exit flush all land here;
+        # snapshot and write together, so a newer snapshot is never overwritten by an older one
+        with self._write_lock:
+            self._written_at = time.monotonic()
+            text = self.prometheus_text()
+            write_atomically(self.prom_path, lambda stream: stream.write(text))
+
+    # helpers
+
+    def _observe(self, phase: str, seconds: float):
+        """Caller holds the lock."""
+        self._phases[phase].append(seconds)
+        self._sums[phase] += seconds
+        self._counts[phase] += 1
+
+    def _count(self, name: str, labels: tuple, value: float = 1):
+        """Caller holds the lock."""
+        key = (name, labels)
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def _maybe_write(self):
+        if time.monotonic() - self._written_at >= PROM_WRITE_INTERVAL_SECONDS:
+            self.flush()
+
+    def _log(self, record: dict):
+        if not self.log_path:
+            return
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+                if os.path.isfile(self.log_path) and os.path.getsize(self.log_path) > MAX_LOG_BYTES:
+                    os.replace(self.log_path, self.log_path + ".1")
+                with open(self.log_path, "a", encoding="utf-8") as handle:
+                    handle.write(line)
+            except OSError:
+                pass
+
+
+@process_wide
+def shared_metrics() -> Metrics:
+    """Process-wide Metrics shared by every Downloader."""
+    return Metrics()
@@ -0,0 +1,143 @@
+import locale
+import string
+import threading
+
+from shared import process_wide
+
+# encoding of yt-dlp's piped output; the same one text-mode pipes used
+PIPE_ENCODING    = locale.getpreferredencoding(False)
+READ_CHUNK_BYTES = 64 * 1024
+# yt-dlp's prefix for errors; a marker on any other line (a WARNING quoting a
+# format or subtitle track, say) is only a hint
+ERROR_PREFIX     = b"ERROR:"
+
+# failure kinds (FAIL_*) and other signals a yt-dlp output line can carry
+FAIL_SIGNATURE    = "signature"
+FAIL_IMAGES_ONLY  = "images-only"
+FAIL_SIGNIN       = "sign-in"
+FAIL_UNAVAILABLE  = "unavailable"
+FAIL_GEO_BLOCKED  = "geo-blocked"
+FAIL_RATE_LIMITED = "rate-limited"
+FAIL_DISK_FULL    = "disk-full"
+SIGNAL_FRAGMENT_RETRY = "fragment-retry"
+SIGNAL_SERVER_BUSY    = "server-busy"
+
+FAILURE_KINDS = {
+    FAIL_SIGNATURE, FAIL_IMAGES_ONLY, FAIL_SIGNIN, FAIL_UNAVAILABLE, FAIL_GEO_BLOCKED, FAIL_RATE_LIMITED,
+    FAIL_DISK_FULL,
+}
+
+# markers per kind (see OutputClassifier for how they match)
+DEFAULT_MARKERS = (
+    (FAIL_SIGNATURE,    ("signature solving failed", "n challenge solving failed")),
+    (FAIL_IMAGES_ONLY,  ("only images are available",)),
+    (FAIL_SIGNIN,       ("sign in to confirm", "confirm you're not a bot")),
+    (FAIL_UNAVAILABLE,  ("private video", "this video has been removed", "unsupported url")),
+    (FAIL_GEO_BLOCKED,  ("available in your country", "not available from your location", "geo restriction", "geo-restricted")),
+    (FAIL_RATE_LIMITED, ("http error 429", "too many requests")),
+    (FAIL_DISK_FULL,    ("no space left on device", "not enough space on the disk")),
+    (SIGNAL_FRAGMENT_RETRY, ("retrying fragment",)),
+    (SIGNAL_SERVER_BUSY,    ("http error 503",)),
+)
+
+
+# helpers
+
+def _normalize_table() -> bytes:
+    """bytes.translate table: ASCII letters to lower case, ASCII punctuation and whitespace to spaces."""
+    table = bytearray(range(256))
+    for char in string.ascii_uppercase:
+        table[ord(char)] = ord(char.lower())
+    for char in string.punctuation + string.whitespace:
+        table[ord(char)] = ord(" ")
+    return bytes(table)
+
+
+_NORMALIZE_TABLE = _normalize_table()
+
+
+def _normalize(data: bytes) -> bytes:
+    return data.translate(_NORMALIZE_TABLE)
+
+
+def is_error_line(line: bytes | str) -> bool:
+    """True for a line yt-dlp reports as an error."""
+    if isinstance(line, str):
+        return line.lstrip().startswith("ERROR:")
+    return line.lstrip().startswith(ERROR_PREFIX)
+
+
+def iter_lines(stream, chunk_size: int = READ_CHUNK_BYTES):
+    """Yield the raw lines of a binary pipe as they arrive, without their b"\\n".
+
+    Reads whatever the pipe has (up to `chunk_size`) and splits it in one go,
+    instead of a read call and a decode per line.
+    """
+    pending = b""
+    while True:
+        chunk = stream.read1(chunk_size)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+class OutputClassifier:
+    """Finds which known marker, if any, a line of yt-dlp output carries, in one scan.
+
+    Markers are phrases matched case-insensitively, with punctuation counting
+    as a space, and must start and end on word boundaries of the line. Each is
+    indexed under one of its words (the longest inner one), so a line costs
+    one translate, one split and one set lookup however many markers are
+    registered. Only lines that contain an indexed word have the full phrases
+    checked. A line carrying markers of two kinds reports the leftmost one.
+    """
+
+    def __init__(self, markers=DEFAULT_MARKERS):
+        self._lock  = threading.Lock()
+        self._count = 0
+        self._index = (frozenset(), {})  # (anchor words, anchor -> ((order, kind, phrase), ...))
+        for kind, kind_markers in markers:
+            self.register(kind, *kind_markers)
+
+    def register(self, kind: str, *markers: str):
+        """Report `kind` for lines containing any of `markers`."""
+        with self._lock:
+            anchors = dict(self._index[1])  # copied, so classify() never needs the lock
+            for marker in markers:
+                phrase = _normalize(marker.encode(PIPE_ENCODING, "replace"))
+                words = phrase.split()
+                if not words:
+                    raise ValueError(f"marker without words: {marker!r}")
+                anchor = max(words[1:-1] or words, key=len)
+                anchors[anchor] = anchors.get(anchor, ()) + ((self._count, kind, b" %s " % phrase.strip()),)
+                self._count += 1
+            self._index = (frozenset(anchors), anchors)
+
+    def classify(self, line: bytes | str) -> str | None:
+        """Return the kind of the marker `line` carries, or None."""
+        if isinstance(line, str):
+            line = line.encode(PIPE_ENCODING, "replace")
+        normalized = line.translate(_NORMALIZE_TABLE)
+        words = normalized.split()
+        anchor_words, anchors = self._index
+        if anchor_words.isdisjoint(words):
+            return None
+
+        padded = b" %s " % normalized  # phrases are stored padded, so they only match whole words
+        best = None
+        for anchor in anchor_words.intersection(words):
+            for order, kind, phrase in anchors[anchor]:
+                position = padded.find(phrase)
+                if position >= 0 and (best is None or (position, order) < best[:2]):
+                    best = (position, order, kind)
+        return best[2] if best else None
+
+
+@process_wide
+def shared_classifier() -> OutputClassifier:
+    """Process-wide classifier with the default markers; register() extends it for every download."""
+    return OutputClassifier()
@@ -0,0 +1,355 @@
+import heapq
+import itertools
+import os
+import re
+import subprocess
+import threading
+import time
+
+from cancellation import stop_tree, popen_kwargs
+from metrics import Metrics, shared_metrics, OUTCOME_OK, OUTCOME_FAILED, OUTCOME_CANCELLED
+from progress import ProgressRecord, STATUS_PROCESSING
+from shared import process_wide
+from staging import move_file
+
+# what a raw download still needs
+POST_FINALIZE = "finalize"  # a single file: only the format id has to leave its name
+POST_MERGE    = "merge"     # separate video and audio streams, copied into one mp4
+POST_AUDIO    = "audio"     # best audio, transcoded to mp3
+
+# lower runs first, so quick stream copies never wait behind transcodes
+POST_PRIORITY = {POST_FINALIZE: 0, POST_MERGE: 1, POST_AUDIO: 2}
+
+TASK_QUEUED    = "queued"
+TASK_RUNNING   = "running"
+TASK_FINISHED  = "finished"
+TASK_FAILED    = "failed"
+TASK_CANCELLED = "cancelled"
+
+# raw streams keep their format id in the name until the final file exists
+RAW_OUTPUT_TEMPLATE        = "%(title)s.f%(format_id)s.%(ext)s"
+# yt-dlp appends one "<duration>\t<path>" line per raw file it finished (or already had)
+POSTPROCESS_PRINT_TEMPLATE = "after_move:%(duration)s\t%(filepath)s"
+# what the format selector chose for a merge preset: "248+140", or one id for a muxed format
+SELECTION_PRINT_TEMPLATE   = "%(format_id)s"
+FORMAT_ID_SUFFIX = re.compile(r"\.f[^.\\/]+(?=\.[^.\\/]+$)")
+MERGE_EXTENSION  = ".mp4"
+AUDIO_EXTENSION  = ".mp3"
+
+
+# helpers
+
+def default_workers() -> int:
+    """Cores this process may run on."""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+
+def read_printed_files(path: str) -> list[tuple[str, float | None]]:
+    """Parse (and delete) a file list yt-dlp wrote with POSTPROCESS_PRINT_TEMPLATE."""
+    files = {}
+    try:
+        with open(path, encoding="utf-8", errors="replace") as handle:
+            for line in handle:
+                duration, _, filepath = line.rstrip("\n").partition("\t")
+                if not filepath:
+                    continue
+                try:
+                    files[filepath] = float(duration)
+                except ValueError:
+                    files[filepath] = None
+        os.remove(path)
+    except OSError:
+        pass
+    return list(files.items())
+
+
+def _temp_path(path: str, directory: str) -> str:
+    base, ext = os.path.splitext(os.path.basename(path))
+    return os.path.join(directory, f"{base}.temp{ext}")
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class PostTask:
+    """Post-processing one finished download still needs, and how far it got.
+
+    Callbacks, invoked from pool threads:
+        on_progress(record) — ProgressRecord with status "processing"; `downloaded`
+                              and `total` are seconds of media
+        commit(ok)          — once the task is over, before on_done
+        on_done(task)       — the task reached TASK_FINISHED / FAILED / CANCELLED
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(
+        self,
+        kind: str,
+        inputs: list[str],
+        ffmpeg_path: str | None,
+        duration: float | None = None,
+        title: str | None = None,
+        priority: int | None = None,
+        output_dir: str | None = None,
+    ):
+        self.id          = next(PostTask._ids)
+        self.kind        = kind
+        self.inputs      = inputs
+        self.ffmpeg_path = ffmpeg_path
+        self.duration    = duration
+        self.title       = title
+        self.priority    = POST_PRIORITY[kind] if priority is None else priority
+        self.output      = self._output_path(output_dir)
+        self.status      = TASK_QUEUED
+        self.percent     = None
+        self.error       = None
+        self.seconds     = None
+        self.cancelled   = False
+        self.keep_inputs = False
+        self.process     = None
+        self.on_progress = None
+        self.commit      = None
+        self.on_done     = None
+
+    @classmethod
+    def plan(
+        cls,
+        kind: str,
+        files: list[tuple[str, float | None]],
+        ffmpeg_path: str | None,
+        title: str | None = None,
+        output_dir: str | None = None,
+    ):
+        """Task for the raw `files` [(path, duration)] of one download.
+
+        A merge takes exactly one video and one audio file, in that order.
+        Audio that already is mp3 falls back to a plain move. The result goes
+        to `output_dir` (default: next to the raw files, which may be in a
+        staging directory).
+        """
+        paths = [path for path, _ in files]
+        durations = [duration for _, duration in files if duration]
+        if kind == POST_MERGE and len(paths) != 2:
+            raise ValueError(f"a merge needs one video and one audio file, got {len(paths)}")
+        if kind == POST_AUDIO and paths[0].lower().endswith(AUDIO_EXTENSION):
+            kind = POST_FINALIZE
+        return cls(kind, paths, ffmpeg_path, max(durations) if durations else None, title, output_dir=output_dir)
+
+    def command(self, target: str) -> list[str]:
+        cmd = [self.ffmpeg_path, "-y", "-nostdin", "-hide_banner", "-loglevel", "error", "-progress", "pipe:1"]
+        for path in self.inputs:
+            cmd += ["-i", path]
+        if self.kind == POST_MERGE:
+            cmd += ["-map", "0:v:0", "-map", "1:a:0", "-c", "copy", "-movflags", "+faststart"]
+        else:
+            cmd += ["-vn", "-c:a", "libmp3lame", "-q:a", "0"]
+        return cmd + [target]
+
+    def _output_path(self, output_dir: str | None) -> str:
+        base, ext = os.path.splitext(FORMAT_ID_SUFFIX.sub("", self.inputs[0]))
+        if output_dir:
+            base = os.path.join(output_dir, os.path.basename(base))
+        if self.kind == POST_MERGE:
+            return base + MERGE_EXTENSION
+        if self.kind == POST_AUDIO:
+            return base + AUDIO_EXTENSION
+        return base + ext
+
+
+class PostProcessor:
+    """Runs the merges and transcodes of finished downloads on a pool of its own.
+
+    Download workers hand a PostTask over and go on with the next job, so the
+    network and the CPU stay busy at the same time across a batch. Tasks wait
+    in a priority queue (POST_PRIORITY, then submission order); at most
+    `workers` run at once, one ffmpeg process each, defaulting to the cores
+    available.
+    """
+
+    def __init__(self, workers: int | None = None, metrics: Metrics | None = None):
+        self.metrics      = metrics if metrics is not None else shared_metrics()
+        self._max_workers = max(1, workers or default_workers())
+        self._cond        = threading.Condition()
+        self._heap        = []  # (priority, order, task)
+        self._order       = itertools.count()
+        self._running     = set()
+        self._threads     = []
+
+    # public api
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def set_workers(self, workers: int):
+        """Resize the pool. Extra workers exit after their current task."""
+        with self._cond:
+            self._max_workers = max(1, int(workers))
+            self._spawn_workers()
+            self._cond.notify_all()
+
+    def submit(self, task: PostTask) -> PostTask:
+        with self._cond:
+            if not task.cancelled:
+                heapq.heappush(self._heap, (task.priority, next(self._order), task))
+                self._spawn_workers()
+                self._cond.notify()
+                return task
+        self._finish(task, TASK_CANCELLED)  # cancelled before it was handed over
+        return task
+
+    def cancel(self, task: PostTask, keep_inputs: bool = False) -> bool:
+        """Cancel a queued or running task. The raw inputs are deleted unless `keep_inputs`."""
+        with self._cond:
+            if task.status not in (TASK_QUEUED, TASK_RUNNING) or task.cancelled:
+                return False
+            task.cancelled   = True
+            task.keep_inputs = keep_inputs
+            queued = any(entry[2] is task for entry in self._heap)
+            if queued:
+                self._heap = [entry for entry in self._heap if entry[2] is not task]
+                heapq.heapify(self._heap)
+            process = task.process
+
+        if process:
+            stop_tree(process)
+        if queued:
+            self._finish(task, TASK_CANCELLED)
+        return True
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def active(self) -> int:
+        with self._cond:
+            return len(self._running)
+
+    # workers
+
+    def _spawn_workers(self):
+        """Start threads up to the current limit. Caller holds the lock."""
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < min(self._max_workers, len(self._heap) + len(self._running)):
+            thread = threading.Thread(target=self._worker, name="postprocess", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_task(self) -> PostTask | None:
+        with self._cond:
+            while True:
+                if len(self._running) >= self._max_workers:
+                    # pool shrank: let this worker go once others are busy
+                    self._threads = [t for t in self._threads if t is not threading.current_thread()]
+                    return None
+                if self._heap:
+                    task = heapq.heappop(self._heap)[2]
+                    task.status = TASK_RUNNING
+                    self._running.add(task)
+                    return task
+                if not self._cond.wait(timeout=5.0):
+                    self._threads = [t for t in self._threads if t is not threading.current_thread()]
+                    return None
+
+    def _worker(self):
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            started = time.monotonic()
+            try:
+                status = self._run(task)
+            except OSError as e:
+                task.error = str(e)
+                status = TASK_FAILED
+            task.seconds = time.monotonic() - started
+            with self._cond:
+                self._running.discard(task)
+                self._cond.notify_all()
+            self._finish(task, status)
+
+    def _run(self, task: PostTask) -> str:
+        if task.kind == POST_FINALIZE:
+            move_file(task.inputs[0], task.output)
+            return TASK_FINISHED
+
+        # ffmpeg writes next to its inputs; the finished file then moves into place
+        temp_path = _temp_path(task.output, os.path.dirname(task.inputs[0]))
+        with self._cond:
+            if task.cancelled:
+                return TASK_CANCELLED
+            task.process = subprocess.Popen(
+                task.command(temp_path),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                **popen_kwargs(),
+            )
+        process = task.process
+        try:
+            self._follow(task, process)
+            errors = process.stderr.read().decode(errors="replace").strip()
+            process.wait()
+        finally:
+            task.process = None
+
+        if task.cancelled or process.returncode != 0:
+            _remove(temp_path)
+            if task.cancelled:
+                return TASK_CANCELLED
+            task.error = errors.splitlines()[-1] if errors else f"ffmpeg exited with status {process.returncode}"
+            return TASK_FAILED
+        move_file(temp_path, task.output)
+        for path in task.inputs:
+            _remove(path)
+        return TASK_FINISHED
+
+    def _follow(self, task: PostTask, process):
+        """Turn ffmpeg's `-progress` key=value blocks into progress records."""
+        values = {}
+        for raw in process.stdout:
+            key, _, value = raw.decode("ascii", "replace").strip().partition("=")
+            if key != "progress":
+                values[key] = value
+                continue
+            try:
+                done = int(values.get("out_time_us") or values.get("out_time_ms")) / 1_000_000
+            except (TypeError, ValueError):
+                done = None
+            try:
+                speed = float(values.get("speed", "").rstrip("x"))
+            except ValueError:
+                speed = None
+            eta = None
+            if done is not None and task.duration and speed:
+                eta = max(task.duration - done, 0.0) / speed
+            record = ProgressRecord(STATUS_PROCESSING, done, task.duration, None, eta, task.title)
+            task.percent = record.percent
+            if task.on_progress:
+                task.on_progress(record)
+
+    def _finish(self, task: PostTask, status: str):
+        task.status = status
+        if status == TASK_CANCELLED and not task.keep_inputs:
+            for path in task.inputs:
+                _remove(path)
+        if task.kind != POST_FINALIZE:
+            outcome = {TASK_FINISHED: OUTCOME_OK, TASK_CANCELLED: OUTCOME_CANCELLED}.get(status, OUTCOME_FAILED)
+            self.metrics.record_postprocess(task.kind, outcome, task.seconds or 0.0)
+        if task.commit:
+            task.commit(status == TASK_FINISHED)
+        if task.on_done:
+            task.on_done(task)
+
+
+@process_wide
+def shared_postprocessor() -> PostProcessor:
+    """Process-wide PostProcessor shared by every JobQueue."""
+    return PostProcessor()
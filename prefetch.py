@@ -0,0 +1,147 @@
+import json
+import threading
+
+from downloader import Downloader, DEFAULT_FORMAT, ENGINE_SUBPROCESS
+from progress import format_bytes, format_eta
+
+MAX_LISTED_HEIGHTS = 5  # video resolutions named in a summary
+
+
+class PrefetchResult:
+    """What a prefetch learned about a URL, for display before the download starts."""
+
+    __slots__ = ("url", "title", "duration", "size", "heights", "audio_only", "error")
+
+    def __init__(
+        self,
+        url: str,
+        title: str | None = None,
+        duration: float | None = None,
+        size: int | None = None,
+        heights: list[int] | None = None,
+        audio_only: bool = False,
+        error: str | None = None,
+    ):
+        self.url        = url
+        self.title      = title
+        self.duration   = duration
+        self.size       = size
+        self.heights    = heights or []
+        self.audio_only = audio_only
+        self.error      = error
+
+    @classmethod
+    def from_info(cls, url: str, info_path: str) -> "PrefetchResult":
+        """Read the fields to show from a yt-dlp info JSON."""
+        try:
+            with open(info_path, encoding="utf-8") as handle:
+                info = json.load(handle)
+        except (OSError, ValueError) as e:
+            return cls(url, error=str(e))
+
+        formats = info.get("formats") or []
+        heights = sorted(
+            {fmt["height"] for fmt in formats if fmt.get("height") and fmt.get("vcodec") != "none"},
+            reverse=True,
+        )
+        requested = info.get("requested_formats") or []
+        sizes = [fmt.get("filesize") or fmt.get("filesize_approx") for fmt in requested]
+        size = info.get("filesize") or info.get("filesize_approx") or (sum(sizes) if sizes and all(sizes) else None)
+        return cls(
+            url,
+            title=info.get("title"),
+            duration=info.get("duration"),
+            size=int(size) if size else None,
+            heights=heights,
+            audio_only=any(fmt.get("vcodec") == "none" and fmt.get("acodec") != "none" for fmt in formats),
+        )
+
+    def summary(self) -> str:
+        """One line: title, duration, size of the selected format, resolutions available."""
+        if self.error:
+            return f"Could not look this URL up: {self.error}"
+        parts = [self.title or "Untitled"]
+        if self.duration:
+            parts.append(format_eta(self.duration))
+        if self.size:
+            parts.append(f"~{format_bytes(self.size)}")
+        available = [f"{height}p" for height in self.heights[:MAX_LISTED_HEIGHTS]]
+        if self.audio_only:
+            available.append("audio")
+        if available:
+            parts.append(" / ".join(available))
+        return "  ·  ".join(parts)
+
+
+class Prefetcher:
+    """Extracts metadata for the URL being entered, before the user starts the download.
+
+    The info JSON lands in the InfoCache under the key the first download
+    strategy uses, so the job that follows loads it (`--load-info-json`) and
+    goes straight to fetching media; a URL that is still cached costs no
+    process at all. Only the newest URL matters: starting a prefetch stops
+    the one still running for another URL.
+
+    on_result(result) is called from the prefetch thread with a PrefetchResult,
+    only for prefetches that were not superseded or cancelled.
+    """
+
+    def __init__(self, downloader_factory=Downloader, on_result=None):
+        self.downloader_factory = downloader_factory
+        self.on_result          = on_result
+        self._lock              = threading.Lock()
+        self._current           = None  # (url, Downloader) of the running prefetch
+
+    def prefetch(
+        self,
+        url: str,
+        output_dir: str | None = None,
+        cookies_file: str | None = None,
+        cookies_browser: str | None = None,
+        format_str: str = DEFAULT_FORMAT,
+        engine: str = ENGINE_SUBPROCESS,
+    ):
+        """Start looking `url` up in the background, cancelling a prefetch of any other URL."""
+        with self._lock:
+            current = self._current
+            if current is not None and current[0] == url:
+                return
+            downloader = self.downloader_factory(output_dir)
+            downloader.engine = engine
+            self._current = (url, downloader)
+        if current is not None:
+            current[1].cancel()
+
+        thread = threading.Thread(
+            target=self._run,
+            args=(url, downloader, cookies_file, cookies_browser, format_str),
+            name="prefetch",
+            daemon=True,
+        )
+        thread.start()
+
+    def cancel(self):
+        """Stop the running prefetch, if any; its result is dropped."""
+        with self._lock:
+            current, self._current = self._current, None
+        if current is not None:
+            current[1].cancel()
+
+    def _run(self, url: str, downloader: Downloader, cookies_file, cookies_browser, format_str: str):
+        error = None
+        try:
+            info_path = downloader.extract_info(url, cookies_file, cookies_browser, format_str)
+        except Exception as e:
+            info_path, error = None, str(e)
+
+        with self._lock:
+            if self._current is None or self._current[1] is not downloader:
+                return  # superseded or cancelled
+            self._current = None
+
+        if info_path:
+            result = PrefetchResult.from_info(url, info_path)
+        else:
+            result = PrefetchResult(url, error=error or "extraction failed")
+        if self.on_result:
+            self.on_result(result)
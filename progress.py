@@ -0,0 +1,129 @@
+PROGRESS_PREFIX = "__P__\t"
+
+# status of records from the post-processing pool; downloaded / total are seconds of media
+STATUS_PROCESSING = "processing"
+
+# one tab-separated line per progress tick; numeric fields are raw numbers (or NA)
+# and the title goes last so tabs inside it survive the split
+PROGRESS_TEMPLATE = (
+    PROGRESS_PREFIX
+    + "%(progress.status)s\t"
+    "%(progress.downloaded_bytes)s\t"
+    "%(progress.total_bytes,progress.total_bytes_estimate)s\t"
+    "%(progress.speed)s\t"
+    "%(progress.eta)s\t"
+    "%(info.title)s"
+)
+
+
+def format_bytes(value: float | None) -> str:
+    """Format a byte count the way yt-dlp does (e.g. `12.34MiB`)."""
+    if value is None:
+        return "NA"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(value) < 1024:
+            return f"{value:.2f}{unit}"
+        value /= 1024
+    return f"{value:.2f}TiB"
+
+
+def format_eta(seconds: float | None) -> str:
+    if seconds is None:
+        return "NA"
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+
+class ProgressRecord:
+    """One progress sample with numeric fields; display strings are built on demand."""
+
+    __slots__ = ("status", "downloaded", "total", "speed", "eta", "title")
+
+    def __init__(
+        self,
+        status: str,
+        downloaded: float | None,
+        total: float | None,
+        speed: float | None,
+        eta: float | None,
+        title: str | None,
+    ):
+        self.status     = status
+        self.downloaded = downloaded
+        self.total      = total
+        self.speed      = speed
+        self.eta        = eta
+        self.title      = title
+
+    @property
+    def percent(self) -> float | None:
+        if self.status == "finished":
+            return 100.0
+        if self.downloaded is not None and self.total:
+            return min(self.downloaded * 100.0 / self.total, 100.0)
+        return None
+
+    @property
+    def percent_str(self) -> str:
+        percent = self.percent
+        return f"{percent:.1f}%" if percent is not None else "NA"
+
+    @property
+    def total_str(self) -> str:
+        return format_bytes(self.total)
+
+    @property
+    def speed_str(self) -> str:
+        return f"{format_bytes(self.speed)}/s" if self.speed is not None else "NA"
+
+    @property
+    def eta_str(self) -> str:
+        return format_eta(self.eta)
+
+    def display(self) -> str:
+        if self.status == STATUS_PROCESSING:
+            return f"[{self.status}] {self.title or 'NA'}  {self.percent_str}  ETA {self.eta_str}"
+        return (
+            f"[{self.status}] {self.title or 'NA'}  "
+            f"{self.percent_str}  {self.speed_str}  ETA {self.eta_str}  ({self.total_str})"
+        )
+
+    def __repr__(self) -> str:
+        return f"ProgressRecord({self.display()})"
+
+
+def decode_progress(line: str) -> ProgressRecord | None:
+    """Decode a PROGRESS_TEMPLATE line; returns None for any other output line."""
+    if not line.startswith(PROGRESS_PREFIX):
+        return None
+    parts = line.split("\t", 6)
+    if len(parts) < 7:
+        return None
+    _, status, downloaded, total, speed, eta, title = parts
+    title = title.rstrip("\r\n")
+    try:
+        return ProgressRecord(
+            status,
+            float(downloaded) if downloaded != "NA" else None,
+            float(total) if total != "NA" else None,
+            float(speed) if speed != "NA" else None,
+            float(eta) if eta != "NA" else None,
+            title if title != "NA" else None,
+        )
+    except ValueError:
+        return None
+
+
+def progress_from_hook(status: dict) -> ProgressRecord:
+    """Build a ProgressRecord from a yt-dlp progress_hooks dict."""
+    info = status.get("info_dict") or {}
+    return ProgressRecord(
+        status.get("status", ""),
+        status.get("downloaded_bytes"),
+        status.get("total_bytes") or status.get("total_bytes_estimate"),
+        status.get("speed"),
+        status.get("eta"),
+        info.get("title"),
+    )
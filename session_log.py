@@ -0,0 +1,156 @@
+import gzip
+import os
+import queue
+import shutil
+import threading
+import time
+
+SESSION_LOG_DIR          = os.path.join(os.path.expanduser("~"), ".yt-dlp-gui", "logs")
+SESSION_LOG_PART_BYTES   = 4 * 1024 * 1024
+SESSION_LOG_MAX_SESSIONS = 10
+LOG_RING_CAPACITY        = 20000
+
+_STOP = object()
+
+
+class LogRing:
+    """Fixed-size ring of log lines; the oldest lines are overwritten once full.
+
+    `total` counts every line ever appended, so a view can tell how far the
+    history has moved since it last rendered.
+    """
+
+    def __init__(self, capacity: int = LOG_RING_CAPACITY):
+        self.capacity = capacity
+        self.total    = 0
+        self._lines   = [None] * capacity
+        self._count   = 0
+        self._next    = 0
+
+    def extend(self, lines):
+        for line in lines:
+            self._lines[self._next] = line
+            self._next = (self._next + 1) % self.capacity
+            if self._count < self.capacity:
+                self._count += 1
+            self.total += 1
+
+    def window(self, start: int, count: int) -> list[str]:
+        """Return up to `count` lines starting at `start` (0 = oldest kept line)."""
+        start = max(0, min(start, self._count))
+        stop = min(self._count, start + count)
+        first = (self._next - self._count) % self.capacity
+        return [self._lines[(first + i) % self.capacity] for i in range(start, stop)]
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class SessionLog:
+    """Streams every log line of this session to disk on a background thread.
+
+    The current part is plain text (`session-<stamp>.log`) so it can be tailed;
+    once it grows past `part_bytes` it is gzipped to `session-<stamp>.<n>.log.gz`
+    and a new part is started. Only the newest `max_sessions` sessions are kept.
+    """
+
+    def __init__(
+        self,
+        directory: str = SESSION_LOG_DIR,
+        part_bytes: int = SESSION_LOG_PART_BYTES,
+        max_sessions: int = SESSION_LOG_MAX_SESSIONS,
+    ):
+        self.directory    = directory
+        self.part_bytes   = part_bytes
+        self.max_sessions = max_sessions
+        self.stamp        = time.strftime("%Y%m%d-%H%M%S")
+        self.path         = os.path.join(directory, f"session-{self.stamp}.log")
+        self._queue       = queue.SimpleQueue()
+        self._parts       = 0
+        self._thread      = threading.Thread(target=self._run, name="session-log", daemon=True)
+        self._thread.start()
+
+    def write_lines(self, lines):
+        """Queue lines for the writer; never blocks on disk."""
+        if lines:
+            self._queue.put((time.time(), list(lines)))
+
+    def close(self, timeout: float = 2.0):
+        """Flush queued lines, compress the last part and stop the writer."""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._prune_sessions()
+            handle = open(self.path, "a", encoding="utf-8", errors="replace")
+        except OSError:
+            return
+
+        written = 0
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            # drain whatever else is already waiting so each wakeup is one write
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            chunks = []
+            for item in batch:
+                if item is _STOP:
+                    stopping = True
+                    continue
+                stamp = time.strftime("%H:%M:%S", time.localtime(item[0]))
+                chunks.extend(f"{stamp} {line}\n" for line in item[1])
+            text = "".join(chunks)
+
+            try:
+                handle.write(text)
+                handle.flush()
+                written += len(text)
+                if written >= self.part_bytes:
+                    handle.close()
+                    self._compress_part()
+                    handle = open(self.path, "a", encoding="utf-8", errors="replace")
+                    written = 0
+            except (OSError, ValueError):
+                # disk trouble must never take the GUI down; drop the batch
+                continue
+
+        handle.close()
+        if written:
+            self._compress_part()
+        else:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def _compress_part(self):
+        """Gzip the current plain part next to it and remove the original."""
+        self._parts += 1
+        target = os.path.join(self.directory, f"session-{self.stamp}.{self._parts}.log.gz")
+        try:
+            with open(self.path, "rb") as src, gzip.open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _prune_sessions(self):
+        """Delete files of all but the newest `max_sessions - 1` earlier sessions."""
+        sessions = {}
+        for name in os.listdir(self.directory):
+            if name.startswith("session-"):
+                stamp = name[len("session-"):].split(".", 1)[0]
+                sessions.setdefault(stamp, []).append(name)
+        for stamp in sorted(sessions)[: max(0, len(sessions) - self.max_sessions + 1)]:
+            for name in sessions[stamp]:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
@@ -0,0 +1,17 @@
+import functools
+import threading
+
+
+def process_wide(factory):
+    """Decorator for `shared_xxx()` accessors: the object is built on the first call and reused after."""
+    lock = threading.Lock()
+    instance = []
+
+    @functools.wraps(factory)
+    def shared():
+        with lock:
+            if not instance:
+                instance.append(factory())
+            return instance[0]
+
+    return shared
@@ -0,0 +1,245 @@
+import errno
+import json
+import os
+import shutil
+import threading
+
+from progress import ProgressRecord, format_bytes
+from shared import process_wide
+
+# kept free on every disk a job writes to, on top of what running jobs reserved
+MIN_FREE_BYTES = 512 * 1024 * 1024
+# sizes from extraction are estimates (filesize_approx, variable bitrates)
+SIZE_HEADROOM  = 1.1
+
+
+class InsufficientSpace(Exception):
+    """A download would not fit on a disk next to what running jobs already reserved."""
+
+
+# helpers
+
+def _existing_parent(path: str) -> str:
+    """`path`, or its nearest parent that exists (an output folder may not be created yet)."""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+def _device(path: str):
+    """Identifies the filesystem `path` is on."""
+    path = _existing_parent(path)
+    try:
+        return os.stat(path).st_dev
+    except OSError:
+        return path
+
+
+def _free_bytes(path: str) -> int | None:
+    try:
+        return shutil.disk_usage(_existing_parent(path)).free
+    except OSError:
+        return None
+
+
+def estimate_size(info_path: str) -> tuple[int | None, bool]:
+    """(bytes, merged) a download will write, from the info JSON of its extraction.
+
+    Bytes is None when a requested format does not say how large it is.
+    """
+    try:
+        with open(info_path, encoding="utf-8") as handle:
+            info = json.load(handle)
+    except (OSError, ValueError):
+        return None, False
+    formats = info.get("requested_formats") or [info]
+    # yt-dlp drops requested_formats from the files it writes; a merged format_id still reads "137+140"
+    merged = len(formats) > 1 or "+" in str(info.get("format_id", ""))
+    sizes = [fmt.get("filesize") or fmt.get("filesize_approx") for fmt in formats]
+    if not all(sizes):
+        return None, merged
+    return int(sum(sizes)), merged
+
+
+def move_file(source: str, target: str):
+    """Move a finished file into place: a rename on the same filesystem, else a copy.
+
+    A copy goes to a temporary name next to `target` first, so the output
+    folder never shows a half-written file under its final name.
+    """
+    try:
+        os.replace(source, target)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    partial = f"{target}.moving"
+    try:
+        shutil.copy2(source, partial)
+        os.replace(partial, target)
+    except OSError:
+        try:
+            os.remove(partial)
+        except OSError:
+            pass
+        raise
+    os.remove(source)
+
+
+class SpaceLease:
+    """Disk space one running download expects to need, per filesystem.
+
+    Grows as yt-dlp reports sizes (see observe()); `written` is what the job
+    already put on its working disk, which the disk's free space reflects.
+    """
+
+    def __init__(self, staging: "Staging", output_dir: str):
+        self.staging     = staging
+        self.output_dir  = output_dir
+        self.needs       = {}     # device -> bytes
+        self.work_device = None
+        self.size        = 0      # download size the lease covers
+        self.merged      = False
+        self.written     = 0
+        self._done       = 0      # bytes of files yt-dlp finished in this attempt
+        self._current    = 0      # size of the file being downloaded
+
+    def begin_attempt(self):
+        """Forget the files counted so far: a new attempt reports the ones on disk as finished again."""
+        self._done    = 0
+        self._current = 0
+        self.written  = 0
+
+    def observe(self, item):
+        """Follow one output item of the job; raises InsufficientSpace once it no longer fits."""
+        if isinstance(item, str):
+            if item.startswith("[info]") and " format(s): " in item and "+" in item.rsplit(": ", 1)[1]:
+                self.merged = True
+            return
+        if not isinstance(item, ProgressRecord):
+            return
+        if item.status == "finished":
+            self._done += item.total or self._current
+            self._current = 0
+            self.written = self._done
+        else:
+            if item.total:
+                self._current = item.total
+            self.written = self._done + (item.downloaded or 0)
+        expected = self._done + self._current
+        if expected > self.size:
+            self.staging.reserve(self, expected, self.merged)
+
+
+class Staging:
+    """Where downloads are written until they are finished, and the disk space promised to them.
+
+    With a temp directory set, yt-dlp keeps `.part` files, fragments and merge
+    intermediates there (`-P temp:`), and only finished files move to the
+    output folder: a rename when both are on one filesystem. Every job
+    reserves the space it expects to need: before it starts when the size is
+    known from a cached extraction, otherwise as soon as yt-dlp reports it. A
+    reservation fails when a disk's free space, less what other running jobs
+    reserved but have not written yet, would drop below MIN_FREE_BYTES, so a
+    large batch stops early instead of filling the disk halfway through.
+    """
+
+    def __init__(self, temp_dir: str | None = None, min_free: int = MIN_FREE_BYTES):
+        self.min_free  = min_free
+        self._temp_dir = None
+        self._leases   = []
+        self._lock     = threading.Lock()
+        if temp_dir:
+            self.set_temp_dir(temp_dir)
+
+    @property
+    def temp_dir(self) -> str | None:
+        return self._temp_dir
+
+    def set_temp_dir(self, path: str | None):
+        """Stage downloads in `path` (created if missing); None writes straight into the output folder."""
+        if path:
+            path = os.path.abspath(os.path.expanduser(path))
+            os.makedirs(path, exist_ok=True)
+        self._temp_dir = path or None
+
+    def work_dir(self, output_dir: str) -> str:
+        """Folder a download into `output_dir` writes its unfinished files to."""
+        return self._temp_dir or output_dir
+
+    def acquire(self, output_dir: str) -> SpaceLease:
+        lease = SpaceLease(self, output_dir)
+        with self._lock:
+            self._leases.append(lease)
+        return lease
+
+    def release(self, lease: SpaceLease):
+        with self._lock:
+            try:
+                self._leases.remove(lease)
+            except ValueError:
+                pass
+
+    def reserve(self, lease: SpaceLease, size: int, merged: bool = False):
+        """Grow `lease` to a download of `size` bytes (`merged`: streams that are merged afterwards).
+
+        Raises InsufficientSpace, leaving the lease as it was, when a disk cannot take it.
+        """
+        expected = size
+        size = int(size * SIZE_HEADROOM)
+        work_dir = self.work_dir(lease.output_dir)
+        work_device = _device(work_dir)
+        # the raw streams and the merged file exist side by side until the merge is done
+        needs = {work_device: size * 2 if merged else size}
+        paths = {work_device: work_dir}
+        output_device = _device(lease.output_dir)
+        if output_device != work_device:
+            needs[output_device] = size  # moving the finished file there is a copy
+            paths[output_device] = lease.output_dir
+
+        with self._lock:
+            for device, amount in needs.items():
+                if amount <= lease.needs.get(device, 0):
+                    continue
+                free = _free_bytes(paths[device])
+                if free is None:
+                    continue
+                others = sum(self._outstanding(other, device) for other in self._leases if other is not lease)
+                written = lease.written if device == work_device else 0
+                if max(amount - written, 0) + others > free - self.min_free:
+                    usable = max(free - others - self.min_free, 0)
+                    raise InsufficientSpace(
+                        f"Not enough free disk space in {paths[device]}: this download needs about "
+                        f"{format_bytes(amount)}, {format_bytes(usable)} can be used (running downloads "
+                        f"reserved {format_bytes(others)}, {format_bytes(self.min_free)} stays free)."
+                    )
+            for device, amount in needs.items():
+                lease.needs[device] = max(amount, lease.needs.get(device, 0))
+            lease.work_device = work_device
+            lease.size        = max(lease.size, expected)
+            lease.merged      = lease.merged or merged
+
+    def reserved(self) -> int:
+        """Bytes reserved by running jobs and not written yet, over all disks."""
+        with self._lock:
+            return sum(
+                self._outstanding(lease, device) for lease in self._leases for device in lease.needs
+            )
+
+    @staticmethod
+    def _outstanding(lease: SpaceLease, device) -> int:
+        """What `lease` may still write to `device`. Caller holds the lock."""
+        amount = lease.needs.get(device, 0)
+        if device == lease.work_device:
+            amount -= lease.written
+        return max(amount, 0)
+
+
+@process_wide
+def shared_staging() -> Staging:
+    """Process-wide Staging shared by every Downloader."""
+    return Staging()
@@ -0,0 +1,59 @@
+import os
+import threading
+import time
+
+from json_store import JsonStore
+from shared import process_wide
+
+STRATEGY_MEMORY_PATH = os.path.join(os.path.expanduser("~"), ".yt-dlp-gui", "strategies.json")
+STRATEGY_TTL_SECONDS = 6 * 60 * 60
+
+
+class StrategyMemory:
+    """Remembers which download strategy last succeeded for each host.
+
+    strategies.json maps a host to `{"label": <strategy label>, "at": <unix time>}`.
+    Entries expire after `ttl` seconds and are dropped as soon as the remembered
+    strategy fails, so a stale winner costs at most one extra attempt.
+    """
+
+    def __init__(self, path: str | None = STRATEGY_MEMORY_PATH, ttl: float = STRATEGY_TTL_SECONDS):
+        self.path   = path
+        self.ttl    = ttl
+        self._lock  = threading.Lock()
+        self._store = JsonStore(path)
+
+    def preferred(self, key: str) -> str | None:
+        """Return the remembered strategy label for `key`, or None if unknown/expired."""
+        with self._lock:
+            entry = self._store.data.get(key)
+            if not entry:
+                return None
+            if time.time() - entry.get("at", 0) > self.ttl:
+                del self._store.data[key]
+                self._store.save()
+                return None
+            return entry.get("label")
+
+    def record_success(self, key: str, label: str):
+        with self._lock:
+            self._store.data[key] = {"label": label, "at": time.time()}
+            self._store.save()
+
+    def record_failure(self, key: str, label: str):
+        """Forget the remembered strategy for `key` if it was `label`.
+
+        Only for failures that point at the strategy (network errors, throttling,
+        a refused client, extractor errors), not at the video.
+        """
+        with self._lock:
+            entry = self._store.data.get(key)
+            if entry and entry.get("label") == label:
+                del self._store.data[key]
+                self._store.save()
+
+
+@process_wide
+def shared_strategy_memory() -> StrategyMemory:
+    """Process-wide StrategyMemory shared by every Downloader."""
+    return StrategyMemory()
@@ -0,0 +1,169 @@
+import os
+import subprocess
+import sys
+import threading
+
+from json_store import JsonStore
+from shared import process_wide
+
+TOOL_REGISTRY_PATH = os.path.join(os.path.expanduser("~"), ".yt-dlp-gui", "tools.json")
+VERSION_TIMEOUT_SECONDS = 15
+DIGEST_CHUNK_BYTES      = 64 * 1024
+
+# flag each tool prints its version with
+VERSION_FLAGS = {
+    "yt-dlp":  "--version",
+    "ffmpeg":  "-version",
+    "ffprobe": "-version",
+}
+
+
+def _stat_signature(path: str) -> list | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _content_digest(path: str) -> str | None:
+    """sha256 of the size and the first and last DIGEST_CHUNK_BYTES of a binary.
+
+    The same build unpacked to another place (a PyInstaller onefile bundle gets a
+    new folder every launch) gives the same digest, so its version is kept.
+    """
+    import hashlib
+
+    try:
+        with open(path, "rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            digest = hashlib.sha256(str(size).encode())
+            digest.update(handle.read(DIGEST_CHUNK_BYTES))
+            if size > 2 * DIGEST_CHUNK_BYTES:
+                handle.seek(-DIGEST_CHUNK_BYTES, os.SEEK_END)
+            digest.update(handle.read(DIGEST_CHUNK_BYTES))
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def _first_existing(paths) -> str | None:
+    return next((path for path in paths if os.path.isfile(path)), None)
+
+
+def _parse_version(name: str, output: str) -> str | None:
+    """`2026.08.19` from yt-dlp, `6.1.1` from `ffmpeg version 6.1.1 Copyright ...`."""
+    first = output.strip().splitlines()[0] if output.strip() else ""
+    parts = first.split()
+    if name in ("ffmpeg", "ffprobe"):
+        return parts[2] if len(parts) >= 3 and parts[1] == "version" else None
+    return parts[0] if parts else None
+
+
+class ToolRegistry:
+    """Persisted record of where yt-dlp / ffmpeg / ffprobe live and which version they are.
+
+    tools.json maps a tool name to `{"path": ..., "stat": [size, mtime_ns],
+    "digest": ..., "version": ...}`: the resolved path, its size and mtime, a
+    digest of its content (see _content_digest) and the parsed `--version`
+    output. An entry is trusted as long as a stat of the path still matches and
+    no higher-priority place (the update override, the bundle) has gained a
+    binary, so startup skips PATH scans and version probes. A replaced or
+    removed binary is looked up again; it is only probed again when its content
+    differs.
+    """
+
+    def __init__(self, path: str | None = TOOL_REGISTRY_PATH):
+        self.path   = path
+        self._lock  = threading.Lock()
+        self._store = JsonStore(path)
+
+    def resolve(self, name: str, locate, preferred=()) -> str:
+        """Return the cached path for `name` if still valid, else `locate()` and remember it.
+
+        `preferred` lists the fixed places `locate()` checks before PATH, in its
+        order; the cached path is dropped once the first of them that exists is
+        a different one.
+        """
+        with self._lock:
+            entry = self._valid_entry(name)
+            if entry and _first_existing(preferred) in (None, entry["path"]):
+                return entry["path"]
+
+        found = locate()
+        signature = _stat_signature(found) if os.path.isabs(found) else None
+        digest = _content_digest(found) if signature else None
+        with self._lock:
+            entries = self._store.data
+            if signature is None:
+                # not found (bare command name): don't cache, so installing it is picked up
+                if entries.pop(name, None) is not None:
+                    self._store.save()
+            else:
+                previous = entries.get(name) or {}
+                same_build = digest is not None and previous.get("digest") == digest
+                entries[name] = {
+                    "path": found,
+                    "stat": signature,
+                    "digest": digest,
+                    "version": previous.get("version") if same_build else None,
+                }
+                self._store.save()
+        return found
+
+    def version(self, name: str) -> str | None:
+        """Version of the registered binary, probing it once if it is not known yet."""
+        with self._lock:
+            entry = self._valid_entry(name)
+            if not entry:
+                return None
+            if entry.get("version"):
+                return entry["version"]
+            path = entry["path"]
+
+        version = self._probe(name, path)
+        if version:
+            with self._lock:
+                entry = self._valid_entry(name)
+                if entry and entry["path"] == path:
+                    entry["version"] = version
+                    self._store.save()
+        return version
+
+    def invalidate(self, name: str):
+        with self._lock:
+            if self._store.data.pop(name, None) is not None:
+                self._store.save()
+
+    @staticmethod
+    def _probe(name: str, path: str) -> str | None:
+        kwargs = {"creationflags": subprocess.CREATE_NO_WINDOW} if sys.platform == "win32" else {}
+        try:
+            result = subprocess.run(
+                [path, VERSION_FLAGS.get(name, "--version")],
+                capture_output=True,
+                text=True,
+                errors="replace",
+                timeout=VERSION_TIMEOUT_SECONDS,
+                **kwargs,
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return _parse_version(name, result.stdout)
+
+    def _valid_entry(self, name: str) -> dict | None:
+        """Entry for `name` if its binary still has the recorded size/mtime. Caller holds the lock.
+
+        A stale entry stays until resolve() replaces it, which keeps its version
+        when the binary found next has the same content.
+        """
+        entry = self._store.data.get(name)
+        if not entry or _stat_signature(entry.get("path", "")) != entry.get("stat"):
+            return None
+        return entry
+
+
+@process_wide
+def shared_tool_registry() -> ToolRegistry:
+    """Process-wide ToolRegistry used by find_ytdlp() / find_ffmpeg() / find_ffprobe()."""
+    return ToolRegistry()
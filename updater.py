@@ -0,0 +1,247 @@
+import os
+import platform
+import sys
+import threading
+
+from json_store import JsonStore
+
+IS_WIN = sys.platform == "win32"
+
+YTDLP_GUI_BIN_DIR   = os.path.join(os.path.expanduser("~"), ".yt-dlp-gui", "bin")
+YTDLP_OVERRIDE_PATH = os.path.join(YTDLP_GUI_BIN_DIR, "yt-dlp.exe" if IS_WIN else "yt-dlp")
+# base of the "latest release" download links; overridable to point at a local stand-in
+YTDLP_RELEASE_URL   = os.environ.get(
+    "YTDLP_GUI_RELEASE_URL", "https://github.com/yt-dlp/yt-dlp/releases/latest/download"
+)
+YTDLP_SUMS_NAME     = "SHA2-256SUMS"
+DOWNLOAD_TIMEOUT_SECONDS = 120
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+MIN_BINARY_SIZE     = 1_000_000
+
+# update() results
+UPDATE_INSTALLED = "installed"
+UPDATE_CURRENT   = "current"
+UPDATE_FAILED    = "failed"
+
+_LINUX_ASSETS = {
+    "x86_64":  "yt-dlp_linux",
+    "amd64":   "yt-dlp_linux",
+    "aarch64": "yt-dlp_linux_aarch64",
+    "arm64":   "yt-dlp_linux_aarch64",
+    "armv7l":  "yt-dlp_linux_armv7l",
+}
+
+
+_update_lock = threading.Lock()
+
+
+class UpdateCancelled(Exception):
+    pass
+
+
+def release_asset() -> str | None:
+    """Name of the standalone yt-dlp release binary for this platform, if there is one."""
+    if IS_WIN:
+        return "yt-dlp.exe"
+    if sys.platform == "darwin":
+        return "yt-dlp_macos"
+    if sys.platform.startswith("linux"):
+        return _LINUX_ASSETS.get(platform.machine().lower())
+    return None
+
+
+class YtdlpUpdater:
+    """Keeps the yt-dlp binary in `target` in step with the latest release.
+
+    Every request is conditional (If-None-Match / If-Modified-Since), so checking
+    an unchanged release transfers no payload. The binary is streamed into
+    `<target>.part` and hashed on the fly; an interrupted download resumes from
+    the part file with a Range request guarded by If-Range. Validators and the
+    installed hash are kept in `<target>.json`.
+    """
+
+    def __init__(
+        self,
+        base_url: str = YTDLP_RELEASE_URL,
+        target: str = YTDLP_OVERRIDE_PATH,
+        asset: str | None = None,
+        timeout: float = DOWNLOAD_TIMEOUT_SECONDS,
+    ):
+        self.base_url    = base_url.rstrip("/")
+        self.target      = target
+        self.asset       = asset or release_asset()
+        self.timeout     = timeout
+        self.part_path   = target + ".part"
+        self.state_path  = target + ".json"
+        self.transferred = 0  # payload bytes received by the last update()
+        self._state      = JsonStore(self.state_path)  # validators and progress of the last download
+
+    def update(self, cancelled=None, on_progress=None) -> str:
+        """Bring `target` up to date. Returns UPDATE_INSTALLED, UPDATE_CURRENT or UPDATE_FAILED.
+
+        Raises UpdateCancelled when `cancelled()` turns true; the part file is
+        kept so the next call resumes it.
+        """
+        if not self.asset:
+            self._report(on_progress, "[warn] no standalone yt-dlp build for this platform")
+            return UPDATE_FAILED
+
+        # parallel jobs can hit the same YouTube failure; the second one finds it current
+        with _update_lock:
+            self.transferred = 0
+            state = self._load_state()
+            installed = os.path.isfile(self.target)
+            expected = self._expected_sha256(state)
+            if installed and expected and expected == state.get("sha256"):
+                self._save_state()
+                return UPDATE_CURRENT
+
+            result = self._fetch_binary(state, installed, expected, cancelled, on_progress)
+            self._save_state()
+            return result
+
+    # helpers
+
+    def _expected_sha256(self, state: dict) -> str | None:
+        """Expected hash of the asset from the (conditionally fetched) checksum file."""
+        from urllib.error import HTTPError, URLError
+
+        sums = state.setdefault("sums", {})
+        try:
+            with self._open(f"{self.base_url}/{YTDLP_SUMS_NAME}", self._validators(sums)) as response:
+                body = response.read().decode("utf-8", errors="replace")
+                self.transferred += len(body)
+                sums.update(self._response_validators(response))
+        except HTTPError as e:
+            return sums.get("expected") if e.code == 304 else None
+        except (URLError, OSError):
+            return None
+
+        sums["expected"] = None
+        for line in body.splitlines():
+            parts = line.split()
+            if len(parts) >= 2 and parts[-1].lstrip("*") == self.asset:
+                sums["expected"] = parts[0].lower()
+        return sums["expected"]
+
+    def _fetch_binary(self, state, installed, expected, cancelled, on_progress) -> str:
+        import hashlib
+        from http.client import HTTPException
+        from urllib.error import HTTPError, URLError
+
+        binary = state.setdefault("binary", {})
+        partial = state.get("partial") or {}
+        offset = 0
+        headers = {}
+        if installed:
+            headers.update(self._validators(binary))
+        if os.path.isfile(self.part_path) and partial.get("expected") == expected and (
+            partial.get("etag") or partial.get("last_modified")
+        ):
+            offset = os.path.getsize(self.part_path)
+            headers = {
+                "Range": f"bytes={offset}-",
+                "If-Range": partial.get("etag") or partial["last_modified"],
+            }
+
+        digest = hashlib.sha256()
+        try:
+            response = self._open(f"{self.base_url}/{self.asset}", headers)
+        except HTTPError as e:
+            if e.code == 304:
+                return UPDATE_CURRENT
+            if e.code == 416:
+                # the part file is useless against this release; start over next time
+                self._discard_part(state)
+            self._report(on_progress, f"[warn] yt-dlp update failed: HTTP {e.code}")
+            return UPDATE_FAILED
+        except (URLError, OSError) as e:
+            self._report(on_progress, f"[warn] yt-dlp update failed: {e}")
+            return UPDATE_FAILED
+
+        with response:
+            validators = self._response_validators(response)
+            if offset and response.status == 206:
+                self._report(on_progress, f"[info] resuming yt-dlp update at {offset} bytes")
+                # hash what is already on disk once; the rest is hashed as it streams in
+                with open(self.part_path, "rb") as handle:
+                    for chunk in iter(lambda: handle.read(DOWNLOAD_CHUNK_SIZE), b""):
+                        digest.update(chunk)
+                mode = "ab"
+            else:
+                offset = 0
+                mode = "wb"
+            state["partial"] = dict(validators, expected=expected)
+            self._save_state()
+
+            os.makedirs(os.path.dirname(self.target), exist_ok=True)
+            try:
+                with open(self.part_path, mode) as handle:
+                    while True:
+                        if cancelled and cancelled():
+                            raise UpdateCancelled()
+                        chunk = response.read(DOWNLOAD_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        handle.write(chunk)
+                        digest.update(chunk)
+                        self.transferred += len(chunk)
+            except (OSError, HTTPException) as e:
+                self._save_state()
+                self._report(on_progress, f"[warn] yt-dlp update interrupted, will resume: {e}")
+                return UPDATE_FAILED
+
+        size = os.path.getsize(self.part_path)
+        actual = digest.hexdigest()
+        if (expected and actual != expected) or (not expected and size < MIN_BINARY_SIZE):
+            self._discard_part(state)
+            self._report(on_progress, "[warn] yt-dlp checksum verification failed, skipping")
+            return UPDATE_FAILED
+
+        if not IS_WIN:
+            os.chmod(self.part_path, 0o755)
+        os.replace(self.part_path, self.target)
+        state.pop("partial", None)
+        state["binary"] = dict(validators, sha256=actual)
+        state["sha256"] = actual
+        return UPDATE_INSTALLED
+
+    def _open(self, url: str, headers: dict):
+        import urllib.request
+
+        request = urllib.request.Request(url, headers={"User-Agent": "yt-dlp-gui", **headers})
+        return urllib.request.urlopen(request, timeout=self.timeout)
+
+    @staticmethod
+    def _validators(entry: dict) -> dict:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    @staticmethod
+    def _response_validators(response) -> dict:
+        return {
+            "etag":          response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+
+    def _discard_part(self, state: dict):
+        state.pop("partial", None)
+        try:
+            os.remove(self.part_path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _report(on_progress, message: str):
+        if on_progress:
+            on_progress(message)
+
+    def _load_state(self) -> dict:
+        return self._state.data
+
+    def _save_state(self):
+        self._state.save()